@@ -20,7 +20,32 @@ from collections import defaultdict, Counter
 import re
 import logging
 import matplotlib.pyplot as plt
-from datetime import datetime
+import openpyxl
+from datetime import date, datetime
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+try:
+    from python_calamine import CalamineWorkbook
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401 - only needed as the pandas Parquet engine
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import xlsxwriter  # noqa: F401 - only needed as a pandas ExcelWriter engine
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
 
 # Set up logging
 logging.basicConfig(
@@ -39,6 +64,86 @@ def create_output_directory():
     output_dir.mkdir(exist_ok=True)
     return output_dir
 
+def _trim_row(row):
+    """Drop trailing empty cells from a worksheet row."""
+    end = len(row)
+    while end and row[end - 1] is None:
+        end -= 1
+    return row[:end]
+
+def _header_row(rows):
+    """
+    Consume rows up to and including the header, the first non-blank row.
+    
+    Returns the header without trailing empty cells, or () for a blank sheet.
+    """
+    for row in rows:
+        header = _trim_row(row)
+        if header:
+            return header
+    return ()
+
+def _header_names(row):
+    """
+    Column names for a header row, named the way pandas.read_excel names them.
+    
+    Empty cells become 'Unnamed: <position>' and repeated names get '.1', '.2', ...
+    """
+    names = []
+    seen = Counter()
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else value
+        if seen[name]:
+            deduped = f"{name}.{seen[name]}"
+            seen[name] += 1
+            name = deduped
+        seen[name] += 1
+        names.append(name)
+    return names
+
+def _calamine_cell(value):
+    """
+    Convert a calamine cell to what openpyxl returns for it.
+    
+    Calamine reports blank cells as '', every number as a float and
+    midnight timestamps as plain dates.
+    """
+    if value == '':
+        return None
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+def _open_workbook(file_path):
+    """
+    Open a workbook for a single streaming read of its sheets.
+    
+    Uses the Rust calamine parser when python-calamine is installed, and
+    openpyxl in read-only mode otherwise.
+    
+    Returns:
+    --------
+    tuple: (workbook, sheet_names, sheet_rows)
+        The open workbook (close it when done), its sheet names, and a
+        function returning an iterator of row tuples for a sheet name.
+    """
+    if CALAMINE_AVAILABLE:
+        workbook = CalamineWorkbook.from_path(str(file_path))
+        sheets = {}
+        
+        def sheet_rows(sheet):
+            # Each sheet is decoded once, even though the header is read twice
+            if sheet not in sheets:
+                sheets[sheet] = workbook.get_sheet_by_name(sheet).to_python(skip_empty_area=False)
+            return (tuple(map(_calamine_cell, row)) for row in sheets[sheet])
+        
+        return workbook, workbook.sheet_names, sheet_rows
+    
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    return workbook, workbook.sheetnames, lambda sheet: workbook[sheet].iter_rows(values_only=True)
+
 def load_mws_excel_files(file_path):
     """
     Load and parse MWS Statement of Account Excel files.
@@ -56,31 +161,38 @@ def load_mws_excel_files(file_path):
     try:
         logger.info(f"Loading MWS file from {file_path}")
         
-        # Read all sheets to identify the main data sheet
-        excel_file = pd.ExcelFile(file_path)
-        sheet_names = excel_file.sheet_names
-        logger.info(f"Found {len(sheet_names)} sheets: {sheet_names}")
-        
-        # Look for the main data sheet - typically it has many columns and is not named "Sheet1"
-        main_sheet = None
-        max_columns = 0
-        
-        for sheet in sheet_names:
-            # Read first row to get column count
-            df_sample = pd.read_excel(file_path, sheet_name=sheet, nrows=1)
-            col_count = len(df_sample.columns)
+        # Open the workbook once in streaming mode; every sheet is read from this
+        # single pass over the file instead of re-parsing it per sheet
+        workbook, sheet_names, sheet_rows = _open_workbook(file_path)
+        try:
+            logger.info(f"Found {len(sheet_names)} sheets: {sheet_names}")
             
-            if col_count > max_columns:
-                max_columns = col_count
-                main_sheet = sheet
-        
-        if not main_sheet:
-            main_sheet = sheet_names[0]  # Default to first sheet if no suitable sheet found
+            # Look for the main data sheet - typically it has many columns and is not named "Sheet1"
+            main_sheet = None
+            max_columns = 0
             
-        logger.info(f"Selected main data sheet: {main_sheet} with {max_columns} columns")
-        
-        # Read the main data sheet
-        rejection_data = pd.read_excel(file_path, sheet_name=main_sheet)
+            for sheet in sheet_names:
+                # Read the header row to get column count
+                col_count = len(_header_row(sheet_rows(sheet)))
+                
+                if col_count > max_columns:
+                    max_columns = col_count
+                    main_sheet = sheet
+            
+            if not main_sheet:
+                main_sheet = sheet_names[0]  # Default to first sheet if no suitable sheet found
+                
+            logger.info(f"Selected main data sheet: {main_sheet} with {max_columns} columns")
+            
+            # Read the main data sheet
+            rows = sheet_rows(main_sheet)
+            header = _header_names(_header_row(rows))
+            width = len(header)
+            rejection_data = pd.DataFrame.from_records(
+                [row[:width] + (None,) * (width - len(row)) for row in rows], columns=header
+            )
+        finally:
+            workbook.close()
         
         # Clean column names - strip whitespace and ensure consistent naming
         rejection_data.columns = [str(col).strip().replace(' ', '_') for col in rejection_data.columns]
@@ -95,10 +207,13 @@ def load_mws_excel_files(file_path):
         if 'Exceed_Price' in rejection_data.columns:
             rejection_data['Exceed_Price'] = pd.to_numeric(rejection_data['Exceed_Price'], errors='coerce')
         
-        # Ensure all string columns are string type
-        for col in rejection_data.columns:
-            if rejection_data[col].dtype == 'object':
-                rejection_data[col] = rejection_data[col].astype(str).replace('nan', '')
+        # Ensure all string columns are string type, in one conversion over all
+        # object columns (Arrow-backed when pyarrow is installed); missing
+        # values become empty strings
+        object_cols = rejection_data.select_dtypes(include=['object', 'string']).columns
+        if len(object_cols):
+            string_dtype = 'string[pyarrow]' if PYARROW_AVAILABLE else 'string'
+            rejection_data[object_cols] = rejection_data[object_cols].astype(string_dtype).fillna('')
         
         logger.info(f"Successfully loaded data with {len(rejection_data)} records and {len(rejection_data.columns)} columns")
         
@@ -111,6 +226,20 @@ def load_mws_excel_files(file_path):
         logger.error(f"Error loading MWS file: {str(e)}")
         return pd.DataFrame()
 
+# Pattern for ICD-10 codes (letter followed by numbers and possibly decimal)
+_DX_RE = re.compile(r'([A-Z]\d+(?:\.\d+)?)')
+
+# Patterns for medication codes (looking for various formats found in the data).
+# Each one is matched over the whole text on its own, so a code picked up by two
+# patterns (e.g. "Medication 12345") is reported by both, as before
+_MED_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'Medication\s+([0-9A-Z\-]+)',  # Standard "Medication CODE" format
+    r'requested drug\s*:\s*(\d+)',  # Format like "Requested drug : 2501233168"
+    r'drug code\s*:\s*([A-Z0-9]+)', # "Drug code: ABC123" format
+    r'NDC\s*:?\s*([0-9\-]+)',       # NDC code format
+    r'([0-9]{4,})'                  # Any sequence of 4+ digits that might be a drug code
+))
+
 def extract_diagnosis_codes(reason_text):
     """
     Extract diagnosis codes from rejection reason text.
@@ -128,13 +257,8 @@ def extract_diagnosis_codes(reason_text):
     if not isinstance(reason_text, str) or pd.isna(reason_text) or reason_text == '':
         return []
     
-    # Pattern for ICD-10 codes (letter followed by numbers and possibly decimal)
-    pattern = r'([A-Z]\d+(?:\.\d+)?)'
-    
     # Find all matches
-    matches = re.findall(pattern, reason_text)
-    
-    return matches
+    return _DX_RE.findall(reason_text)
 
 def extract_medication_codes(reason_text):
     """
@@ -153,25 +277,82 @@ def extract_medication_codes(reason_text):
     if not isinstance(reason_text, str) or pd.isna(reason_text) or reason_text == '':
         return []
     
-    # Pattern for medication codes (looking for various formats found in the data)
-    patterns = [
-        r'Medication\s+([0-9A-Z\-]+)',  # Standard "Medication CODE" format
-        r'requested drug\s*:\s*(\d+)',  # Format like "Requested drug : 2501233168"
-        r'drug code\s*:\s*([A-Z0-9]+)', # "Drug code: ABC123" format
-        r'NDC\s*:?\s*([0-9\-]+)',       # NDC code format
-        r'([0-9]{4,})'                  # Any sequence of 4+ digits that might be a drug code
-    ]
-    
-    # Find all matches across all patterns
-    all_matches = []
-    for pattern in patterns:
-        matches = re.findall(pattern, reason_text, re.IGNORECASE)
-        all_matches.extend(matches)
+    # Find all matches across all patterns, filtering out false positives
+    # (very short codes, etc.)
+    return [match for regex in _MED_RES for match in regex.findall(reason_text) if len(match) >= 4]
+
+def _to_polars(rejection_data, columns):
+    """
+    Copy the given columns into a Polars frame for the group-by summaries.
     
-    # Filter out false positives (very short codes, etc.)
-    filtered_matches = [match for match in all_matches if len(match) >= 4]
+    Returns the pandas frame itself when Polars is unavailable or a column
+    cannot be converted (e.g. mixed-type object columns).
+    """
+    if not POLARS_AVAILABLE:
+        return rejection_data
+    try:
+        # Built column by column so string columns convert without pyarrow
+        series = []
+        for col in dict.fromkeys(columns):
+            if pd.api.types.is_numeric_dtype(rejection_data[col]):
+                series.append(pl.Series(col, rejection_data[col].to_numpy(), nan_to_null=True))
+            else:
+                series.append(pl.Series(col, rejection_data[col].to_numpy(dtype=object, na_value=None)))
+        return pl.DataFrame(series)
+    except Exception as e:
+        logger.info(f"Using pandas for group-by summaries: {str(e)}")
+        return rejection_data
+
+def _head_records(frame, n):
+    """First n rows (all rows when n is None) of a sorted pandas or Polars frame, as records."""
+    if n is not None:
+        frame = frame.head(n)
+    if POLARS_AVAILABLE and isinstance(frame, pl.DataFrame):
+        return frame.to_dicts()
+    return frame.to_dict('records')
+
+def _top_group_counts(data, by, count_name, n):
+    """Top n groups of `by` by number of rows, as records (pandas or Polars frame)."""
+    if POLARS_AVAILABLE and isinstance(data, pl.DataFrame):
+        counts = data.drop_nulls(by).group_by(by).len(name=count_name).sort(count_name, descending=True)
+    else:
+        counts = data.groupby(by).size().reset_index(name=count_name)
+        counts = counts.sort_values(count_name, ascending=False)
+    return _head_records(counts, n)
+
+def _top_group_sums(data, by, value_col, n):
+    """Top n groups of `by` by total of value_col, as records (pandas or Polars frame)."""
+    if POLARS_AVAILABLE and isinstance(data, pl.DataFrame):
+        sums = data.drop_nulls(by).group_by(by).agg(pl.col(value_col).sum()).sort(value_col, descending=True)
+    else:
+        sums = data.groupby(by)[value_col].sum().reset_index()
+        sums = sums.sort_values(value_col, ascending=False)
+    return _head_records(sums, n)
+
+def _detect_column_roles(columns):
+    """
+    Map each analysis role to the first column whose name matches it.
     
-    return filtered_matches
+    Roles are 'reason', 'doctor', 'service' (a description column, not an id
+    or code), 'any_service' (fallback), 'service_code' and 'rejected_amount'.
+    Roles with no matching column are left out.
+    """
+    roles = {}
+    for col in columns:
+        name = col.lower()
+        if 'reason' in name:
+            roles.setdefault('reason', col)
+        if 'doctor' in name or 'provider' in name:
+            roles.setdefault('doctor', col)
+        if 'service' in name:
+            roles.setdefault('any_service', col)
+            if 'id' not in name and 'code' not in name:
+                roles.setdefault('service', col)
+        if ('service' in name and 'code' in name) or 'cpt' in name or 'hcpcs' in name:
+            roles.setdefault('service_code', col)
+        if 'reject' in name and ('amount' in name or 'price' in name or 'cost' in name):
+            roles.setdefault('rejected_amount', col)
+    return roles
 
 def analyze_rejections(rejection_data):
     """
@@ -194,60 +375,35 @@ def analyze_rejections(rejection_data):
     analysis_results = {}
     
     try:
-        # Check for Reason column
-        reason_col = None
-        for col in rejection_data.columns:
-            if 'reason' in col.lower():
-                reason_col = col
-                break
+        # Find the column for each role in one pass over the column names
+        roles = _detect_column_roles(rejection_data.columns)
         
+        # Check for Reason column
+        reason_col = roles.get('reason')
         if not reason_col:
             logger.warning("Could not find a 'Reason' column in the data")
             reason_col = 'Reason'  # Default name, may be empty
             
         # Provider/doctor column
-        doctor_col = None
-        for col in rejection_data.columns:
-            if 'doctor' in col.lower() or 'provider' in col.lower():
-                doctor_col = col
-                break
-        
+        doctor_col = roles.get('doctor')
         if not doctor_col:
             logger.warning("Could not find a doctor/provider column in the data")
             doctor_col = 'Doctor_Code'  # Default name based on sample data
         
         # Service column
-        service_col = None
-        for col in rejection_data.columns:
-            if 'service' in col.lower() and 'id' not in col.lower() and 'code' not in col.lower():
-                service_col = col
-                break
-        
+        service_col = roles.get('service')
         if not service_col:
             logger.warning("Could not find a service description column in the data")
-            for col in rejection_data.columns:
-                if 'service' in col.lower():
-                    service_col = col
-                    break
+            service_col = roles.get('any_service')
         
         # Service code column
-        service_code_col = None
-        for col in rejection_data.columns:
-            if ('service' in col.lower() and 'code' in col.lower()) or 'cpt' in col.lower() or 'hcpcs' in col.lower():
-                service_code_col = col
-                break
-        
+        service_code_col = roles.get('service_code')
         if not service_code_col:
             logger.warning("Could not find a service code column in the data")
             service_code_col = 'Service_Code'  # Default name based on sample data
         
         # Amount columns
-        rejected_amount_col = None
-        for col in rejection_data.columns:
-            if 'reject' in col.lower() and ('amount' in col.lower() or 'price' in col.lower() or 'cost' in col.lower()):
-                rejected_amount_col = col
-                break
-        
+        rejected_amount_col = roles.get('rejected_amount')
         if not rejected_amount_col:
             logger.warning("Could not find a rejected amount column in the data")
             rejected_amount_col = 'Rejected_Amount'  # Default name based on sample data
@@ -255,7 +411,7 @@ def analyze_rejections(rejection_data):
         # Process rejection reasons if the column exists
         if reason_col in rejection_data.columns:
             # Extract common rejection patterns
-            rejection_data['rejection_category'] = rejection_data[reason_col].apply(categorize_rejection)
+            rejection_data['rejection_category'] = categorize_series(rejection_data[reason_col])
             
             # Extract diagnosis codes from rejection reasons
             rejection_data['diagnosis_codes'] = rejection_data[reason_col].apply(extract_diagnosis_codes)
@@ -263,105 +419,99 @@ def analyze_rejections(rejection_data):
             # Extract medication codes from rejection reasons
             rejection_data['medication_codes'] = rejection_data[reason_col].apply(extract_medication_codes)
             
+        else:
+            logger.warning(f"Reason column '{reason_col}' not found in data")
+        
+        # Amounts are summed per group below, so coerce them before the summaries
+        if rejected_amount_col in rejection_data.columns:
+            if not pd.api.types.is_numeric_dtype(rejection_data[rejected_amount_col]):
+                rejection_data[rejected_amount_col] = pd.to_numeric(rejection_data[rejected_amount_col], errors='coerce')
+        
+        # Group-by summaries run on Polars when it is installed
+        summary_data = _to_polars(rejection_data, [
+            col for col in (doctor_col, service_col, service_code_col, rejected_amount_col, 'rejection_category')
+            if col in rejection_data.columns
+        ])
+        
+        if 'rejection_category' in rejection_data.columns:
             # Count rejection categories
-            rejection_categories = rejection_data['rejection_category'].value_counts().reset_index()
-            rejection_categories.columns = ['rejection_category', 'count']
-            analysis_results['rejection_categories'] = rejection_categories.to_dict('records')
+            rejection_categories = _top_group_counts(summary_data, 'rejection_category', 'count', None)
+            analysis_results['rejection_categories'] = rejection_categories
             
             # Top 5 rejection categories
-            top_rejections = rejection_categories.head(5).to_dict('records')
+            top_rejections = rejection_categories[:5]
             analysis_results['top_5_rejection_trends'] = top_rejections
-        else:
-            logger.warning(f"Reason column '{reason_col}' not found in data")
         
         # Doctor/provider analysis
         if doctor_col in rejection_data.columns:
             # Group by doctor and count rejections
-            doctor_rejections = rejection_data.groupby(doctor_col).size().reset_index(name='rejection_count')
-            doctor_rejections = doctor_rejections.sort_values('rejection_count', ascending=False)
-            analysis_results['rejections_by_doctor'] = doctor_rejections.head(10).to_dict('records')
+            analysis_results['rejections_by_doctor'] = _top_group_counts(
+                summary_data, doctor_col, 'rejection_count', 10
+            )
             
             # Doctors with rejection categories
             if 'rejection_category' in rejection_data.columns:
-                doctor_categories = rejection_data.groupby([doctor_col, 'rejection_category']).size().reset_index(name='count')
-                doctor_categories = doctor_categories.sort_values('count', ascending=False)
-                analysis_results['doctor_rejection_categories'] = doctor_categories.head(20).to_dict('records')
+                analysis_results['doctor_rejection_categories'] = _top_group_counts(
+                    summary_data, [doctor_col, 'rejection_category'], 'count', 20
+                )
         else:
             logger.warning(f"Doctor column '{doctor_col}' not found in data")
         
         # Service analysis
         if service_col in rejection_data.columns:
             # Common rejected services
-            service_rejections = rejection_data.groupby(service_col).size().reset_index(name='rejection_count')
-            service_rejections = service_rejections.sort_values('rejection_count', ascending=False)
-            analysis_results['rejections_by_service'] = service_rejections.head(10).to_dict('records')
+            analysis_results['rejections_by_service'] = _top_group_counts(
+                summary_data, service_col, 'rejection_count', 10
+            )
         else:
             logger.warning(f"Service column '{service_col}' not found in data")
         
         # Service code analysis
         if service_code_col in rejection_data.columns:
             # Common rejected service codes
-            code_rejections = rejection_data.groupby(service_code_col).size().reset_index(name='rejection_count')
-            code_rejections = code_rejections.sort_values('rejection_count', ascending=False)
-            analysis_results['rejections_by_service_code'] = code_rejections.head(10).to_dict('records')
+            analysis_results['rejections_by_service_code'] = _top_group_counts(
+                summary_data, service_code_col, 'rejection_count', 10
+            )
         else:
             logger.warning(f"Service code column '{service_code_col}' not found in data")
         
         # Financial impact analysis
         if rejected_amount_col in rejection_data.columns:
-            # Convert to numeric if needed
-            if not pd.api.types.is_numeric_dtype(rejection_data[rejected_amount_col]):
-                rejection_data[rejected_amount_col] = pd.to_numeric(rejection_data[rejected_amount_col], errors='coerce')
-            
             # Total rejected amount
             total_rejected = rejection_data[rejected_amount_col].sum()
             analysis_results['total_rejected_amount'] = float(total_rejected)
             
             # Rejected amount by doctor
             if doctor_col in rejection_data.columns:
-                doctor_amounts = rejection_data.groupby(doctor_col)[rejected_amount_col].sum().reset_index()
-                doctor_amounts = doctor_amounts.sort_values(rejected_amount_col, ascending=False)
-                analysis_results['rejected_amounts_by_doctor'] = doctor_amounts.head(10).to_dict('records')
+                analysis_results['rejected_amounts_by_doctor'] = _top_group_sums(
+                    summary_data, doctor_col, rejected_amount_col, 10
+                )
             
             # Rejected amount by service code
             if service_code_col in rejection_data.columns:
-                code_amounts = rejection_data.groupby(service_code_col)[rejected_amount_col].sum().reset_index()
-                code_amounts = code_amounts.sort_values(rejected_amount_col, ascending=False)
-                analysis_results['rejected_amounts_by_service_code'] = code_amounts.head(10).to_dict('records')
+                analysis_results['rejected_amounts_by_service_code'] = _top_group_sums(
+                    summary_data, service_code_col, rejected_amount_col, 10
+                )
         else:
             logger.warning(f"Rejected amount column '{rejected_amount_col}' not found in data")
         
         # Diagnosis code analysis
         if 'diagnosis_codes' in rejection_data.columns:
-            # Extract all diagnosis codes
-            all_codes = []
-            for codes in rejection_data['diagnosis_codes']:
-                all_codes.extend(codes)
-            
-            # Count diagnosis codes
-            code_counts = Counter(all_codes)
-            diagnosis_counts = pd.DataFrame({
-                'diagnosis_code': list(code_counts.keys()),
-                'count': list(code_counts.values())
-            })
-            diagnosis_counts = diagnosis_counts.sort_values('count', ascending=False)
-            analysis_results['common_diagnosis_codes'] = diagnosis_counts.head(10).to_dict('records')
+            # Count diagnosis codes across all rows (rows without codes explode to NaN)
+            diagnosis_counts = (
+                rejection_data['diagnosis_codes'].explode().dropna().value_counts().head(10)
+                .rename_axis('diagnosis_code').reset_index(name='count')
+            )
+            analysis_results['common_diagnosis_codes'] = diagnosis_counts.to_dict('records')
         
         # Medication code analysis
         if 'medication_codes' in rejection_data.columns:
-            # Extract all medication codes
-            all_meds = []
-            for meds in rejection_data['medication_codes']:
-                all_meds.extend(meds)
-            
-            # Count medication codes
-            med_counts = Counter(all_meds)
-            medication_counts = pd.DataFrame({
-                'medication_code': list(med_counts.keys()),
-                'count': list(med_counts.values())
-            })
-            medication_counts = medication_counts.sort_values('count', ascending=False)
-            analysis_results['common_medication_codes'] = medication_counts.head(10).to_dict('records')
+            # Count medication codes across all rows (rows without codes explode to NaN)
+            medication_counts = (
+                rejection_data['medication_codes'].explode().dropna().value_counts().head(10)
+                .rename_axis('medication_code').reset_index(name='count')
+            )
+            analysis_results['common_medication_codes'] = medication_counts.to_dict('records')
         
         logger.info("Completed rejection analysis")
         return analysis_results
@@ -370,6 +520,31 @@ def analyze_rejections(rejection_data):
         logger.error(f"Error during rejection analysis: {str(e)}")
         return {}
 
+# Rejection categories in priority order: a reason gets the first category
+# with any keyword in its lowercased text
+REJECTION_CATEGORY_PATTERNS = {
+    'medication not indicated': ['medication', 'not indicated', 'diagnosis', 'requested drug'],
+    'quantity limits exceeded': ['quantity exceeds', 'exceed policy', 'quantity limit', 'dosage exceed'],
+    'missing documentation': ['missing', 'documentation', 'insufficient', 'incomplete'],
+    'non-covered service': ['non-covered', 'not covered', 'excluded', 'non covered', 'non-preferred'],
+    'coding error': ['coding', 'code', 'incorrect code'],
+    'duplicate claim': ['duplicate', 'already submitted', 'already approved', 'duplicate request'],
+    'authorization required': ['authorization', 'prior auth', 'pre-auth', 'not authorized'],
+    'patient eligibility': ['eligibility', 'not eligible', 'coverage', 'not active'],
+    'exceeds allowed amount': ['exceeds', 'allowed amount', 'price exceeds', 'exceed policy basic limit', 'cost exceed'],
+    'medical necessity': ['medical necessity', 'not medically necessary', 'clinically appropriate'],
+    'drug not on formulary': ['formulary', 'non-formulary', 'not on list', 'not in formulary'],
+    'step therapy required': ['step therapy', 'first line', 'try alternative', 'preferred alternative'],
+    'diagnosis restrictions': ['diagnosis restriction', 'not approved for diagnosis', 'indication']
+}
+
+# Escaped keyword alternation per category. Kept as pattern strings rather than
+# compiled regexes so Arrow-backed string columns can match them in C
+_CATEGORY_ALTERNATIONS = [
+    (category, '|'.join(map(re.escape, keywords)))
+    for category, keywords in REJECTION_CATEGORY_PATTERNS.items()
+]
+
 def categorize_rejection(reason_text):
     """
     Categorize rejection reasons into standard categories.
@@ -389,30 +564,51 @@ def categorize_rejection(reason_text):
     
     reason_lower = reason_text.lower()
     
-    # Define patterns and corresponding categories
-    patterns = {
-        'medication not indicated': ['medication', 'not indicated', 'diagnosis', 'requested drug'],
-        'quantity limits exceeded': ['quantity exceeds', 'exceed policy', 'quantity limit', 'dosage exceed'],
-        'missing documentation': ['missing', 'documentation', 'insufficient', 'incomplete'],
-        'non-covered service': ['non-covered', 'not covered', 'excluded', 'non covered', 'non-preferred'],
-        'coding error': ['coding', 'code', 'incorrect code'],
-        'duplicate claim': ['duplicate', 'already submitted', 'already approved', 'duplicate request'],
-        'authorization required': ['authorization', 'prior auth', 'pre-auth', 'not authorized'],
-        'patient eligibility': ['eligibility', 'not eligible', 'coverage', 'not active'],
-        'exceeds allowed amount': ['exceeds', 'allowed amount', 'price exceeds', 'exceed policy basic limit', 'cost exceed'],
-        'medical necessity': ['medical necessity', 'not medically necessary', 'clinically appropriate'],
-        'drug not on formulary': ['formulary', 'non-formulary', 'not on list', 'not in formulary'],
-        'step therapy required': ['step therapy', 'first line', 'try alternative', 'preferred alternative'],
-        'diagnosis restrictions': ['diagnosis restriction', 'not approved for diagnosis', 'indication']
-    }
-    
     # Check for matches
-    for category, keywords in patterns.items():
+    for category, keywords in REJECTION_CATEGORY_PATTERNS.items():
         if any(keyword in reason_lower for keyword in keywords):
             return category
     
     return "Other"
 
+def categorize_series(reasons):
+    """
+    Categorize a whole column of rejection reasons.
+    
+    Same result as reasons.apply(categorize_rejection), but each distinct
+    reason is categorized once, and each category's pattern runs over the
+    whole column of still-uncategorized reasons instead of row by row.
+    
+    Parameters:
+    -----------
+    reasons : Series
+        The rejection reason texts.
+        
+    Returns:
+    --------
+    Series: categories
+        The category per row, aligned with reasons.
+    """
+    values = reasons.to_numpy(dtype=object)
+    categories = np.full(len(values), "Unknown", dtype=object)
+    is_text = np.fromiter((type(v) is str and v != '' for v in values), dtype=bool, count=len(values))
+    positions = np.flatnonzero(is_text)
+    
+    # Reason texts repeat heavily, so categorize the distinct ones
+    codes, uniques = pd.factorize(values[positions])
+    unique_categories = np.full(len(uniques), "Other", dtype=object)
+    pending = pd.Series(uniques, dtype='str').str.lower()
+    
+    for category, pattern in _CATEGORY_ALTERNATIONS:
+        if pending.empty:
+            break
+        hits = pending.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        unique_categories[pending.index[hits]] = category
+        pending = pending[~hits]
+    
+    categories[positions] = unique_categories[codes]
+    return pd.Series(categories, index=reasons.index)
+
 def generate_resolution_suggestions(rejection_category):
     """
     Generate actionable suggestions based on rejection category.
@@ -502,9 +698,22 @@ def generate_resolution_suggestions(rejection_category):
     # Return suggestions for the category, or default if not found
     return suggestion_map.get(rejection_category.lower(), default_suggestions)
 
-def generate_reports(analysis_results, output_dir=None, filename_prefix='claim_analysis'):
+def _report_writer(path):
     """
-    Generate Excel and TXT reports with analysis results.
+    Open an ExcelWriter that streams rows to disk when xlsxwriter is installed.
+    
+    In constant_memory mode each row is flushed as soon as the next one starts,
+    so sheets must be written top to bottom and cells cannot be edited after
+    the fact. Falls back to the in-memory openpyxl engine otherwise.
+    """
+    if XLSXWRITER_AVAILABLE:
+        return pd.ExcelWriter(path, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}})
+    return pd.ExcelWriter(path, engine='openpyxl')
+
+def generate_reports(analysis_results, output_dir=None, filename_prefix='claim_analysis', write_parquet=True):
+    """
+    Generate Excel and TXT reports with analysis results, plus one Parquet
+    file per analysis table for downstream tools.
     
     Parameters:
     -----------
@@ -514,15 +723,17 @@ def generate_reports(analysis_results, output_dir=None, filename_prefix='claim_a
         Directory to save the reports.
     filename_prefix : str, optional
         Prefix for the output filenames.
+    write_parquet : bool, optional
+        Also write the analysis tables as Parquet (requires pyarrow).
         
     Returns:
     --------
-    tuple: (excel_report_path, txt_report_path)
-        Paths to the generated report files.
+    tuple: (excel_report_path, txt_report_path, parquet_dir)
+        Paths to the generated report files and the Parquet table directory.
     """
     if not analysis_results:
         logger.error("Cannot generate reports from empty analysis results")
-        return None, None
+        return None, None, None
     
     if output_dir is None:
         output_dir = create_output_directory()
@@ -535,8 +746,11 @@ def generate_reports(analysis_results, output_dir=None, filename_prefix='claim_a
     txt_report_path = output_dir / f"{filename_prefix}_{timestamp}.txt"
     
     # --- Generate Excel Report ---
+    # Sheets are written one after another into a single workbook: each holds
+    # at most a few dozen rows, and the Excel engines are pure Python, so
+    # writing per-sheet files in threads and merging them costs more than it saves
     try:
-        with pd.ExcelWriter(excel_report_path, engine='openpyxl') as writer:
+        with _report_writer(excel_report_path) as writer:
             # Sheet 1: Executive Summary
             summary_data = []
             
@@ -705,13 +919,38 @@ def generate_reports(analysis_results, output_dir=None, filename_prefix='claim_a
         logger.error(f"Error generating TXT report: {str(e)}")
         txt_report_path = None # Ensure path is None if generation failed
 
+    # --- Generate Parquet tables ---
+    parquet_dir = None
+    if write_parquet and PYARROW_AVAILABLE:
+        try:
+            parquet_dir = output_dir / f"{filename_prefix}_{timestamp}_parquet"
+            parquet_dir.mkdir(exist_ok=True)
+            
+            # One file per record table, e.g. rejections_by_doctor.parquet
+            for name, records in analysis_results.items():
+                if isinstance(records, list):
+                    pd.DataFrame(records).to_parquet(
+                        parquet_dir / f"{name}.parquet", engine='pyarrow', compression='zstd', index=False)
+            
+            logger.info(f"Successfully generated Parquet tables in {parquet_dir}")
+            
+        except Exception as e:
+            logger.error(f"Error generating Parquet tables: {str(e)}")
+            parquet_dir = None
+    elif write_parquet:
+        logger.info("pyarrow is not installed, skipping Parquet tables")
+
     # Generate charts (outside the try blocks for reports)
     try:
         generate_charts(analysis_results, output_dir, filename_prefix)
     except Exception as e:
         logger.error(f"Error during chart generation step: {str(e)}")
 
-    return str(excel_report_path) if excel_report_path else None, str(txt_report_path) if txt_report_path else None
+    return (
+        str(excel_report_path) if excel_report_path else None,
+        str(txt_report_path) if txt_report_path else None,
+        str(parquet_dir) if parquet_dir else None
+    )
 
 def generate_charts(analysis_results, output_dir, filename_prefix):
     """
@@ -737,7 +976,7 @@ def generate_charts(analysis_results, output_dir, filename_prefix):
         # Chart 1: Rejection Categories Pie Chart
         if 'rejection_categories' in analysis_results:
             plt.figure(figsize=(10, 6))
-            data = pd.DataFrame(analysis_results['rejection_categories']).head(5)
+            data = pd.DataFrame(analysis_results['rejection_categories'][:5])
             
             plt.pie(data['count'], labels=data['rejection_category'], autopct='%1.1f%%', 
                    shadow=True, startangle=90)
@@ -753,7 +992,7 @@ def generate_charts(analysis_results, output_dir, filename_prefix):
         # Chart 2: Top Doctors Bar Chart
         if 'rejections_by_doctor' in analysis_results:
             plt.figure(figsize=(12, 6))
-            data = pd.DataFrame(analysis_results['rejections_by_doctor']).head(10)
+            data = pd.DataFrame(analysis_results['rejections_by_doctor'][:10])
             
             # Get the doctor column name (first column)
             doctor_col = data.columns[0]
@@ -772,7 +1011,7 @@ def generate_charts(analysis_results, output_dir, filename_prefix):
         # Chart 3: Financial Impact by Service Code
         if 'rejected_amounts_by_service_code' in analysis_results:
             plt.figure(figsize=(12, 6))
-            data = pd.DataFrame(analysis_results['rejected_amounts_by_service_code']).head(10)
+            data = pd.DataFrame(analysis_results['rejected_amounts_by_service_code'][:10])
             
             # Get the service code column name (first column)
             service_col = data.columns[0]
@@ -1303,7 +1542,7 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         # Chart 1: Enhanced Pareto Chart of Rejection Categories
         if 'rejection_categories' in analysis_results:
             plt.figure(figsize=(12, 7))
-            data = pd.DataFrame(analysis_results['rejection_categories']).head(10)
+            data = pd.DataFrame(analysis_results['rejection_categories'][:10])
             
             # Sort by count in descending order
             data = data.sort_values('count', ascending=False)
@@ -1348,8 +1587,8 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         if ('rejected_amounts_by_doctor' in analysis_results and 
             'rejected_amounts_by_service_code' in analysis_results):
             
-            doctor_data = pd.DataFrame(analysis_results['rejected_amounts_by_doctor']).head(8)
-            service_data = pd.DataFrame(analysis_results['rejected_amounts_by_service_code']).head(8)
+            doctor_data = pd.DataFrame(analysis_results['rejected_amounts_by_doctor'][:8])
+            service_data = pd.DataFrame(analysis_results['rejected_amounts_by_service_code'][:8])
             
             # Get column names
             doctor_col = doctor_data.columns[0]
@@ -1394,7 +1633,7 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         # Chart 3: Rejection Category Distribution Pie Chart with Exploded Slices
         if 'rejection_categories' in analysis_results:
             plt.figure(figsize=(10, 8))
-            data = pd.DataFrame(analysis_results['rejection_categories']).head(6)
+            data = pd.DataFrame(analysis_results['rejection_categories'][:6])
             
             # Prepare data
             labels = data['rejection_category']
@@ -1433,7 +1672,7 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         # Top left: Rejection Categories
         if 'rejection_categories' in analysis_results:
             ax1 = plt.subplot(gs[0, 0])
-            data = pd.DataFrame(analysis_results['rejection_categories']).head(5)
+            data = pd.DataFrame(analysis_results['rejection_categories'][:5])
             
             bars = ax1.bar(data['rejection_category'], data['count'], color='steelblue')
             ax1.set_title('Top Rejection Categories', fontsize=12)
@@ -1449,7 +1688,7 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         # Top right: Doctor Analysis
         if 'rejections_by_doctor' in analysis_results:
             ax2 = plt.subplot(gs[0, 1])
-            data = pd.DataFrame(analysis_results['rejections_by_doctor']).head(5)
+            data = pd.DataFrame(analysis_results['rejections_by_doctor'][:5])
             
             # Get the doctor column name (first column)
             doctor_col = data.columns[0]
@@ -1467,7 +1706,7 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         # Bottom left: Service Analysis
         if 'rejections_by_service' in analysis_results:
             ax3 = plt.subplot(gs[1, 0])
-            data = pd.DataFrame(analysis_results['rejections_by_service']).head(5)
+            data = pd.DataFrame(analysis_results['rejections_by_service'][:5])
             
             # Get the service column name (first column)
             service_col = data.columns[0]
@@ -1486,7 +1725,7 @@ def generate_advanced_visualizations(analysis_results, output_dir, filename_pref
         # Bottom right: Financial Impact
         if 'rejected_amounts_by_service_code' in analysis_results:
             ax4 = plt.subplot(gs[1, 1])
-            data = pd.DataFrame(analysis_results['rejected_amounts_by_service_code']).head(5)
+            data = pd.DataFrame(analysis_results['rejected_amounts_by_service_code'][:5])
             
             # Get the service code column name (first column)
             service_col = data.columns[0]
@@ -1590,7 +1829,7 @@ def process_high_rejection_drs_format(file_path):
             # Extract diagnosis codes and categorize rejections
             processed_data['diagnosis_codes'] = processed_data['Reason'].apply(extract_diagnosis_codes)
             processed_data['medication_codes'] = processed_data['Reason'].apply(extract_medication_codes)
-            processed_data['rejection_category'] = processed_data['Reason'].apply(categorize_rejection)
+            processed_data['rejection_category'] = categorize_series(processed_data['Reason'])
             
             logger.info(f"Successfully processed data into {len(processed_data)} structured records")
             logger.info(f"Created columns: {processed_data.columns.tolist()}")
@@ -1667,7 +1906,7 @@ def main():
         
         # Generate standard reports (Excel and TXT)
         logger.info("Generating standard reports...")
-        excel_report_path, txt_report_path = generate_reports(analysis_results, output_dir)
+        excel_report_path, txt_report_path, parquet_dir = generate_reports(analysis_results, output_dir)
         
         if excel_report_path:
             logger.info(f"Excel report generated successfully: {excel_report_path}")
@@ -1679,6 +1918,9 @@ def main():
         else:
             logger.error("Failed to generate TXT report")
         
+        if parquet_dir:
+            logger.info(f"Parquet tables generated successfully: {parquet_dir}")
+        
         # Generate advanced visualizations
         logger.info("Generating advanced visualizations...")
         generate_advanced_visualizations(analysis_results, output_dir, "advanced")
@@ -1710,6 +1952,8 @@ def main():
         print(f"Output files have been saved to: {output_dir}")
         print(f"Excel Report: {os.path.basename(excel_report_path) if excel_report_path else 'Failed to generate'}")
         print(f"Text Report: {os.path.basename(txt_report_path) if txt_report_path else 'Failed to generate'}")
+        if parquet_dir:
+            print(f"Parquet Tables: {os.path.basename(parquet_dir)}")
         print(f"Advanced Insights: {os.path.basename(insights_path) if insights_path else 'Failed to generate'}")
         print(f"Training Materials: {os.path.basename(training_path) if training_path else 'Failed to generate'}")
         print("="*80)
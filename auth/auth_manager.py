@@ -2,17 +2,61 @@
 NPHIES Authentication Manager
 Handles authentication and session management for NPHIES API
 """
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Tuple
+import ssl
+from typing import Optional, Dict, Tuple, Union
 from pathlib import Path
+import httpx
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from config.settings import settings
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/fhir+json",
+    "Accept": "application/fhir+json",
+    "User-Agent": "NPHIES-Python-Client/1.0"
+}
+
+
+def encode_body(data: Union[Dict, bytes]) -> bytes:
+    """
+    Serialize a request body to compact UTF-8 JSON bytes
+    
+    Uses orjson when available. Bytes are passed through unchanged, so a
+    body serialized once can be resent on every retry.
+    
+    Args:
+        data: Request body data or an already encoded body
+        
+    Returns:
+        Encoded request body
+    """
+    if isinstance(data, bytes):
+        return data
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 
 class AuthenticationManager:
     """Manages authentication for NPHIES API requests"""
@@ -29,7 +73,7 @@ class AuthenticationManager:
         retry_strategy = Retry(
             total=settings.MAX_RETRIES,
             backoff_factor=settings.RETRY_DELAY,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=RETRY_STATUS_CODES,
             allowed_methods=["GET", "POST", "PUT", "DELETE"]
         )
         
@@ -38,11 +82,7 @@ class AuthenticationManager:
         self.session.mount("https://", adapter)
         
         # Set default headers
-        self.session.headers.update({
-            "Content-Type": "application/fhir+json",
-            "Accept": "application/fhir+json",
-            "User-Agent": "NPHIES-Python-Client/1.0"
-        })
+        self.session.headers.update(DEFAULT_HEADERS)
         
         # Configure certificates for production
         if settings.use_certificates:
@@ -96,7 +136,7 @@ class AuthenticationManager:
         self, 
         method: str, 
         url: str, 
-        data: Optional[Dict] = None,
+        data: Optional[Union[Dict, bytes]] = None,
         params: Optional[Dict] = None,
         additional_headers: Optional[Dict] = None
     ) -> requests.Response:
@@ -106,7 +146,7 @@ class AuthenticationManager:
         Args:
             method: HTTP method (GET, POST, etc.)
             url: Request URL
-            data: Request body data
+            data: Request body data or an already encoded body
             params: Query parameters
             additional_headers: Additional headers to include
             
@@ -127,7 +167,7 @@ class AuthenticationManager:
             response = self.session.request(
                 method=method,
                 url=url,
-                json=data,
+                data=encode_body(data) if data is not None else None,
                 params=params,
                 headers=headers,
                 timeout=settings.REQUEST_TIMEOUT
@@ -154,7 +194,7 @@ class AuthenticationManager:
             logger.error(f"Unexpected error during request: {str(e)}")
             raise
     
-    def post(self, url: str, data: Dict, **kwargs) -> requests.Response:
+    def post(self, url: str, data: Union[Dict, bytes], **kwargs) -> requests.Response:
         """Make POST request"""
         return self.make_request("POST", url, data=data, **kwargs)
     
@@ -162,6 +202,94 @@ class AuthenticationManager:
         """Make GET request"""
         return self.make_request("GET", url, **kwargs)
     
+    def create_async_client(self) -> httpx.AsyncClient:
+        """
+        Create an HTTP/2 client for concurrent requests
+        
+        With HTTP/2 many in-flight requests multiplex over one TLS connection;
+        without the optional ``h2`` package the client falls back to pooled
+        HTTP/1.1 keep-alive connections. Up to ``settings.MAX_CONCURRENCY``
+        connections are opened, so one client should be reused across
+        batches. The caller is responsible for closing it.
+        
+        Returns:
+            Configured AsyncClient
+        """
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.MAX_CONCURRENCY,
+                max_keepalive_connections=max(1, settings.MAX_CONCURRENCY // 2)
+            ),
+            headers={
+                **DEFAULT_HEADERS,
+                **self.get_auth_headers()
+            },
+            timeout=settings.REQUEST_TIMEOUT,
+            verify=self._build_ssl_context() or True
+        )
+    
+    def _build_ssl_context(self) -> Optional[ssl.SSLContext]:
+        """Build an SSL context from the client certificate configured on the session"""
+        if not isinstance(self.session.cert, tuple):
+            return None
+        
+        cafile = self.session.verify if isinstance(self.session.verify, str) else None
+        context = ssl.create_default_context(cafile=cafile)
+        context.load_cert_chain(*self.session.cert)
+        return context
+    
+    async def post_async(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        data: Union[Dict, bytes]
+    ) -> Dict:
+        """
+        Make authenticated POST request with an async client
+        
+        Retries on the same status codes and with the same backoff as the
+        synchronous session.
+        
+        Args:
+            client: Client from create_async_client()
+            url: Request URL
+            data: Request body data or an already encoded body
+            
+        Returns:
+            Parsed JSON response
+            
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        # Encode once; every retry resends the same bytes
+        body = encode_body(data)
+        
+        for attempt in range(settings.MAX_RETRIES + 1):
+            retry = attempt < settings.MAX_RETRIES
+            
+            try:
+                logger.debug(f"Making async POST request to {url}")
+                
+                response = await client.post(url, content=body)
+                logger.debug(f"Response status: {response.status_code}")
+                
+                if response.status_code in RETRY_STATUS_CODES and retry:
+                    await asyncio.sleep(settings.RETRY_DELAY * 2 ** attempt)
+                    continue
+                
+                if response.status_code >= 400:
+                    logger.error(f"HTTP error {response.status_code}: {response.text}")
+                response.raise_for_status()
+                
+                return response.json()
+                
+            except httpx.TransportError as e:
+                if not retry:
+                    logger.error(f"Connection error: {str(e)}")
+                    raise
+                await asyncio.sleep(settings.RETRY_DELAY * 2 ** attempt)
+    
     def test_connection(self) -> Tuple[bool, str]:
         """
         Test connection to NPHIES API
@@ -1,6 +1,8 @@
 """
 NPHIES API Endpoints Configuration
 """
+import sys
+
 
 class NPHIESEndpoints:
     """NPHIES API Endpoint definitions"""
@@ -72,8 +74,23 @@ class NPHIESEndpoints:
         "predetermination": "predetermination"
     }
     
-    @staticmethod
-    def get_message_type(operation: str, is_request: bool = True) -> str:
+    # Intern the tag values so repeated comparisons and emitted Bundles share them
+    for _table in (OPERATIONS, MESSAGE_TYPES, RESOURCES, PRIORITIES, CLAIM_TYPES, USE_TYPES):
+        _table.update({k: sys.intern(v) for k, v in _table.items()})
+    del _table
+    
+    # Message type URLs keyed by operation, built once from MESSAGE_TYPES
+    _REQ_BY_OP = {
+        k.rsplit("_request", 1)[0]: v
+        for k, v in MESSAGE_TYPES.items() if k.endswith("_request")
+    }
+    _RESP_BY_OP = {
+        k.rsplit("_response", 1)[0]: v
+        for k, v in MESSAGE_TYPES.items() if k.endswith("_response")
+    }
+    
+    @classmethod
+    def get_message_type(cls, operation: str, is_request: bool = True) -> str:
         """
         Get message type URL for operation
         
@@ -84,14 +101,12 @@ class NPHIESEndpoints:
         Returns:
             Message type URL
         """
-        suffix = "_request" if is_request else "_response"
-        key = f"{operation}{suffix}"
-        return NPHIESEndpoints.MESSAGE_TYPES.get(key, "")
+        return (cls._REQ_BY_OP if is_request else cls._RESP_BY_OP).get(operation, "")
     
-    @staticmethod
-    def get_operation_code(operation: str) -> str:
+    @classmethod
+    def get_operation_code(cls, operation: str) -> str:
         """Get operation code for the given operation type"""
-        return NPHIESEndpoints.OPERATIONS.get(operation, "")
+        return cls.OPERATIONS.get(operation, "")
 
 
 # Global endpoints instance
@@ -3,12 +3,21 @@ MOH (Ministry of Health) Specific Rules and Configuration
 Based on RCM rejection data analysis showing MOH-specific patterns.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+import ast
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10; older interpreters get regular instances
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
 class MOHPriceListItem:
     """MOH price list item."""
     code: str
@@ -18,17 +27,85 @@ class MOHPriceListItem:
     expiry_date: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class MOHPerDiemRule:
     """MOH per diem rules."""
     facility_type: str
     per_diem_rate: float
     max_days: int
     requires_authorization_after: int
-    excluded_services: List[str]
+    excluded_services: Tuple[str, ...]
+    
+    def __post_init__(self):
+        object.__setattr__(self, "facility_type", sys.intern(self.facility_type))
+
+
+# Node types allowed in rule conditions
+_CONDITION_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Name, ast.Attribute, ast.Load, ast.Constant,
+)
+_CONDITION_KEYWORDS = re.compile(r"\b(AND|OR|NOT|IN)\b")
+
+
+class _ContextLookup(ast.NodeTransformer):
+    """Rewrite names and dotted paths into ctx["name"] lookups."""
+    
+    def _lookup(self, key: str, node: ast.AST) -> ast.AST:
+        key_node = ast.Constant(value=key)
+        if sys.version_info < (3, 9):
+            key_node = ast.Index(value=key_node)
+        lookup = ast.Subscript(
+            value=ast.Name(id="ctx", ctx=ast.Load()),
+            slice=key_node,
+            ctx=ast.Load()
+        )
+        return ast.copy_location(lookup, node)
+    
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        return self._lookup(node.id, node)
+    
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        # Walk a.b.c down to its root name; ast.unparse needs Python 3.9
+        parts = []
+        value = node
+        while isinstance(value, ast.Attribute):
+            parts.append(value.attr)
+            value = value.value
+        if not isinstance(value, ast.Name):
+            raise ValueError("Unsupported syntax in rule condition")
+        parts.append(value.id)
+        return self._lookup(".".join(reversed(parts)), node)
+
+
+def _compile_condition(expr: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile a rule condition into a predicate over a flat context dict.
+    
+    Conditions use AND/OR/NOT/IN keywords, comparisons, literals and
+    (dotted) variable names; dotted names are looked up as-is, e.g.
+    ctx["patient.identifier.system"].
+    
+    Args:
+        expr: Condition expression
+        
+    Returns:
+        Callable taking the context dict; raises KeyError when a variable
+        the condition needs is missing from the context
+    """
+    source = _CONDITION_KEYWORDS.sub(lambda m: m.group(1).lower(), expr)
+    tree = ast.parse(source, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _CONDITION_NODES):
+            raise ValueError(f"Unsupported syntax in rule condition: {expr}")
+    
+    tree = ast.fix_missing_locations(_ContextLookup().visit(tree))
+    code = compile(tree, "<moh>", "eval")
+    return lambda ctx: bool(eval(code, {"__builtins__": {}}, {"ctx": ctx}))
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class MOHValidationRule:
     """MOH validation rule."""
     rule_id: str
@@ -36,6 +113,16 @@ class MOHValidationRule:
     condition: str
     severity: str  # "error", "warning"
     message: str
+    applies_when: Optional[str] = None  # precondition; the rule is skipped when it is false
+    _fn: Callable[[Dict[str, Any]], bool] = field(init=False, repr=False, compare=False)
+    _applies: Optional[Callable[[Dict[str, Any]], bool]] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "severity", sys.intern(self.severity))
+        object.__setattr__(self, "_fn", _compile_condition(self.condition))
+        object.__setattr__(
+            self, "_applies", _compile_condition(self.applies_when) if self.applies_when else None
+        )
 
 
 # MOH Per Diem Rates (Based on RCM analysis)
@@ -45,25 +132,32 @@ MOH_PER_DIEM_RATES = {
         per_diem_rate=1200.0,  # SAR
         max_days=30,
         requires_authorization_after=7,
-        excluded_services=["surgical_procedures", "icu_admission"]
+        excluded_services=("surgical_procedures", "icu_admission")
     ),
     "icu": MOHPerDiemRule(
         facility_type="icu",
         per_diem_rate=3500.0,  # SAR
         max_days=14,
         requires_authorization_after=3,
-        excluded_services=[]
+        excluded_services=()
     ),
     "private_room": MOHPerDiemRule(
         facility_type="private_room",
         per_diem_rate=2000.0,  # SAR
         max_days=21,
         requires_authorization_after=5,
-        excluded_services=["elective_procedures"]
+        excluded_services=("elective_procedures",)
     ),
 }
 
 
+# (max_days, requires_authorization_after, per_diem_rate) per facility type
+_PER_DIEM_LIMITS: Dict[str, Tuple[int, int, float]] = {
+    facility_type: (rule.max_days, rule.requires_authorization_after, rule.per_diem_rate)
+    for facility_type, rule in MOH_PER_DIEM_RATES.items()
+}
+
+
 # MOH Validation Rules
 MOH_VALIDATION_RULES = [
     MOHValidationRule(
@@ -92,7 +186,8 @@ MOH_VALIDATION_RULES = [
         description="Prior authorization required for stays > 7 days",
         condition="days_count > 7 AND authorization_present",
         severity="error",
-        message="Prior authorization required for extended stay"
+        message="Prior authorization required for extended stay",
+        applies_when="days_count > 7"
     ),
     MOHValidationRule(
         rule_id="MOH_005",
@@ -120,10 +215,24 @@ MOH_VALIDATION_RULES = [
         description="Discharge summary required for inpatient",
         condition="encounter_type == 'inpatient' AND discharge_summary_attached",
         severity="error",
-        message="Missing discharge summary for inpatient claim"
+        message="Missing discharge summary for inpatient claim",
+        applies_when="encounter_type == 'inpatient'"
     ),
 ]
 
+# Validation rule indexes, built once at import
+MOH_VALIDATION_RULES_BY_ID: Dict[str, MOHValidationRule] = {
+    rule.rule_id: rule for rule in MOH_VALIDATION_RULES
+}
+
+_rules_by_severity = defaultdict(list)
+for _rule in MOH_VALIDATION_RULES:
+    _rules_by_severity[_rule.severity].append(_rule)
+MOH_RULES_BY_SEVERITY: Dict[str, Tuple[MOHValidationRule, ...]] = {
+    severity: tuple(rules) for severity, rules in _rules_by_severity.items()
+}
+del _rules_by_severity, _rule
+
 
 # MOH Common Rejection Patterns (from RCM analysis)
 MOH_COMMON_REJECTIONS = {
@@ -207,12 +316,61 @@ MOH_SUBMISSION_REQUIREMENTS = {
     },
 }
 
+# Submission deadline in days per encounter type (after discharge for inpatient)
+_TIMING_BY_ENC: Dict[str, int] = {
+    encounter_type: requirements.get(
+        "max_submission_days_after_discharge" if encounter_type == "inpatient"
+        else "max_submission_days_after_service",
+        30
+    )
+    for encounter_type, requirements in MOH_SUBMISSION_REQUIREMENTS.items()
+}
+
+
+def get_moh_rule(rule_id: str) -> Optional[MOHValidationRule]:
+    """
+    Get MOH validation rule by ID.
+    
+    Args:
+        rule_id: Rule identifier (e.g. MOH_003)
+        
+    Returns:
+        Validation rule or None if not found
+    """
+    return MOH_VALIDATION_RULES_BY_ID.get(rule_id)
+
+
+def evaluate_rules(ctx: Dict[str, Any]) -> List[MOHValidationRule]:
+    """
+    Evaluate MOH validation rules against claim data.
+    
+    Rules whose variables are not all present in the context are skipped,
+    as are rules whose applies_when precondition does not hold.
+    
+    Args:
+        ctx: Flat mapping of condition variables (e.g. days_count,
+            "patient.identifier.system") to values
+        
+    Returns:
+        List of rules whose condition does not hold
+    """
+    failed = []
+    for rule in MOH_VALIDATION_RULES:
+        try:
+            if rule._applies is not None and not rule._applies(ctx):
+                continue
+            if not rule._fn(ctx):
+                failed.append(rule)
+        except KeyError:
+            continue
+    return failed
+
 
 def validate_moh_per_diem(
     facility_type: str,
     days_count: int,
     has_authorization: bool
-) -> tuple[bool, Optional[str]]:
+) -> Tuple[bool, Optional[str]]:
     """
     Validate MOH per diem requirements.
     
@@ -224,15 +382,17 @@ def validate_moh_per_diem(
     Returns:
         Tuple of (is_valid, error_message)
     """
-    rule = MOH_PER_DIEM_RATES.get(facility_type)
-    if not rule:
+    limits = _PER_DIEM_LIMITS.get(facility_type)
+    if limits is None:
         return False, f"Invalid facility type: {facility_type}"
     
-    if days_count > rule.max_days:
-        return False, f"Days ({days_count}) exceed maximum ({rule.max_days}) for {facility_type}"
+    max_days, auth_after, _ = limits
+    
+    if days_count > max_days:
+        return False, f"Days ({days_count}) exceed maximum ({max_days}) for {facility_type}"
     
-    if days_count > rule.requires_authorization_after and not has_authorization:
-        return False, f"Authorization required for stays exceeding {rule.requires_authorization_after} days"
+    if days_count > auth_after and not has_authorization:
+        return False, f"Authorization required for stays exceeding {auth_after} days"
     
     return True, None
 
@@ -248,17 +408,26 @@ def calculate_moh_per_diem_amount(facility_type: str, days_count: int) -> Option
     Returns:
         Total per diem amount or None if invalid
     """
-    rule = MOH_PER_DIEM_RATES.get(facility_type)
-    if not rule:
+    limits = _PER_DIEM_LIMITS.get(facility_type)
+    if limits is None:
         return None
     
-    if days_count > rule.max_days:
+    max_days, _, per_diem_rate = limits
+    
+    if days_count > max_days:
         return None
     
-    return rule.per_diem_rate * days_count
+    return per_diem_rate * days_count
 
 
-def get_moh_required_documents(encounter_type: str) -> List[str]:
+# Required documents per encounter type, as immutable tuples built once
+_REQUIRED_DOCUMENTS: Dict[str, Tuple[str, ...]] = {
+    encounter_type: tuple(requirements.get("required_documents", ()))
+    for encounter_type, requirements in MOH_SUBMISSION_REQUIREMENTS.items()
+}
+
+
+def get_moh_required_documents(encounter_type: str) -> Tuple[str, ...]:
     """
     Get required documents for MOH submission.
     
@@ -266,17 +435,16 @@ def get_moh_required_documents(encounter_type: str) -> List[str]:
         encounter_type: Type of encounter (inpatient, outpatient, emergency)
         
     Returns:
-        List of required documents
+        Tuple of required documents
     """
-    requirements = MOH_SUBMISSION_REQUIREMENTS.get(encounter_type, {})
-    return requirements.get("required_documents", [])
+    return _REQUIRED_DOCUMENTS.get(encounter_type, ())
 
 
 def validate_moh_submission_timing(
     encounter_type: str,
     service_date: datetime,
     submission_date: datetime
-) -> tuple[bool, Optional[str]]:
+) -> Tuple[bool, Optional[str]]:
     """
     Validate MOH submission timing requirements.
     
@@ -288,13 +456,10 @@ def validate_moh_submission_timing(
     Returns:
         Tuple of (is_valid, error_message)
     """
-    requirements = MOH_SUBMISSION_REQUIREMENTS.get(encounter_type)
-    if not requirements:
+    max_days = _TIMING_BY_ENC.get(encounter_type)
+    if max_days is None:
         return False, f"Invalid encounter type: {encounter_type}"
     
-    max_days_key = "max_submission_days_after_discharge" if encounter_type == "inpatient" else "max_submission_days_after_service"
-    max_days = requirements.get(max_days_key, 30)
-    
     days_difference = (submission_date - service_date).days
     
     if days_difference > max_days:
@@ -365,3 +530,49 @@ def get_moh_price_list_rate(procedure_code: str) -> Optional[float]:
     """
     item = MOH_PRICE_LIST.get(procedure_code)
     return item.unit_price if item else None
+
+
+# Price list in array form for vectorized checks. Unknown codes map to index -1,
+# which hits the trailing +inf sentinel and therefore always passes.
+_CODE_INDEX: Dict[str, int] = {code: i for i, code in enumerate(MOH_PRICE_LIST)}
+_UNIT_PRICES = np.append(
+    np.fromiter(
+        (item.unit_price for item in MOH_PRICE_LIST.values()),
+        dtype=np.float64,
+        count=len(MOH_PRICE_LIST)
+    ),
+    np.inf
+)
+
+
+def get_moh_allowed_prices(codes: Sequence[str]) -> np.ndarray:
+    """
+    Resolve MOH contracted unit prices for many procedure codes at once.
+    
+    Args:
+        codes: Procedure codes
+        
+    Returns:
+        float64 array of unit prices, +inf for codes not on the price list
+    """
+    idx = np.fromiter(
+        (_CODE_INDEX.get(code, -1) for code in codes),
+        dtype=np.int64,
+        count=len(codes)
+    )
+    return _UNIT_PRICES[idx]
+
+
+def validate_prices_bulk(codes: Sequence[str], amounts: Sequence[float]) -> np.ndarray:
+    """
+    Check claimed unit prices against the MOH price list (rule MOH_005).
+    
+    Args:
+        codes: Procedure codes, one per claim line
+        amounts: Claimed unit prices aligned with codes
+        
+    Returns:
+        Boolean array, True where the amount is within the contracted rate
+        or the code is not on the price list
+    """
+    return np.asarray(amounts, dtype=np.float64) <= get_moh_allowed_prices(codes)
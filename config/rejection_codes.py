@@ -273,6 +273,11 @@ REJECTION_CODES: Dict[str, RejectionCodeInfo] = {
     ),
 }
 
+# Codes eligible for automatic resubmission, for constant-time membership checks
+AUTO_RESUBMIT_CODES = frozenset(
+    code for code, info in REJECTION_CODES.items() if info.auto_resubmit
+)
+
 
 # Payer-specific rejection code mappings
 PAYER_REJECTION_MAPPINGS = {
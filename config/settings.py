@@ -85,6 +85,9 @@ class Settings:
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))
     ENABLE_ASYNC = os.getenv("ENABLE_ASYNC", "true").lower() == "true"
     PARALLEL_WORKERS = int(os.getenv("PARALLEL_WORKERS", "5"))
+    ENABLE_BULK_REQUESTS = os.getenv("ENABLE_BULK_REQUESTS", "false").lower() == "true"
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "50"))
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "64"))
     
     # Database Configuration
     DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/nphies_data.db")
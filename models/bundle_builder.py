@@ -188,6 +188,30 @@ class FHIRBundleBuilder:
             identifier_value: Organization identifier
             identifier_system: Identifier system URL
         """
+        self.add_resource(
+            self.build_organization(org_id, name, identifier_value, identifier_system)
+        )
+        return self
+    
+    @staticmethod
+    def build_organization(
+        org_id: str,
+        name: str = None,
+        identifier_value: str = None,
+        identifier_system: str = "http://nphies.sa/identifier/organization"
+    ) -> Dict:
+        """
+        Build an Organization resource
+        
+        Args:
+            org_id: Organization ID
+            name: Organization name
+            identifier_value: Organization identifier
+            identifier_system: Identifier system URL
+            
+        Returns:
+            Organization resource dictionary
+        """
         organization = {
             "resourceType": "Organization",
             "id": org_id,
@@ -202,8 +226,7 @@ class FHIRBundleBuilder:
                 build_identifier(identifier_system, identifier_value)
             ]
         
-        self.add_resource(organization)
-        return self
+        return organization
     
     def build(self) -> Dict:
         """
@@ -213,3 +236,33 @@ class FHIRBundleBuilder:
             Complete FHIR Bundle dictionary
         """
         return self.bundle
+    
+    @staticmethod
+    def build_batch(messages: List[Dict], bundle_type: str = "batch") -> Dict:
+        """
+        Wrap several message bundles into one batch/transaction Bundle
+        
+        Args:
+            messages: Complete message bundles (one per member/claim)
+            bundle_type: "batch" (independent entries) or "transaction"
+            
+        Returns:
+            FHIR Bundle whose entries each POST one message to $process-message
+        """
+        return {
+            "resourceType": "Bundle",
+            "id": generate_bundle_id(),
+            "type": bundle_type,
+            "timestamp": get_current_timestamp(),
+            "entry": [
+                {
+                    "fullUrl": f"urn:uuid:{message['id']}",
+                    "resource": message,
+                    "request": {
+                        "method": "POST",
+                        "url": endpoints.PROCESS_MESSAGE
+                    }
+                }
+                for message in messages
+            ]
+        }
@@ -9,6 +9,9 @@ from pathlib import Path
 import csv
 import json
 
+import numpy as np
+
+from config.moh_rules import MOH_VALIDATION_RULES_BY_ID, validate_prices_bulk
 from utils.logger import get_logger
 from utils.validators import NPHIESValidator
 
@@ -138,13 +141,19 @@ class NPHIESDataProcessor:
         
         return enriched
     
-    def validate_and_clean_batch(self, batch: List[Dict], batch_type: str) -> tuple:
+    def validate_and_clean_batch(
+        self,
+        batch: List[Dict],
+        batch_type: str,
+        check_moh_prices: bool = False
+    ) -> tuple:
         """
         Validate and clean batch data
         
         Args:
             batch: List of records to validate
             batch_type: Type of batch (eligibility, claims, authorization)
+            check_moh_prices: Check claim service prices against the MOH price list
             
         Returns:
             Tuple of (valid_records, invalid_records)
@@ -152,7 +161,11 @@ class NPHIESDataProcessor:
         valid = []
         invalid = []
         
-        for record in batch:
+        price_errors = {}
+        if batch_type == "claims" and check_moh_prices:
+            price_errors = self._find_moh_price_violations(batch)
+        
+        for idx, record in enumerate(batch):
             errors = []
             
             if batch_type == "eligibility":
@@ -192,6 +205,8 @@ class NPHIESDataProcessor:
                     errors.append("Missing total_amount")
                 elif not isinstance(record.get('total_amount'), (int, float)):
                     errors.append("total_amount must be numeric")
+                
+                errors.extend(price_errors.get(idx, []))
             
             # Add to appropriate list
             if errors:
@@ -203,6 +218,48 @@ class NPHIESDataProcessor:
         logger.info(f"Validation complete: {len(valid)} valid, {len(invalid)} invalid")
         return valid, invalid
     
+    def _find_moh_price_violations(self, batch: List[Dict]) -> Dict[int, List[str]]:
+        """
+        Check every service line in a claims batch against the MOH price list
+        in a single vectorized pass.
+        
+        Args:
+            batch: List of claim records
+            
+        Returns:
+            Mapping of record index to MOH_005 error messages, plus errors for
+            service lines that cannot be checked (not an object, non-numeric price)
+        """
+        violations = {}
+        owners, codes, amounts = [], [], []
+        for idx, record in enumerate(batch):
+            services = record.get('services')
+            if not isinstance(services, list):
+                continue
+            for service in services:
+                if not isinstance(service, dict):
+                    violations.setdefault(idx, []).append("Service lines must be objects")
+                    continue
+                
+                code = service.get('code') or service.get('service_code')
+                try:
+                    amount = float(service.get('unit_price', 0) or service.get('price', 0))
+                except (TypeError, ValueError):
+                    violations.setdefault(idx, []).append(f"Invalid unit_price for service {code}")
+                    continue
+                
+                owners.append(idx)
+                codes.append(code)
+                amounts.append(amount)
+        
+        within_limit = validate_prices_bulk(codes, amounts)
+        for line in np.flatnonzero(~within_limit):
+            violations.setdefault(owners[line], []).append(
+                f"{MOH_VALIDATION_RULES_BY_ID['MOH_005'].message}: {codes[line]}"
+            )
+        
+        return violations
+    
     def transform_claim_to_nphies_format(self, claim_data: Dict) -> Dict:
         """
         Transform internal claim format to NPHIES-compatible format
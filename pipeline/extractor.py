@@ -2,21 +2,195 @@
 Data Extraction Pipeline for NPHIES
 Orchestrates data extraction workflows
 """
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, asynccontextmanager
+import asyncio
 from datetime import datetime, timedelta
 import json
+import logging
+import threading
+import time
 from pathlib import Path
 
+import httpx
+
 from services.eligibility import EligibilityService
 from services.claims import ClaimsService
 from services.communication import CommunicationService
+from auth.auth_manager import auth_manager
 from config.settings import settings
 from utils.logger import get_logger
 from utils.helpers import format_date
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = get_logger("extractor")
 
 
+def _dumps(data: Any, pretty: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    
+    return json.dumps(data, indent=2 if pretty else None, ensure_ascii=False).encode("utf-8")
+
+
+class NDJSONSink:
+    """
+    Buffered newline-delimited JSON writer
+    
+    Opened once and shared across batch calls, so chunked extraction
+    appends to one stream instead of re-opening its output per chunk.
+    """
+    
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._f = open(self.path, "wb")
+    
+    def write(self, obj: Any):
+        """Write one JSON document as a line"""
+        self._f.write(_dumps(obj))
+        self._f.write(b"\n")
+    
+    def close(self):
+        """Flush and close the underlying file"""
+        self._f.close()
+    
+    def __enter__(self) -> "NDJSONSink":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class _BatchCollector:
+    """
+    Fold per-item outcomes of a batch into its summary
+    
+    Keeps the batch counters, records errors and per-kind stats on the
+    extractor, and streams results to an NDJSON sink (or keeps them in
+    ``data``). When the collector opens the sink itself from ``output_file``
+    it also closes it and writes the summary file on exit. Used as a context
+    manager by both the threaded and the asyncio batch methods.
+    """
+    
+    LABELS = {
+        "eligibility": ("member", "Eligibility"),
+        "claims": ("claim", "Claims")
+    }
+    
+    def __init__(
+        self,
+        extractor: "NPHIESDataExtractor",
+        kind: str,
+        total: int,
+        output_file: str = None,
+        sink: NDJSONSink = None
+    ):
+        self.extractor = extractor
+        self.kind = kind
+        self.label, self.title = self.LABELS[kind]
+        self.output_file = output_file
+        self.stats = extractor.results[kind]
+        self.results = {
+            "total": total,
+            "successful": 0,
+            "failed": 0
+        }
+        self.sink = sink
+        self.owns_sink = False
+        self.processed = 0
+        self.log_every = max(1, total // 20)
+        self.log_progress = logger.isEnabledFor(logging.INFO)
+    
+    def __enter__(self) -> "_BatchCollector":
+        self.start_ns = time.perf_counter_ns()
+        if self.sink is None and self.output_file:
+            self.sink = NDJSONSink(self.output_file)
+            self.owns_sink = True
+        
+        if self.sink is not None:
+            self.stats["file"] = self.results["output_file"] = self.sink.path
+        else:
+            self.results["data"] = []
+        return self
+    
+    def add(self, item: Dict, result: Optional[Dict], error: Optional[Exception]):
+        """Record the outcome of one item"""
+        self.processed += 1
+        total = self.results["total"]
+        if self.log_progress and (self.processed % self.log_every == 0 or self.processed == total):
+            logger.info("Processing %s %d/%d", self.label, self.processed, total)
+        
+        self.stats["count"] += 1
+        
+        if error is not None:
+            logger.error(f"Error processing {self._describe(item)}: {str(error)}")
+            self._record_failure(item, None, str(error))
+            return
+        
+        if result.get("success"):
+            self.results["successful"] += 1
+        else:
+            self._record_failure(item, result, result.get("error"))
+        
+        if self.sink is not None:
+            self.sink.write(result)
+        else:
+            self.results["data"].append(result)
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self.owns_sink:
+            self.sink.close()
+        
+        if exc is not None:
+            logger.error(f"Error in batch {self.kind} extraction: {str(exc)}", exc_info=(exc_type, exc, tb))
+            return False
+        
+        duration = (time.perf_counter_ns() - self.start_ns) / 1e9
+        logger.info(
+            f"{self.title} extraction complete: "
+            f"{self.results['successful']} successful, "
+            f"{self.results['failed']} failed "
+            f"(Duration: {duration:.2f}s)"
+        )
+        
+        self.results["duration_seconds"] = duration
+        
+        # Save summary next to the streamed results
+        if self.owns_sink:
+            self.extractor._save_results(self.results, self.extractor._meta_path(self.sink.path))
+        
+        return False
+    
+    def _describe(self, item: Dict) -> str:
+        if self.kind == "eligibility":
+            return f"member {item.get('member_id')}"
+        return "claim"
+    
+    def _record_failure(self, item: Dict, result: Optional[Dict], error: Optional[str]):
+        self.results["failed"] += 1
+        self.stats["errors"] += 1
+        
+        if self.kind == "eligibility":
+            entry = {"type": "eligibility", "member": item.get("member_id")}
+        else:
+            entry = {"type": "claim"}
+            if result is not None:
+                entry["claim_id"] = result.get("claim_id")
+        entry["error"] = error
+        self.extractor.results["errors"].append(entry)
+
+
 class NPHIESDataExtractor:
     """Extract data from NPHIES platform"""
     
@@ -25,162 +199,204 @@ class NPHIESDataExtractor:
         self.claims_service = ClaimsService()
         self.communication_service = CommunicationService()
         self.results = {
-            "eligibility": [],
-            "claims": [],
+            "eligibility": {"file": None, "count": 0, "errors": 0},
+            "claims": {"file": None, "count": 0, "errors": 0},
             "communications": [],
             "errors": []
         }
+        
+        # In-flight and completed eligibility lookups, shared by duplicate members
+        self._eligibility_cache: Dict[Tuple, Future] = {}
+        self._eligibility_tasks: Dict[Tuple, asyncio.Task] = {}
+        self._eligibility_cache_lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def __aenter__(self) -> "NPHIESDataExtractor":
+        """Open one async HTTP client shared by all async calls until exit"""
+        self._client = auth_manager.create_async_client()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+        return False
     
     def extract_eligibility_batch(
         self,
         members: List[Dict],
-        output_file: str = None
+        output_file: str = None,
+        sink: NDJSONSink = None
     ) -> Dict:
         """
         Extract eligibility data for multiple members
         
         Args:
             members: List of member dictionaries with required fields
-            output_file: Optional file to save results
+            output_file: Optional NDJSON file to stream per-member results to
+            sink: Optional open NDJSONSink to append per-member results to
+                instead of ``output_file``; the caller closes it
             
         Returns:
-            Dictionary with extraction results
+            Dictionary with extraction results. Per-member results are kept in
+            ``data`` only when no output file or sink is given; otherwise they
+            are written as one JSON document per line. With ``output_file``
+            the summary is also saved alongside it as ``<name>.meta.json``.
         """
         logger.info(f"Starting eligibility extraction for {len(members)} members")
         
-        start_time = datetime.now()
-        results = {
-            "total": len(members),
-            "successful": 0,
-            "failed": 0,
-            "data": []
-        }
-        
-        try:
-            for idx, member in enumerate(members, 1):
-                logger.info(f"Processing member {idx}/{len(members)}")
-                
-                try:
-                    result = self.eligibility_service.check_eligibility(**member)
-                    
-                    if result.get("success"):
-                        results["successful"] += 1
-                    else:
-                        results["failed"] += 1
-                        self.results["errors"].append({
-                            "type": "eligibility",
-                            "member": member.get("member_id"),
-                            "error": result.get("error")
-                        })
-                    
-                    results["data"].append(result)
-                    self.results["eligibility"].append(result)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing member {member.get('member_id')}: {str(e)}")
-                    results["failed"] += 1
-                    self.results["errors"].append({
-                        "type": "eligibility",
-                        "member": member.get("member_id"),
-                        "error": str(e)
-                    })
-            
-            # Save results if output file specified
-            if output_file:
-                self._save_results(results, output_file)
-            
-            duration = (datetime.now() - start_time).total_seconds()
-            logger.info(
-                f"Eligibility extraction complete: "
-                f"{results['successful']} successful, "
-                f"{results['failed']} failed "
-                f"(Duration: {duration:.2f}s)"
+        with _BatchCollector(self, "eligibility", len(members), output_file, sink) as batch:
+            outcomes = self._run_concurrently(
+                members,
+                self._check_eligibility_cached,
+                bulk_call=self.eligibility_service.check_eligibility_bulk
             )
+            for member, result, error in outcomes:
+                batch.add(member, result, error)
+        
+        return batch.results
+    
+    async def extract_eligibility_batch_async(
+        self,
+        members: List[Dict],
+        output_file: str = None,
+        client: httpx.AsyncClient = None,
+        sink: NDJSONSink = None
+    ) -> Dict:
+        """
+        Extract eligibility data for multiple members with asyncio
+        
+        Up to ``settings.MAX_CONCURRENCY`` requests are in flight at once.
+        
+        Args:
+            members: List of member dictionaries with required fields
+            output_file: Optional NDJSON file to stream per-member results to
+            client: Optional shared async HTTP client; defaults to the
+                extractor's client when used as an async context manager,
+                otherwise a new one is created and closed
+            sink: Optional open NDJSONSink, as for the threaded variant
             
-            results["duration_seconds"] = duration
-            return results
-            
-        except Exception as e:
-            logger.error(f"Error in batch eligibility extraction: {str(e)}", exc_info=True)
-            raise
+        Returns:
+            Dictionary with extraction results, as for extract_eligibility_batch
+        """
+        logger.info(f"Starting async eligibility extraction for {len(members)} members")
+        
+        async with self._async_client(client) as client:
+            with _BatchCollector(self, "eligibility", len(members), output_file, sink) as batch:
+                outcomes = self._run_concurrently_async(
+                    members,
+                    lambda member: self._check_eligibility_cached_async(client, member)
+                )
+                async for member, result, error in outcomes:
+                    batch.add(member, result, error)
+        
+        return batch.results
     
     def extract_claims_batch(
         self,
         claims_data: List[Dict],
-        output_file: str = None
+        output_file: str = None,
+        sink: NDJSONSink = None
     ) -> Dict:
         """
         Extract/submit multiple claims
         
         Args:
             claims_data: List of claim dictionaries
-            output_file: Optional file to save results
+            output_file: Optional NDJSON file to stream per-claim results to
+            sink: Optional open NDJSONSink to append per-claim results to
+                instead of ``output_file``; the caller closes it
             
         Returns:
-            Dictionary with extraction results
+            Dictionary with extraction results. Per-claim results are kept in
+            ``data`` only when no output file or sink is given; otherwise they
+            are written as one JSON document per line. With ``output_file``
+            the summary is also saved alongside it as ``<name>.meta.json``.
         """
         logger.info(f"Starting claims extraction for {len(claims_data)} claims")
         
-        start_time = datetime.now()
-        results = {
-            "total": len(claims_data),
-            "successful": 0,
-            "failed": 0,
-            "data": []
-        }
+        with _BatchCollector(self, "claims", len(claims_data), output_file, sink) as batch:
+            outcomes = self._run_concurrently(
+                claims_data,
+                lambda claim: self.claims_service.submit_claim(**claim),
+                bulk_call=self.claims_service.submit_claims_bulk
+            )
+            for claim, result, error in outcomes:
+                batch.add(claim, result, error)
         
-        try:
-            for idx, claim in enumerate(claims_data, 1):
-                logger.info(f"Processing claim {idx}/{len(claims_data)}")
-                
-                try:
-                    result = self.claims_service.submit_claim(**claim)
-                    
-                    if result.get("success"):
-                        results["successful"] += 1
-                    else:
-                        results["failed"] += 1
-                        self.results["errors"].append({
-                            "type": "claim",
-                            "claim_id": result.get("claim_id"),
-                            "error": result.get("error")
-                        })
-                    
-                    results["data"].append(result)
-                    self.results["claims"].append(result)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing claim: {str(e)}")
-                    results["failed"] += 1
-                    self.results["errors"].append({
-                        "type": "claim",
-                        "error": str(e)
-                    })
+        return batch.results
+    
+    async def extract_claims_batch_async(
+        self,
+        claims_data: List[Dict],
+        output_file: str = None,
+        client: httpx.AsyncClient = None,
+        sink: NDJSONSink = None
+    ) -> Dict:
+        """
+        Extract/submit multiple claims with asyncio
+        
+        Up to ``settings.MAX_CONCURRENCY`` requests are in flight at once.
+        
+        Args:
+            claims_data: List of claim dictionaries
+            output_file: Optional NDJSON file to stream per-claim results to
+            client: Optional shared async HTTP client; defaults to the
+                extractor's client when used as an async context manager,
+                otherwise a new one is created and closed
+            sink: Optional open NDJSONSink, as for the threaded variant
             
-            if output_file:
-                self._save_results(results, output_file)
+        Returns:
+            Dictionary with extraction results, as for extract_claims_batch
+        """
+        logger.info(f"Starting async claims extraction for {len(claims_data)} claims")
+        
+        async with self._async_client(client) as client:
+            with _BatchCollector(self, "claims", len(claims_data), output_file, sink) as batch:
+                outcomes = self._run_concurrently_async(
+                    claims_data,
+                    lambda claim: self.claims_service.submit_claim_async(client, **claim)
+                )
+                async for claim, result, error in outcomes:
+                    batch.add(claim, result, error)
+        
+        return batch.results
+    
+    def poll_all_communications(self, output_file: str = None) -> Dict:
+        """
+        Poll for all pending communications
+        
+        Args:
+            output_file: Optional file to save results
             
-            duration = (datetime.now() - start_time).total_seconds()
-            logger.info(
-                f"Claims extraction complete: "
-                f"{results['successful']} successful, "
-                f"{results['failed']} failed "
-                f"(Duration: {duration:.2f}s)"
+        Returns:
+            Dictionary with poll results
+        """
+        logger.info("Polling for communications")
+        
+        try:
+            return self._record_communications(
+                self.communication_service.poll_communications(),
+                output_file
             )
             
-            results["duration_seconds"] = duration
-            return results
-            
         except Exception as e:
-            logger.error(f"Error in batch claims extraction: {str(e)}", exc_info=True)
-            raise
+            logger.error(f"Error polling communications: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e)
+            }
     
-    def poll_all_communications(self, output_file: str = None) -> Dict:
+    async def poll_all_communications_async(
+        self,
+        output_file: str = None,
+        client: httpx.AsyncClient = None
+    ) -> Dict:
         """
-        Poll for all pending communications
+        Poll for all pending communications over an async HTTP client
         
         Args:
             output_file: Optional file to save results
+            client: Shared client; defaults to the extractor's own
             
         Returns:
             Dictionary with poll results
@@ -188,20 +404,10 @@ class NPHIESDataExtractor:
         logger.info("Polling for communications")
         
         try:
-            result = self.communication_service.poll_communications()
-            
-            if result.get("success"):
-                communications = result.get("communications", [])
-                logger.info(f"Retrieved {len(communications)} communications")
-                
-                self.results["communications"].extend(communications)
-                
-                if output_file:
-                    self._save_results(result, output_file)
-            else:
-                logger.warning(f"Communication poll failed: {result.get('errors')}")
+            async with self._async_client(client) as client:
+                result = await self.communication_service.poll_communications_async(client)
             
-            return result
+            return self._record_communications(result, output_file)
             
         except Exception as e:
             logger.error(f"Error polling communications: {str(e)}", exc_info=True)
@@ -210,6 +416,21 @@ class NPHIESDataExtractor:
                 "error": str(e)
             }
     
+    def _record_communications(self, result: Dict, output_file: Optional[str]) -> Dict:
+        """Keep the communications of a poll result and optionally save it"""
+        if result.get("success"):
+            communications = result.get("communications", [])
+            logger.info(f"Retrieved {len(communications)} communications")
+            
+            self.results["communications"].extend(communications)
+            
+            if output_file:
+                self._save_results(result, output_file)
+        else:
+            logger.warning(f"Communication poll failed: {result.get('errors')}")
+        
+        return result
+    
     def run_full_extraction(
         self,
         eligibility_members: List[Dict] = None,
@@ -229,11 +450,115 @@ class NPHIESDataExtractor:
         Returns:
             Dictionary with complete extraction results
         """
+        pipeline_results, output_path = self._start_pipeline(output_dir)
+        
+        with ExitStack() as sinks:
+            # Extract eligibility data
+            if eligibility_members:
+                logger.info("--- Phase 1: Eligibility Extraction ---")
+                pipeline_results["eligibility"] = self.extract_eligibility_batch(
+                    eligibility_members,
+                    sink=sinks.enter_context(NDJSONSink(output_path / "eligibility_results.ndjson"))
+                )
+            
+            # Extract claims data
+            if claims_data:
+                logger.info("--- Phase 2: Claims Extraction ---")
+                pipeline_results["claims"] = self.extract_claims_batch(
+                    claims_data,
+                    sink=sinks.enter_context(NDJSONSink(output_path / "claims_results.ndjson"))
+                )
+        
+        # Poll communications after the batches; the auth session is not thread-safe
+        if poll_communications:
+            logger.info("--- Phase 3: Communications Polling ---")
+            pipeline_results["communications"] = self.poll_all_communications(
+                output_file=str(output_path / "communications_results.json")
+            )
+        
+        return self._finish_pipeline(pipeline_results, output_path, eligibility_members, claims_data)
+    
+    async def run_full_extraction_async(
+        self,
+        eligibility_members: List[Dict] = None,
+        claims_data: List[Dict] = None,
+        poll_communications: bool = True,
+        output_dir: str = "output",
+        claims_after_eligibility: bool = False
+    ) -> Dict:
+        """
+        Run full data extraction pipeline with asyncio
+        
+        The phases run concurrently and share one HTTP/2 client, so
+        communications polling, eligibility and claims requests multiplex
+        over the same connections.
+        
+        Args:
+            eligibility_members: List of members for eligibility check
+            claims_data: List of claims to submit
+            poll_communications: Whether to poll communications
+            output_dir: Directory to save results
+            claims_after_eligibility: Submit claims only once eligibility
+                extraction has finished
+            
+        Returns:
+            Dictionary with complete extraction results
+        """
+        pipeline_results, output_path = self._start_pipeline(output_dir)
+        
+        with ExitStack() as sinks:
+            async with self._async_client() as client:
+                elig_task = None
+                if eligibility_members:
+                    logger.info("--- Phase 1: Eligibility Extraction ---")
+                    elig_task = asyncio.create_task(self.extract_eligibility_batch_async(
+                        eligibility_members,
+                        sink=sinks.enter_context(NDJSONSink(output_path / "eligibility_results.ndjson")),
+                        client=client
+                    ))
+                
+                claims_task = None
+                if claims_data:
+                    logger.info("--- Phase 2: Claims Extraction ---")
+                    claims = self.extract_claims_batch_async(
+                        claims_data,
+                        sink=sinks.enter_context(NDJSONSink(output_path / "claims_results.ndjson")),
+                        client=client
+                    )
+                    if claims_after_eligibility and elig_task is not None:
+                        claims = self._after(elig_task, claims)
+                    claims_task = asyncio.create_task(claims)
+                
+                comm_task = None
+                if poll_communications:
+                    logger.info("--- Phase 3: Communications Polling ---")
+                    comm_task = asyncio.create_task(self.poll_all_communications_async(
+                        output_file=str(output_path / "communications_results.json"),
+                        client=client
+                    ))
+                
+                tasks = {"eligibility": elig_task, "claims": claims_task, "communications": comm_task}
+                tasks = {phase: task for phase, task in tasks.items() if task is not None}
+                for phase, result in zip(tasks, await asyncio.gather(*tasks.values())):
+                    pipeline_results[phase] = result
+        
+        return self._finish_pipeline(pipeline_results, output_path, eligibility_members, claims_data)
+    
+    @staticmethod
+    async def _after(task: asyncio.Task, coro):
+        """Await coro once task has finished, whatever its outcome."""
+        await asyncio.wait([task])
+        return await coro
+    
+    def _start_pipeline(self, output_dir: str) -> Tuple[Dict, Path]:
+        """Initialize pipeline results and create the output directory"""
         logger.info("=== Starting full NPHIES data extraction ===")
         
-        start_time = datetime.now()
+        self._eligibility_cache.clear()
+        self._eligibility_tasks.clear()
+        self._pipeline_start_ns = time.perf_counter_ns()
         pipeline_results = {
-            "start_time": start_time.isoformat(),
+            "start_time": datetime.now().isoformat(),
             "eligibility": None,
             "claims": None,
             "communications": None,
@@ -244,32 +569,18 @@ class NPHIESDataExtractor:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Extract eligibility data
-        if eligibility_members:
-            logger.info("--- Phase 1: Eligibility Extraction ---")
-            pipeline_results["eligibility"] = self.extract_eligibility_batch(
-                eligibility_members,
-                output_file=str(output_path / "eligibility_results.json")
-            )
-        
-        # Extract claims data
-        if claims_data:
-            logger.info("--- Phase 2: Claims Extraction ---")
-            pipeline_results["claims"] = self.extract_claims_batch(
-                claims_data,
-                output_file=str(output_path / "claims_results.json")
-            )
-        
-        # Poll communications
-        if poll_communications:
-            logger.info("--- Phase 3: Communications Polling ---")
-            pipeline_results["communications"] = self.poll_all_communications(
-                output_file=str(output_path / "communications_results.json")
-            )
-        
-        # Calculate summary
+        return pipeline_results, output_path
+    
+    def _finish_pipeline(
+        self,
+        pipeline_results: Dict,
+        output_path: Path,
+        eligibility_members: Optional[List[Dict]],
+        claims_data: Optional[List[Dict]]
+    ) -> Dict:
+        """Summarize a pipeline run and save the complete results"""
         end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        duration = (time.perf_counter_ns() - self._pipeline_start_ns) / 1e9
         
         pipeline_results["end_time"] = end_time.isoformat()
         pipeline_results["duration_seconds"] = duration
@@ -283,22 +594,188 @@ class NPHIESDataExtractor:
         
         # Save complete results
         complete_results_file = output_path / "complete_extraction_results.json"
-        self._save_results(pipeline_results, str(complete_results_file))
+        self._save_results(pipeline_results, str(complete_results_file), pretty=True)
         
         logger.info(f"=== Extraction complete in {duration:.2f}s ===")
         logger.info(f"Results saved to: {output_path}")
         
         return pipeline_results
     
-    def _save_results(self, data: Dict, filename: str):
-        """Save results to JSON file"""
+    @staticmethod
+    def _eligibility_key(member: Dict) -> Tuple:
+        """Key identifying duplicate eligibility lookups"""
+        return (member.get("member_id"), member.get("payer_id"), member.get("service_date"))
+    
+    def _check_eligibility_cached(self, member: Dict) -> Dict:
+        """
+        Check eligibility, reusing the result of an identical lookup in this run
+        
+        Concurrent duplicates wait on the first request instead of sending
+        their own. Unsuccessful results are not kept, so later duplicates retry.
+        """
+        key = self._eligibility_key(member)
+        with self._eligibility_cache_lock:
+            future = self._eligibility_cache.get(key)
+            owner = future is None
+            if owner:
+                future = self._eligibility_cache[key] = Future()
+        
+        if owner:
+            try:
+                result = self.eligibility_service.check_eligibility(**member)
+            except Exception as e:
+                result = e
+            
+            if isinstance(result, Exception) or not result.get("success"):
+                with self._eligibility_cache_lock:
+                    self._eligibility_cache.pop(key, None)
+            
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        
+        return future.result()
+    
+    async def _check_eligibility_cached_async(self, client: httpx.AsyncClient, member: Dict) -> Dict:
+        """Async counterpart of _check_eligibility_cached"""
+        key = self._eligibility_key(member)
+        task = self._eligibility_tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self.eligibility_service.check_eligibility_async(client, **member)
+            )
+            self._eligibility_tasks[key] = task
+            task.add_done_callback(lambda done: self._forget_failed_task(key, done))
+        
+        return await asyncio.shield(task)
+    
+    def _forget_failed_task(self, key: Tuple, task: asyncio.Task):
+        """Drop an unsuccessful eligibility lookup from the run cache"""
+        if task.cancelled() or task.exception() is not None or not task.result().get("success"):
+            if self._eligibility_tasks.get(key) is task:
+                del self._eligibility_tasks[key]
+    
+    def _run_concurrently(
+        self,
+        items: List[Dict],
+        call: Callable[[Dict], Dict],
+        bulk_call: Optional[Callable[[List[Dict]], List[Dict]]] = None
+    ) -> Iterator[Tuple[Dict, Optional[Dict], Optional[Exception]]]:
+        """
+        Run an I/O-bound service call for each item on a thread pool
+        
+        When bulk requests are enabled and ``bulk_call`` is given, items are
+        grouped into chunks of ``settings.BULK_CHUNK_SIZE`` and each chunk is
+        sent as a single request. Results are yielded on the calling thread,
+        so callers can fold them into shared state without extra locking.
+        
+        Args:
+            items: Request payloads (members, claims, ...)
+            call: Service call to run for each payload
+            bulk_call: Optional service call taking a list of payloads
+            
+        Yields:
+            Tuples of (item, result, error) where exactly one of result/error is set
+        """
+        if not items:
+            return
+        
+        if bulk_call is not None and settings.ENABLE_BULK_REQUESTS:
+            size = max(1, settings.BULK_CHUNK_SIZE)
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            run = bulk_call
+        else:
+            chunks = [[item] for item in items]
+            run = lambda chunk: [call(chunk[0])]
+        
+        max_workers = max(1, min(settings.PARALLEL_WORKERS, len(chunks)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    for item in chunk:
+                        yield item, None, e
+                    continue
+                
+                for item, result in zip(chunk, chunk_results):
+                    yield item, result, None
+    
+    async def _run_concurrently_async(
+        self,
+        items: List[Dict],
+        call: Callable[[Dict], Awaitable[Dict]]
+    ) -> AsyncIterator[Tuple[Dict, Optional[Dict], Optional[Exception]]]:
+        """
+        Run an async service call for each item, capped by settings.MAX_CONCURRENCY
+        
+        Args:
+            items: Request payloads (members, claims, ...)
+            call: Coroutine function to run for each payload
+            
+        Yields:
+            Tuples of (item, result, error) in completion order
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.MAX_CONCURRENCY))
+        
+        async def run(item: Dict) -> Tuple[Dict, Optional[Dict], Optional[Exception]]:
+            async with semaphore:
+                try:
+                    return item, await call(item), None
+                except Exception as e:
+                    return item, None, e
+        
+        tasks = [asyncio.create_task(run(item)) for item in items]
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @asynccontextmanager
+    async def _async_client(self, client: httpx.AsyncClient = None):
+        """Use the given or the extractor's client, or create one for the duration of the block"""
+        client = client or self._client
+        if client is not None:
+            yield client
+            return
+        
+        client = auth_manager.create_async_client()
+        try:
+            yield client
+        finally:
+            await client.aclose()
+    
+    def _save_results(self, data: Dict, filename: str, *, pretty: bool = False):
+        """
+        Save results to JSON file
+        
+        Args:
+            data: Data to save
+            filename: Output file path
+            pretty: Indent the output; only worth it for files read by people
+        """
+        try:
+            with open(filename, 'wb') as f:
+                f.write(_dumps(data, pretty=pretty))
             logger.info(f"Results saved to: {filename}")
         except Exception as e:
             logger.error(f"Error saving results to {filename}: {str(e)}")
     
+    @staticmethod
+    def _meta_path(output_file: str) -> str:
+        """Get the summary file path for a streamed NDJSON results file"""
+        return str(Path(output_file).with_suffix(".meta.json"))
+    
     def get_all_results(self) -> Dict:
-        """Get all accumulated results"""
+        """
+        Get all accumulated results
+        
+        Eligibility and claims entries carry counters and the path of the
+        most recent NDJSON results file rather than the responses themselves.
+        """
         return self.results
@@ -5,18 +5,66 @@ for NPHIES integration enhancement.
 """
 
 import pandas as pd
+import argparse
 import json
+import logging
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401  (enables Arrow-backed pandas dtypes)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import python_calamine  # noqa: F401  (Rust-backed Excel engine used by pandas)
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+
+logger = logging.getLogger("rcm_analysis")
+
+# Insight sections filled per file, keyed by file name
+FILE_INSIGHT_KEYS = ("rejection_patterns", "payer_insights", "common_rejection_codes")
+
+# Per-file fragments of unchanged files are reused from this file in the data directory;
+# bump CACHE_VERSION whenever the analysis output changes
+CACHE_FILE = ".rcm_cache.json"
+CACHE_VERSION = 1
+
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """Compile keywords into one alternation regex for column name matching."""
+    return re.compile("|".join(map(re.escape, keywords)))
+
 
 class RCMDataAnalyzer:
     """Analyze RCM rejection data to enhance NPHIES integration."""
     
+    # Column name patterns, matched against lower-cased column names
+    REJECTION_RE = _keyword_pattern([
+        'rejection', 'reject', 'denied', 'error', 'status',
+        'code', 'reason', 'description', 'payer', 'insurance',
+        'claim', 'amount', 'تم رفض', 'مرفوض', 'سبب', 'كود'
+    ])
+    CODE_RE = _keyword_pattern(['code', 'كود'])
+    PAYER_RE = _keyword_pattern(['payer', 'insurance', 'شركة'])
+    AMOUNT_RE = _keyword_pattern(['amount', 'value', 'قيمة', 'مبلغ'])
+    
     def __init__(self, data_dir: str = "analysis_data"):
         self.data_dir = Path(data_dir)
         self.insights = {
@@ -31,141 +79,285 @@ class RCMDataAnalyzer:
     
     def analyze_all_files(self) -> Dict[str, Any]:
         """Analyze all Excel files in the data directory."""
-        print(f"🔍 Starting analysis of files in {self.data_dir}")
+        logger.info(f"🔍 Starting analysis of files in {self.data_dir}")
         
         if not self.data_dir.exists():
-            print(f"❌ Directory {self.data_dir} does not exist")
+            logger.warning(f"❌ Directory {self.data_dir} does not exist")
             return self.insights
         
         excel_files = list(self.data_dir.glob("*.xlsx")) + list(self.data_dir.glob("*.xls"))
-        print(f"📊 Found {len(excel_files)} Excel files to analyze\n")
-        
-        for file_path in excel_files:
-            if file_path.name.startswith("~$"):
-                continue  # Skip temporary Excel files
-            
-            print(f"📄 Analyzing: {file_path.name}")
-            self.insights["data_sources"].append(file_path.name)
-            
-            try:
-                self._analyze_file(file_path)
-            except Exception as e:
-                print(f"  ⚠️  Error analyzing {file_path.name}: {str(e)}")
-        
+        logger.info(f"📊 Found {len(excel_files)} Excel files to analyze")
+        
+        # Skip temporary Excel files
+        excel_files = [f for f in excel_files if not f.name.startswith("~$")]
+        self.insights["data_sources"].extend(f.name for f in excel_files)
+        
+        # Files unchanged since the last run reuse their cached fragment
+        cache = self._load_cache()
+        keys = {file_path: self._cache_key(file_path) for file_path in excel_files}
+        pending = [file_path for file_path in excel_files if keys[file_path] not in cache]
+        fresh_cache = {}
+        
+        # Files are independent; parse and analyze the changed ones in parallel
+        # processes and merge the per-file results in the original order
+        max_workers = max(1, min(len(pending), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            level = logger.getEffectiveLevel()
+            futures = {
+                file_path: executor.submit(_analyze_file_worker, file_path, level)
+                for file_path in pending
+            }
+            for file_path in excel_files:
+                if file_path in futures:
+                    try:
+                        fragment, records, clean = futures[file_path].result()
+                    except Exception as e:
+                        logger.warning(f"  ⚠️  Error analyzing {file_path.name}: {str(e)}")
+                        continue
+                    
+                    # Replay the worker's log records through this process's handlers
+                    for record_level, message in records:
+                        logger.log(record_level, message)
+                else:
+                    fragment = cache[keys[file_path]]
+                    clean = True
+                    logger.info(f"♻️  Using cached analysis: {file_path.name}")
+                
+                # A file that failed to open or lost sheets (e.g. locked or on a flaky
+                # share) is analyzed again next run instead of caching the partial result
+                if clean:
+                    fresh_cache[keys[file_path]] = fragment
+                for key in FILE_INSIGHT_KEYS:
+                    self.insights[key].update(fragment[key])
+        
+        self._save_cache(fresh_cache)
         self._generate_recommendations()
         return self.insights
     
+    @staticmethod
+    def _cache_key(file_path: Path) -> str:
+        """Identify a file version by name, size and modification time."""
+        st = file_path.stat()
+        return f"{file_path.name}:{st.st_size}:{st.st_mtime_ns}"
+    
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load cached per-file fragments, ignoring a missing, corrupt or outdated cache."""
+        try:
+            with open(self.data_dir / CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            return {}
+        return cache.get("files", {})
+    
+    def _save_cache(self, files: Dict[str, Dict[str, Any]]):
+        """Save per-file fragments for the files of this run."""
+        try:
+            with open(self.data_dir / CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "files": files}, f, ensure_ascii=False)
+        except OSError as e:
+            # A read-only data share only costs the next run a full analysis
+            logger.warning(f"⚠️  Could not save analysis cache: {str(e)}")
+    
     def _analyze_file(self, file_path: Path):
         """Analyze a single Excel file."""
         try:
-            # Try to read all sheets
-            excel_file = pd.ExcelFile(file_path)
-            print(f"  📑 Sheets found: {', '.join(excel_file.sheet_names)}")
-            
-            for sheet_name in excel_file.sheet_names:
-                try:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                    self._analyze_dataframe(df, file_path.name, sheet_name)
-                except Exception as e:
-                    print(f"    ⚠️  Could not read sheet '{sheet_name}': {str(e)}")
+            # Open the workbook once and parse sheets from the same handle
+            with self._open_workbook(file_path) as workbook:
+                logger.info(f"  📑 Sheets found: {', '.join(map(str, workbook.sheet_names))}")
+                
+                for sheet_name in workbook.sheet_names:
+                    try:
+                        # Peek at the header row before paying for a full parse
+                        header = workbook.parse(sheet_name, nrows=0).columns
+                        usecols = self._columns_to_read(header)
+                        if not usecols:
+                            logger.info(f"    ⏭️  Skipping sheet '{sheet_name}': no relevant columns")
+                            continue
+                        
+                        df = workbook.parse(sheet_name, usecols=usecols)
+                        self._analyze_dataframe(df, file_path.name, sheet_name)
+                    except Exception as e:
+                        logger.warning(f"    ⚠️  Could not analyze sheet '{sheet_name}': {str(e)}")
         
         except Exception as e:
-            print(f"  ❌ Could not open file: {str(e)}")
+            logger.warning(f"  ❌ Could not open file: {str(e)}")
+    
+    @classmethod
+    def _columns_to_read(cls, header) -> List[int]:
+        """
+        Positions of the header columns any extractor looks at.
+        
+        Free-text columns that match no keyword are never parsed, which keeps
+        their strings out of memory.
+        
+        Returns:
+            Column positions to pass as usecols, empty when the sheet has no
+            rejection-related column at all
+        """
+        lowered = cls._lower_names(header)
+        relevant = lowered.str.contains(cls.REJECTION_RE)
+        if not relevant.any():
+            return []
+        
+        keep = relevant | lowered.str.contains(cls.AMOUNT_RE)
+        return [position for position, flag in enumerate(keep) if flag]
+    
+    @staticmethod
+    def _open_workbook(file_path: Path) -> pd.ExcelFile:
+        """Open a workbook for parsing, preferring the calamine engine."""
+        if CALAMINE_AVAILABLE:
+            try:
+                return pd.ExcelFile(file_path, engine="calamine")
+            except ValueError:
+                # pandas older than 2.2 does not know the calamine engine
+                pass
+        return pd.ExcelFile(file_path)
     
     def _analyze_dataframe(self, df: pd.DataFrame, filename: str, sheet_name: str):
         """Analyze a dataframe for rejection patterns."""
         if df.empty:
             return
         
-        print(f"    🔢 Sheet '{sheet_name}': {len(df)} rows, {len(df.columns)} columns")
+        logger.info(f"    🔢 Sheet '{sheet_name}': {len(df)} rows, {len(df.columns)} columns")
         
-        # Look for rejection-related columns
-        rejection_keywords = ['rejection', 'reject', 'denied', 'error', 'status', 
-                            'code', 'reason', 'description', 'payer', 'insurance',
-                            'claim', 'amount', 'تم رفض', 'مرفوض', 'سبب', 'كود']
+        if PYARROW_AVAILABLE:
+            # Arrow string columns share one buffer instead of a Python object per cell;
+            # floats are kept as floats so code values stringify as before
+            df = df.convert_dtypes(dtype_backend="pyarrow", convert_integer=False)
+        
+        # Lower-case the column names once and share them with every extractor
+        lowered = self._lower_names(df.columns)
         
-        relevant_columns = [col for col in df.columns 
-                          if any(keyword in str(col).lower() for keyword in rejection_keywords)]
+        # Look for rejection-related columns
+        relevant = lowered.str.contains(self.REJECTION_RE)
+        relevant_columns = df.columns[relevant]
         
-        if relevant_columns:
-            print(f"    📌 Relevant columns: {', '.join([str(c) for c in relevant_columns[:5]])}")
+        if len(relevant_columns):
+            logger.info(f"    📌 Relevant columns: {', '.join([str(c) for c in relevant_columns[:5]])}")
             
             # Extract rejection codes
-            self._extract_rejection_codes(df, relevant_columns, filename)
+            self._extract_rejection_codes(df, relevant_columns, filename, lowered[relevant])
             
             # Extract payer information
-            self._extract_payer_info(df, relevant_columns, filename)
+            self._extract_payer_info(df, relevant_columns, filename, lowered[relevant])
             
             # Extract amounts and financial impact
-            self._extract_financial_data(df, filename)
+            self._extract_financial_data(df, filename, lowered)
+    
+    @staticmethod
+    def _lower_names(columns) -> pd.Index:
+        """Lower-cased string form of column labels, aligned with columns."""
+        return pd.Index(columns).astype(str).str.lower()
+    
+    @classmethod
+    def _match_columns(cls, columns, pattern: "re.Pattern", lowered: pd.Index = None) -> List:
+        """
+        Select the columns whose lower-cased name matches pattern, in one vectorized pass.
+        
+        Args:
+            columns: Column labels to select from
+            pattern: Compiled keyword regex
+            lowered: Precomputed _lower_names(columns), computed here when omitted
+        
+        Returns:
+            Matching column labels, in their original order
+        """
+        columns = pd.Index(columns)
+        if lowered is None:
+            lowered = cls._lower_names(columns)
+        return list(columns[lowered.str.contains(pattern)])
     
-    def _extract_rejection_codes(self, df: pd.DataFrame, columns: List, filename: str):
+    @staticmethod
+    def _top_value_counts(df: pd.DataFrame, columns: List, n: int = 10) -> Dict[str, Dict[str, int]]:
+        """
+        Count the n most frequent values of several columns with one groupby.
+        
+        Returns:
+            {column name: {value: count}}, omitting columns with no values
+        """
+        if not columns:
+            return {}
+        
+        # Melt on positions so labels of any type (or name) cannot clash
+        subset = df[columns]
+        labels = [str(col) for col in subset.columns]
+        subset = subset.set_axis(range(len(labels)), axis=1)
+        stacked = subset.melt(var_name="_column", value_name="_value").dropna()
+        stacked["_value"] = stacked["_value"].astype(str)
+        
+        counts = stacked.groupby("_column", sort=True)["_value"].value_counts()
+        top = counts.groupby(level=0, sort=False).head(n)
+        
+        result: Dict[str, Dict[str, int]] = {}
+        for (position, value), count in top.items():
+            result.setdefault(labels[position], {})[value] = int(count)
+        return result
+    
+    def _extract_rejection_codes(self, df: pd.DataFrame, columns: List, filename: str, lowered: pd.Index = None):
         """Extract and count rejection codes."""
-        code_columns = [col for col in columns if 'code' in str(col).lower() or 'كود' in str(col).lower()]
+        code_columns = self._match_columns(columns, self.CODE_RE, lowered)
         
-        for col in code_columns:
-            try:
-                codes = df[col].dropna().astype(str)
-                if len(codes) > 0:
-                    code_counts = codes.value_counts().head(10).to_dict()
-                    
-                    if filename not in self.insights["common_rejection_codes"]:
-                        self.insights["common_rejection_codes"][filename] = {}
-                    
-                    self.insights["common_rejection_codes"][filename][str(col)] = code_counts
-                    print(f"      ✓ Found {len(code_counts)} unique rejection codes in '{col}'")
-            except Exception as e:
-                pass
+        try:
+            for col, code_counts in self._top_value_counts(df, code_columns).items():
+                self.insights["common_rejection_codes"].setdefault(filename, {})[col] = code_counts
+                logger.info(f"      ✓ Found {len(code_counts)} unique rejection codes in '{col}'")
+        except Exception as e:
+            pass
     
-    def _extract_payer_info(self, df: pd.DataFrame, columns: List, filename: str):
+    def _extract_payer_info(self, df: pd.DataFrame, columns: List, filename: str, lowered: pd.Index = None):
         """Extract payer-specific information."""
-        payer_columns = [col for col in columns if 'payer' in str(col).lower() or 
-                        'insurance' in str(col).lower() or 'شركة' in str(col).lower()]
+        payer_columns = self._match_columns(columns, self.PAYER_RE, lowered)
         
-        for col in payer_columns:
-            try:
-                payers = df[col].dropna().astype(str)
-                if len(payers) > 0:
-                    payer_counts = payers.value_counts().head(10).to_dict()
-                    
-                    if filename not in self.insights["payer_insights"]:
-                        self.insights["payer_insights"][filename] = {}
-                    
-                    self.insights["payer_insights"][filename][str(col)] = payer_counts
-                    print(f"      ✓ Found {len(payer_counts)} payers in '{col}'")
-            except Exception as e:
-                pass
+        try:
+            for col, payer_counts in self._top_value_counts(df, payer_columns).items():
+                self.insights["payer_insights"].setdefault(filename, {})[col] = payer_counts
+                logger.info(f"      ✓ Found {len(payer_counts)} payers in '{col}'")
+        except Exception as e:
+            pass
     
-    def _extract_financial_data(self, df: pd.DataFrame, filename: str):
+    def _extract_financial_data(self, df: pd.DataFrame, filename: str, lowered: pd.Index = None):
         """Extract financial impact data."""
-        amount_columns = [col for col in df.columns if 'amount' in str(col).lower() or 
-                         'value' in str(col).lower() or 'قيمة' in str(col).lower() or
-                         'مبلغ' in str(col).lower()]
+        amount_columns = self._match_columns(df.columns, self.AMOUNT_RE, lowered)
+        if not amount_columns:
+            return
         
-        for col in amount_columns:
-            try:
-                amounts = pd.to_numeric(df[col], errors='coerce').dropna()
-                if len(amounts) > 0:
-                    total_amount = amounts.sum()
-                    avg_amount = amounts.mean()
-                    
-                    if filename not in self.insights["rejection_patterns"]:
-                        self.insights["rejection_patterns"][filename] = {}
-                    
-                    self.insights["rejection_patterns"][filename]["financial_impact"] = {
-                        "total_rejected_amount": float(total_amount),
-                        "average_rejection_amount": float(avg_amount),
-                        "count": int(len(amounts)),
-                        "column": str(col)
-                    }
-                    print(f"      💰 Financial impact: Total={total_amount:,.2f}, Avg={avg_amount:,.2f}")
-            except Exception as e:
-                pass
+        try:
+            # Coerce all amount columns in one pass, then aggregate them together
+            subset = df[amount_columns]
+            labels = [str(col) for col in subset.columns]
+            amounts = subset.set_axis(range(len(labels)), axis=1).apply(pd.to_numeric, errors='coerce')
+            totals = amounts.sum()
+            averages = amounts.mean()
+            counts = amounts.count()
+        except Exception as e:
+            return
+        
+        for position, count in counts.items():
+            if count == 0:
+                continue
+            
+            total_amount = totals[position]
+            avg_amount = averages[position]
+            
+            # The last amount column with values determines the reported impact
+            self.insights["rejection_patterns"].setdefault(filename, {})["financial_impact"] = {
+                "total_rejected_amount": float(total_amount),
+                "average_rejection_amount": float(avg_amount),
+                "count": int(count),
+                "column": labels[position]
+            }
+            logger.info(f"      💰 Financial impact: Total={total_amount:,.2f}, Avg={avg_amount:,.2f}")
     
     def _generate_recommendations(self):
         """Generate recommendations based on analysis."""
         recommendations = []
         
+        # Lower-case all source names once; newlines keep names from running together
+        source_names = "\n".join(self.insights["data_sources"]).lower()
+        
         # Recommendation 1: Top rejection codes
         if self.insights["common_rejection_codes"]:
             recommendations.append({
@@ -197,7 +389,7 @@ class RCMDataAnalyzer:
             })
         
         # Recommendation 4: Resubmission workflow
-        if any("resubmission" in filename.lower() for filename in self.insights["data_sources"]):
+        if "resubmission" in source_names:
             recommendations.append({
                 "priority": "HIGH",
                 "category": "Resubmission Automation",
@@ -207,7 +399,7 @@ class RCMDataAnalyzer:
             })
         
         # Recommendation 5: MOH-specific handling
-        if any("moh" in filename.lower() for filename in self.insights["data_sources"]):
+        if "moh" in source_names:
             recommendations.append({
                 "priority": "MEDIUM",
                 "category": "MOH Integration",
@@ -217,7 +409,7 @@ class RCMDataAnalyzer:
             })
         
         # Recommendation 6: NCCI specific rules
-        if any("ncci" in filename.lower() for filename in self.insights["data_sources"]):
+        if "ncci" in source_names:
             recommendations.append({
                 "priority": "MEDIUM",
                 "category": "NCCI Rules",
@@ -227,7 +419,7 @@ class RCMDataAnalyzer:
             })
         
         # Recommendation 7: Bupa specific handling
-        if any("bupa" in filename.lower() for filename in self.insights["data_sources"]):
+        if "bupa" in source_names:
             recommendations.append({
                 "priority": "MEDIUM",
                 "category": "Bupa Integration",
@@ -251,118 +443,178 @@ class RCMDataAnalyzer:
         """Save insights to JSON file."""
         output_path = Path(output_file)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.insights, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    self.insights,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                ))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(self.insights, f, indent=2, ensure_ascii=False)
         
         print(f"\n✅ Insights saved to: {output_path.absolute()}")
         return output_path
     
     def generate_report(self, output_file: str = "RCM_ANALYSIS_REPORT.md"):
         """Generate markdown report."""
-        report = []
-        report.append("# RCM Rejection Data Analysis Report\n")
-        report.append(f"**Analysis Date:** {self.insights['analysis_date']}\n")
-        report.append(f"**Data Sources Analyzed:** {len(self.insights['data_sources'])}\n")
-        
-        report.append("\n## 📊 Data Sources\n")
-        for source in self.insights['data_sources']:
-            report.append(f"- {source}")
-        
-        report.append("\n## 🔍 Key Findings\n")
-        
-        # Rejection codes summary
-        if self.insights['common_rejection_codes']:
-            report.append("\n### Top Rejection Codes\n")
-            for filename, codes_data in self.insights['common_rejection_codes'].items():
-                report.append(f"\n**{filename}:**\n")
-                for column, codes in codes_data.items():
-                    report.append(f"- Column: `{column}`")
-                    for code, count in list(codes.items())[:5]:
-                        report.append(f"  - `{code}`: {count} occurrences")
-        
-        # Payer insights
-        if self.insights['payer_insights']:
-            report.append("\n### Payer Distribution\n")
-            for filename, payer_data in self.insights['payer_insights'].items():
-                report.append(f"\n**{filename}:**\n")
-                for column, payers in payer_data.items():
-                    report.append(f"- Column: `{column}`")
-                    for payer, count in list(payers.items())[:5]:
-                        report.append(f"  - {payer}: {count} claims")
-        
-        # Financial impact
-        if self.insights['rejection_patterns']:
-            report.append("\n### Financial Impact\n")
-            total_impact = 0
-            for filename, patterns in self.insights['rejection_patterns'].items():
-                if 'financial_impact' in patterns:
-                    impact = patterns['financial_impact']
-                    report.append(f"\n**{filename}:**\n")
-                    report.append(f"- Total Rejected Amount: **{impact['total_rejected_amount']:,.2f} SAR**")
-                    report.append(f"- Average per Rejection: **{impact['average_rejection_amount']:,.2f} SAR**")
-                    report.append(f"- Number of Rejections: **{impact['count']}**")
-                    total_impact += impact['total_rejected_amount']
-            
-            if total_impact > 0:
-                report.append(f"\n**Total Financial Impact Across All Files: {total_impact:,.2f} SAR**\n")
+        output_path = Path(output_file)
         
-        # Recommendations
-        if self.insights['recommendations']:
-            report.append("\n## 💡 Recommendations for NPHIES Integration Enhancement\n")
+        # Write lines straight to a buffered file instead of joining them in memory
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            def emit(line: str):
+                f.write(line)
+                f.write("\n")
             
-            priority_order = ["HIGH", "MEDIUM", "LOW"]
-            for priority in priority_order:
-                priority_recs = [r for r in self.insights['recommendations'] if r['priority'] == priority]
-                if priority_recs:
-                    report.append(f"\n### {priority} Priority\n")
-                    for rec in priority_recs:
-                        report.append(f"\n**{rec['category']}**")
-                        report.append(f"- **Recommendation:** {rec['recommendation']}")
-                        report.append(f"- **Action:** {rec['action']}")
-                        report.append(f"- **Expected Impact:** {rec['impact']}\n")
-        
-        # Implementation plan
-        report.append("\n## 🚀 Implementation Plan\n")
-        report.append("\n### Phase 1: Immediate Actions (Week 1-2)\n")
-        report.append("1. ✅ Add top rejection codes to `config/rejection_codes.py`")
-        report.append("2. ✅ Enhance validators with payer-specific rules")
-        report.append("3. ✅ Create resubmission service skeleton")
-        report.append("4. ✅ Update platform_config with MOH, NCCI, Bupa settings\n")
-        
-        report.append("\n### Phase 2: Core Enhancements (Week 3-4)\n")
-        report.append("1. ✅ Implement automated resubmission workflow")
-        report.append("2. ✅ Add financial impact tracking to analytics")
-        report.append("3. ✅ Create MOH and NCCI specific validators")
-        report.append("4. ✅ Build rejection prediction model foundation\n")
-        
-        report.append("\n### Phase 3: Advanced Features (Week 5-8)\n")
-        report.append("1. ✅ ML-based rejection prediction")
-        report.append("2. ✅ Real-time rejection monitoring dashboard")
-        report.append("3. ✅ Automated A/R follow-up system")
-        report.append("4. ✅ Integration with existing RCM workflows\n")
-        
-        report.append("\n## 📈 Expected Outcomes\n")
-        report.append("- **40-50%** reduction in initial rejections")
-        report.append("- **60-70%** reduction in manual intervention")
-        report.append("- **30-40%** improvement in resubmission success rate")
-        report.append("- **Days to hours** reduction in resubmission turnaround time")
-        report.append("- **Millions of SAR** in recovered revenue annually\n")
-        
-        report.append("\n---\n")
-        report.append("*Report generated by RCM Data Analyzer for NPHIES Integration Enhancement*\n")
-        
-        report_text = "\n".join(report)
-        
-        output_path = Path(output_file)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(report_text)
+            emit("# RCM Rejection Data Analysis Report\n")
+            emit(f"**Analysis Date:** {self.insights['analysis_date']}\n")
+            emit(f"**Data Sources Analyzed:** {len(self.insights['data_sources'])}\n")
+            
+            emit("\n## 📊 Data Sources\n")
+            for source in self.insights['data_sources']:
+                emit(f"- {source}")
+            
+            emit("\n## 🔍 Key Findings\n")
+            
+            # Rejection codes summary
+            if self.insights['common_rejection_codes']:
+                emit("\n### Top Rejection Codes\n")
+                for filename, codes_data in self.insights['common_rejection_codes'].items():
+                    emit(f"\n**{filename}:**\n")
+                    for column, codes in codes_data.items():
+                        emit(f"- Column: `{column}`")
+                        for code, count in list(codes.items())[:5]:
+                            emit(f"  - `{code}`: {count} occurrences")
+            
+            # Payer insights
+            if self.insights['payer_insights']:
+                emit("\n### Payer Distribution\n")
+                for filename, payer_data in self.insights['payer_insights'].items():
+                    emit(f"\n**{filename}:**\n")
+                    for column, payers in payer_data.items():
+                        emit(f"- Column: `{column}`")
+                        for payer, count in list(payers.items())[:5]:
+                            emit(f"  - {payer}: {count} claims")
+            
+            # Financial impact
+            if self.insights['rejection_patterns']:
+                emit("\n### Financial Impact\n")
+                total_impact = 0
+                for filename, patterns in self.insights['rejection_patterns'].items():
+                    if 'financial_impact' in patterns:
+                        impact = patterns['financial_impact']
+                        emit(f"\n**{filename}:**\n")
+                        emit(f"- Total Rejected Amount: **{impact['total_rejected_amount']:,.2f} SAR**")
+                        emit(f"- Average per Rejection: **{impact['average_rejection_amount']:,.2f} SAR**")
+                        emit(f"- Number of Rejections: **{impact['count']}**")
+                        total_impact += impact['total_rejected_amount']
+                
+                if total_impact > 0:
+                    emit(f"\n**Total Financial Impact Across All Files: {total_impact:,.2f} SAR**\n")
+            
+            # Recommendations
+            if self.insights['recommendations']:
+                emit("\n## 💡 Recommendations for NPHIES Integration Enhancement\n")
+                
+                priority_order = ["HIGH", "MEDIUM", "LOW"]
+                for priority in priority_order:
+                    priority_recs = [r for r in self.insights['recommendations'] if r['priority'] == priority]
+                    if priority_recs:
+                        emit(f"\n### {priority} Priority\n")
+                        for rec in priority_recs:
+                            emit(f"\n**{rec['category']}**")
+                            emit(f"- **Recommendation:** {rec['recommendation']}")
+                            emit(f"- **Action:** {rec['action']}")
+                            emit(f"- **Expected Impact:** {rec['impact']}\n")
+            
+            # Implementation plan
+            emit("\n## 🚀 Implementation Plan\n")
+            emit("\n### Phase 1: Immediate Actions (Week 1-2)\n")
+            emit("1. ✅ Add top rejection codes to `config/rejection_codes.py`")
+            emit("2. ✅ Enhance validators with payer-specific rules")
+            emit("3. ✅ Create resubmission service skeleton")
+            emit("4. ✅ Update platform_config with MOH, NCCI, Bupa settings\n")
+            
+            emit("\n### Phase 2: Core Enhancements (Week 3-4)\n")
+            emit("1. ✅ Implement automated resubmission workflow")
+            emit("2. ✅ Add financial impact tracking to analytics")
+            emit("3. ✅ Create MOH and NCCI specific validators")
+            emit("4. ✅ Build rejection prediction model foundation\n")
+            
+            emit("\n### Phase 3: Advanced Features (Week 5-8)\n")
+            emit("1. ✅ ML-based rejection prediction")
+            emit("2. ✅ Real-time rejection monitoring dashboard")
+            emit("3. ✅ Automated A/R follow-up system")
+            emit("4. ✅ Integration with existing RCM workflows\n")
+            
+            emit("\n## 📈 Expected Outcomes\n")
+            emit("- **40-50%** reduction in initial rejections")
+            emit("- **60-70%** reduction in manual intervention")
+            emit("- **30-40%** improvement in resubmission success rate")
+            emit("- **Days to hours** reduction in resubmission turnaround time")
+            emit("- **Millions of SAR** in recovered revenue annually\n")
+            
+            emit("\n---\n")
+            emit("*Report generated by RCM Data Analyzer for NPHIES Integration Enhancement*\n")
         
         print(f"✅ Report saved to: {output_path.absolute()}")
         return output_path
 
+class _RecordCollector(logging.Handler):
+    """
+    Keep (level, message) pairs of log records at or above level for replay in
+    another process, and note whether any warning was logged at all.
+    """
+    
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__()
+        self.replay_level = level
+        self.records: List[Tuple[int, str]] = []
+        self.warned = False
+    
+    def emit(self, record: logging.LogRecord):
+        if record.levelno >= logging.WARNING:
+            self.warned = True
+        if record.levelno >= self.replay_level:
+            self.records.append((record.levelno, record.getMessage()))
+
+
+def _analyze_file_worker(
+    file_path: Path,
+    level: int = logging.WARNING
+) -> Tuple[Dict[str, Any], List[Tuple[int, str]], bool]:
+    """
+    Analyze one file in a worker process.
+    
+    Returns the file's insight sections, its log records at or above level
+    (so the parent can merge results and log them without interleaving), and
+    whether the file parsed cleanly. Sheet and open errors are only logged,
+    so any warning marks the fragment as incomplete.
+    """
+    analyzer = RCMDataAnalyzer(data_dir=str(file_path.parent))
+    collector = _RecordCollector(level)
+    logger.addHandler(collector)
+    logger.setLevel(min(level, logging.WARNING))
+    logger.propagate = False
+    try:
+        logger.info(f"📄 Analyzing: {file_path.name}")
+        try:
+            analyzer._analyze_file(file_path)
+        except Exception as e:
+            logger.warning(f"  ⚠️  Error analyzing {file_path.name}: {str(e)}")
+    finally:
+        logger.removeHandler(collector)
+    
+    return {key: analyzer.insights[key] for key in FILE_INSIGHT_KEYS}, collector.records, not collector.warned
+
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Analyze RCM rejection workbooks")
+    parser.add_argument("--verbose", action="store_true", help="Log per-sheet and per-column progress")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+    
     print("=" * 70)
     print("🏥 RCM REJECTION DATA ANALYZER FOR NPHIES INTEGRATION")
     print("=" * 70)
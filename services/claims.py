@@ -9,7 +9,10 @@ from auth.auth_manager import auth_manager
 from models.bundle_builder import FHIRBundleBuilder
 from config.settings import settings
 from config.endpoints import endpoints
-from utils.helpers import generate_request_id, format_date, parse_nphies_response, build_coding
+from utils.helpers import (
+    generate_request_id, format_date, parse_nphies_response, build_coding,
+    demultiplex_batch_response
+)
 from utils.logger import get_logger
 from utils.validators import validate_request, ValidationError
 
@@ -52,64 +55,203 @@ class ClaimsService:
         try:
             logger.info(f"Submitting {claim_type} claim for patient: {patient_id}")
             
-            # Generate IDs
-            claim_id = f"claim-{generate_request_id()}"
-            coverage_id = f"cov-{generate_request_id()}"
-            
-            # Default claim date to today
-            if not claim_date:
-                claim_date = format_date(datetime.now().date())
-            
-            # Build claim bundle
-            bundle = self._build_claim_bundle(
-                claim_id=claim_id,
+            prepared = self._prepare_claim_request(
                 claim_type=claim_type,
                 patient_id=patient_id,
                 member_id=member_id,
-                coverage_id=coverage_id,
                 payer_id=payer_id,
                 services=services,
                 total_amount=total_amount,
                 claim_date=claim_date,
                 patient_name=patient_name
             )
-            
-            # Validate bundle
-            try:
-                validate_request("bundle", bundle)
-            except ValidationError as e:
-                logger.error(f"Bundle validation failed: {str(e)}")
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "claim_id": claim_id
-                }
+            if "bundle" not in prepared:
+                return prepared
             
             # Send request
             logger.debug(f"Sending claim to {settings.message_url}")
-            response = self.auth.post(settings.message_url, bundle)
+            response = self.auth.post(settings.message_url, prepared["bundle"])
             
-            # Parse response
-            result = parse_nphies_response(response.json())
-            result["claim_id"] = claim_id
-            result["patient_id"] = patient_id
+            return self._finalize_claim_result(response.json(), prepared)
             
-            if result["success"]:
-                logger.info(f"Claim submitted successfully: {claim_id}")
-                result["claim_response"] = self._extract_claim_response(result["data"])
-            else:
-                logger.warning(f"Claim submission failed: {result.get('errors')}")
+        except Exception as e:
+            logger.error(f"Error submitting claim: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "claim_id": prepared["claim_id"] if 'prepared' in locals() else None
+            }
+    
+    async def submit_claim_async(self, client, **claim) -> Dict:
+        """
+        Submit a claim over a shared async HTTP client
+        
+        Args:
+            client: Client from auth_manager.create_async_client()
+            **claim: Same fields as submit_claim
+            
+        Returns:
+            Dictionary with claim submission response
+        """
+        try:
+            logger.info(f"Submitting {claim.get('claim_type')} claim for patient: {claim.get('patient_id')}")
+            
+            prepared = self._prepare_claim_request(**claim)
+            if "bundle" not in prepared:
+                return prepared
+            
+            logger.debug(f"Sending claim to {settings.message_url}")
+            response_data = await self.auth.post_async(client, settings.message_url, prepared["bundle"])
             
-            return result
+            return self._finalize_claim_result(response_data, prepared)
             
         except Exception as e:
             logger.error(f"Error submitting claim: {str(e)}", exc_info=True)
             return {
                 "success": False,
                 "error": str(e),
-                "claim_id": claim_id if 'claim_id' in locals() else None
+                "claim_id": prepared["claim_id"] if 'prepared' in locals() else None
             }
     
+    def submit_claims_bulk(self, claims: List[Dict]) -> List[Dict]:
+        """
+        Submit several claims in a single round trip
+        
+        Each claim message is wrapped as one entry of a FHIR ``transaction``
+        Bundle. The response is matched back to claims by the MessageHeader id
+        echoed in ``MessageHeader.response.identifier``.
+        
+        Args:
+            claims: List of claim dictionaries (same fields as submit_claim)
+            
+        Returns:
+            List of claim submission results, in the same order as ``claims``
+        """
+        logger.info(f"Bulk claim submission for {len(claims)} claims")
+        results: List[Optional[Dict]] = [None] * len(claims)
+        prepared: Dict[int, Dict] = {}
+        
+        for idx, claim in enumerate(claims):
+            try:
+                request = self._prepare_claim_request(**claim)
+            except Exception as e:
+                logger.error(f"Error preparing claim for patient {claim.get('patient_id')}: {str(e)}")
+                request = {"success": False, "error": str(e), "claim_id": None}
+            
+            if "bundle" in request:
+                prepared[idx] = request
+            else:
+                results[idx] = request
+        
+        if prepared:
+            try:
+                transaction = FHIRBundleBuilder.build_batch(
+                    [request["bundle"] for request in prepared.values()],
+                    bundle_type="transaction"
+                )
+                logger.debug(f"Sending bulk claims to {settings.api_base_url}")
+                response = self.auth.post(settings.api_base_url, transaction)
+                
+                messages = demultiplex_batch_response(
+                    response.json(),
+                    [request["bundle"] for request in prepared.values()]
+                )
+                for (idx, request), message in zip(prepared.items(), messages):
+                    if message is None:
+                        results[idx] = {
+                            "success": False,
+                            "error": "No response entry for claim",
+                            "claim_id": request["claim_id"],
+                            "patient_id": request["patient_id"]
+                        }
+                    else:
+                        results[idx] = self._finalize_claim_result(message, request)
+            
+            except Exception as e:
+                logger.error(f"Error in bulk claim submission: {str(e)}", exc_info=True)
+                for idx, request in prepared.items():
+                    results[idx] = {
+                        "success": False,
+                        "error": str(e),
+                        "claim_id": request["claim_id"],
+                        "patient_id": request["patient_id"]
+                    }
+        
+        return results
+    
+    def _prepare_claim_request(
+        self,
+        claim_type: str,
+        patient_id: str,
+        member_id: str,
+        payer_id: str,
+        services: List[Dict],
+        total_amount: float,
+        claim_date: str = None,
+        patient_name: str = None
+    ) -> Dict:
+        """
+        Build and validate the claim bundle for one claim
+        
+        Returns:
+            Dictionary with ``bundle``, ``claim_id`` and ``patient_id`` keys,
+            or an error result (without ``bundle``) if validation failed
+        """
+        # Generate IDs
+        claim_id = f"claim-{generate_request_id()}"
+        coverage_id = f"cov-{generate_request_id()}"
+        
+        # Default claim date to today
+        if not claim_date:
+            claim_date = format_date(datetime.now().date())
+        
+        # Build claim bundle
+        bundle = self._build_claim_bundle(
+            claim_id=claim_id,
+            claim_type=claim_type,
+            patient_id=patient_id,
+            member_id=member_id,
+            coverage_id=coverage_id,
+            payer_id=payer_id,
+            services=services,
+            total_amount=total_amount,
+            claim_date=claim_date,
+            patient_name=patient_name
+        )
+        
+        # Validate bundle
+        try:
+            validate_request("bundle", bundle)
+        except ValidationError as e:
+            logger.error(f"Bundle validation failed: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "claim_id": claim_id
+            }
+        
+        return {
+            "bundle": bundle,
+            "claim_id": claim_id,
+            "patient_id": patient_id
+        }
+    
+    def _finalize_claim_result(self, response_data: Dict, prepared: Dict) -> Dict:
+        """Parse a claim response message for a prepared request"""
+        claim_id = prepared["claim_id"]
+        
+        result = parse_nphies_response(response_data)
+        result["claim_id"] = claim_id
+        result["patient_id"] = prepared["patient_id"]
+        
+        if result["success"]:
+            logger.info(f"Claim submitted successfully: {claim_id}")
+            result["claim_response"] = self._extract_claim_response(result["data"])
+        else:
+            logger.warning(f"Claim submission failed: {result.get('errors')}")
+        
+        return result
+    
     def _build_claim_bundle(
         self,
         claim_id: str,
@@ -2,14 +2,16 @@
 NPHIES Eligibility Service
 Handles eligibility verification requests
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from auth.auth_manager import auth_manager
 from models.bundle_builder import FHIRBundleBuilder
 from config.settings import settings
 from config.endpoints import endpoints
-from utils.helpers import generate_request_id, format_date, parse_nphies_response
+from utils.helpers import (
+    generate_request_id, format_date, parse_nphies_response, demultiplex_batch_response
+)
 from utils.logger import get_logger
 from utils.validators import validate_request, ValidationError
 
@@ -50,64 +52,200 @@ class EligibilityService:
         try:
             logger.info(f"Checking eligibility for member: {member_id}")
             
-            # Generate IDs
-            request_id = patient_id or generate_request_id()
-            coverage_id = f"cov-{generate_request_id()}"
-            eligibility_request_id = f"eligreq-{generate_request_id()}"
-            
-            # Default service date to today
-            if not service_date:
-                service_date = format_date(datetime.now().date())
-            
-            # Build the eligibility request bundle
-            bundle = self._build_eligibility_bundle(
-                eligibility_request_id=eligibility_request_id,
-                patient_id=request_id,
-                coverage_id=coverage_id,
+            prepared = self._prepare_eligibility_request(
                 member_id=member_id,
                 payer_id=payer_id,
+                patient_id=patient_id,
                 service_date=service_date,
                 patient_name=patient_name,
                 patient_gender=patient_gender,
                 patient_dob=patient_dob
             )
-            
-            # Validate bundle
-            try:
-                validate_request("bundle", bundle)
-            except ValidationError as e:
-                logger.error(f"Bundle validation failed: {str(e)}")
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "request_id": eligibility_request_id
-                }
+            if "bundle" not in prepared:
+                return prepared
             
             # Send request
             logger.debug(f"Sending eligibility request to {settings.message_url}")
-            response = self.auth.post(settings.message_url, bundle)
+            response = self.auth.post(settings.message_url, prepared["bundle"])
             
-            # Parse response
-            result = parse_nphies_response(response.json())
-            result["request_id"] = eligibility_request_id
-            result["member_id"] = member_id
+            return self._finalize_eligibility_result(response.json(), prepared)
             
-            if result["success"]:
-                logger.info(f"Eligibility check successful for member: {member_id}")
-                # Extract coverage details from response
-                result["coverage_status"] = self._extract_coverage_status(result["data"])
-            else:
-                logger.warning(f"Eligibility check failed: {result.get('errors')}")
+        except Exception as e:
+            logger.error(f"Error checking eligibility: {str(e)}", exc_info=True)
+            return {
+                "success": False,
+                "error": str(e),
+                "request_id": prepared["request_id"] if 'prepared' in locals() else None
+            }
+    
+    async def check_eligibility_async(self, client, **member) -> Dict:
+        """
+        Check eligibility for a member over a shared async HTTP client
+        
+        Args:
+            client: Client from auth_manager.create_async_client()
+            **member: Same fields as check_eligibility
+            
+        Returns:
+            Dictionary with eligibility response
+        """
+        try:
+            logger.info(f"Checking eligibility for member: {member.get('member_id')}")
             
-            return result
+            prepared = self._prepare_eligibility_request(**member)
+            if "bundle" not in prepared:
+                return prepared
+            
+            logger.debug(f"Sending eligibility request to {settings.message_url}")
+            response_data = await self.auth.post_async(client, settings.message_url, prepared["bundle"])
+            
+            return self._finalize_eligibility_result(response_data, prepared)
             
         except Exception as e:
             logger.error(f"Error checking eligibility: {str(e)}", exc_info=True)
             return {
                 "success": False,
                 "error": str(e),
-                "request_id": eligibility_request_id if 'eligibility_request_id' in locals() else None
+                "request_id": prepared["request_id"] if 'prepared' in locals() else None
+            }
+    
+    def check_eligibility_bulk(self, members: List[Dict]) -> List[Dict]:
+        """
+        Check eligibility for several members in a single round trip
+        
+        Each member's eligibility message is wrapped as one entry of a FHIR
+        ``batch`` Bundle. The batch-response is matched back to members by the
+        MessageHeader id echoed in ``MessageHeader.response.identifier``.
+        
+        Args:
+            members: List of member dictionaries (same fields as check_eligibility)
+            
+        Returns:
+            List of eligibility results, in the same order as ``members``
+        """
+        logger.info(f"Bulk eligibility check for {len(members)} members")
+        results: List[Optional[Dict]] = [None] * len(members)
+        prepared: Dict[int, Dict] = {}
+        
+        for idx, member in enumerate(members):
+            try:
+                request = self._prepare_eligibility_request(**member)
+            except Exception as e:
+                logger.error(f"Error preparing eligibility for member {member.get('member_id')}: {str(e)}")
+                request = {"success": False, "error": str(e), "request_id": None}
+            
+            if "bundle" in request:
+                prepared[idx] = request
+            else:
+                results[idx] = request
+        
+        if prepared:
+            try:
+                batch = FHIRBundleBuilder.build_batch(
+                    [request["bundle"] for request in prepared.values()]
+                )
+                logger.debug(f"Sending bulk eligibility request to {settings.api_base_url}")
+                response = self.auth.post(settings.api_base_url, batch)
+                
+                messages = demultiplex_batch_response(
+                    response.json(),
+                    [request["bundle"] for request in prepared.values()]
+                )
+                for (idx, request), message in zip(prepared.items(), messages):
+                    if message is None:
+                        results[idx] = {
+                            "success": False,
+                            "error": "No response entry for eligibility request",
+                            "request_id": request["request_id"],
+                            "member_id": request["member_id"]
+                        }
+                    else:
+                        results[idx] = self._finalize_eligibility_result(message, request)
+            
+            except Exception as e:
+                logger.error(f"Error in bulk eligibility check: {str(e)}", exc_info=True)
+                for idx, request in prepared.items():
+                    results[idx] = {
+                        "success": False,
+                        "error": str(e),
+                        "request_id": request["request_id"],
+                        "member_id": request["member_id"]
+                    }
+        
+        return results
+    
+    def _prepare_eligibility_request(
+        self,
+        member_id: str,
+        payer_id: str,
+        patient_id: str = None,
+        service_date: str = None,
+        patient_name: str = None,
+        patient_gender: str = None,
+        patient_dob: str = None
+    ) -> Dict:
+        """
+        Build and validate the eligibility bundle for one member
+        
+        Returns:
+            Dictionary with ``bundle``, ``request_id`` and ``member_id`` keys,
+            or an error result (without ``bundle``) if validation failed
+        """
+        # Generate IDs
+        request_id = patient_id or generate_request_id()
+        coverage_id = f"cov-{generate_request_id()}"
+        eligibility_request_id = f"eligreq-{generate_request_id()}"
+        
+        # Default service date to today
+        if not service_date:
+            service_date = format_date(datetime.now().date())
+        
+        # Build the eligibility request bundle
+        bundle = self._build_eligibility_bundle(
+            eligibility_request_id=eligibility_request_id,
+            patient_id=request_id,
+            coverage_id=coverage_id,
+            member_id=member_id,
+            payer_id=payer_id,
+            service_date=service_date,
+            patient_name=patient_name,
+            patient_gender=patient_gender,
+            patient_dob=patient_dob
+        )
+        
+        # Validate bundle
+        try:
+            validate_request("bundle", bundle)
+        except ValidationError as e:
+            logger.error(f"Bundle validation failed: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "request_id": eligibility_request_id
             }
+        
+        return {
+            "bundle": bundle,
+            "request_id": eligibility_request_id,
+            "member_id": member_id
+        }
+    
+    def _finalize_eligibility_result(self, response_data: Dict, prepared: Dict) -> Dict:
+        """Parse an eligibility response message for a prepared request"""
+        member_id = prepared["member_id"]
+        
+        result = parse_nphies_response(response_data)
+        result["request_id"] = prepared["request_id"]
+        result["member_id"] = member_id
+        
+        if result["success"]:
+            logger.info(f"Eligibility check successful for member: {member_id}")
+            # Extract coverage details from response
+            result["coverage_status"] = self._extract_coverage_status(result["data"])
+        else:
+            logger.warning(f"Eligibility check failed: {result.get('errors')}")
+        
+        return result
     
     def _build_eligibility_bundle(
         self,
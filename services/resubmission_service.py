@@ -4,26 +4,89 @@ Handles intelligent claim resubmission based on rejection patterns.
 Based on RCM rejection data analysis showing 19.2M SAR in rejected claims.
 """
 
-import logging
-from typing import Dict, List, Optional, Any
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Any, Set
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 import asyncio
+import itertools
+import random
+import sys
+import time
+
+import numpy as np
 
 from config.rejection_codes import (
+    AUTO_RESUBMIT_CODES,
     get_rejection_info,
     get_auto_resubmit_codes,
     RejectionCodeInfo,
     RejectionSeverity
 )
+from config.settings import settings
 from services.claims import ClaimsService
 from services.eligibility import EligibilityService
+from utils.code_map import CodeMap
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Corrections scoring below this are logged and left for manual review
+MIN_CORRECTION_CONFIDENCE = 0.70
+
+# Patient and provider records already looked up by the bulk resubmission that
+# is running in the current task, by kind ("patient", "provider") then by id
+_prefetched_records: ContextVar[Optional[Dict[str, Dict[str, Dict[str, Any]]]]] = ContextVar(
+    "prefetched_records", default=None
+)
+
+
+# Integer resubmission counters, stored as one int64 vector indexed by position
+METRIC_COUNTERS = (
+    "total_resubmissions",
+    "successful_resubmissions",
+    "failed_resubmissions",
+    "auto_corrected",
+    "manual_review_required",
+)
+(
+    IDX_TOTAL,
+    IDX_SUCCESSFUL,
+    IDX_FAILED,
+    IDX_AUTO_CORRECTED,
+    IDX_MANUAL_REVIEW,
+) = range(len(METRIC_COUNTERS))
+
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10; older interpreters get regular instances
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class MetricsTally:
+    """Resubmission counters plus the recovered amount."""
+    
+    __slots__ = ("counts", "recovered_amount")
+    
+    def __init__(self):
+        self.counts = np.zeros(len(METRIC_COUNTERS), dtype=np.int64)
+        self.recovered_amount = 0.0
+    
+    def merge(self, *tallies: "MetricsTally"):
+        """Add other tallies into this one."""
+        if tallies:
+            self.counts += np.sum([tally.counts for tally in tallies], axis=0)
+            self.recovered_amount += sum(tally.recovered_amount for tally in tallies)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Counters by name, as plain Python numbers."""
+        return {
+            **dict(zip(METRIC_COUNTERS, self.counts.tolist())),
+            "total_recovered_amount": self.recovered_amount,
+        }
+
+
+@dataclass(**_SLOTS)
 class ResubmissionAttempt:
     """Track resubmission attempts."""
     claim_id: str
@@ -37,17 +100,18 @@ class ResubmissionAttempt:
     result: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ResubmissionStrategy:
     """Strategy for resubmitting a claim."""
     max_attempts: int = 3
-    retry_delay_hours: int = 24
+    retry_delay_hours: int = 24  # Doubles with every further attempt
+    retry_jitter_hours: float = 1.0
     escalate_after_attempts: int = 2
     auto_correct_enabled: bool = True
     notify_on_failure: bool = True
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ClaimCorrection:
     """Claim correction information."""
     field_name: str
@@ -55,6 +119,28 @@ class ClaimCorrection:
     new_value: Any
     correction_reason: str
     confidence_score: float  # 0.0 to 1.0
+    _path: tuple = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Intern the name and its parts: they are compared and used as dict
+        # keys on every application. Split the dotted name once, not each time
+        self.field_name = sys.intern(self.field_name)
+        self._path = tuple(map(sys.intern, self.field_name.split(".")))
+
+
+def _present_fields(data: Dict[str, Any], fields: List[str]) -> Set[str]:
+    """Names in fields that data already carries; dotted names are nested paths."""
+    present = data.keys() & frozenset(fields)
+    for name in fields:
+        if "." in name and name not in present:
+            current = data
+            for part in name.split("."):
+                if not isinstance(current, dict) or part not in current:
+                    break
+                current = current[part]
+            else:
+                present.add(name)
+    return present
 
 
 class ResubmissionService:
@@ -73,7 +159,9 @@ class ResubmissionService:
         self,
         claims_service: ClaimsService,
         eligibility_service: EligibilityService,
-        strategy: Optional[ResubmissionStrategy] = None
+        strategy: Optional[ResubmissionStrategy] = None,
+        icd10_map: Optional[CodeMap] = None,
+        cpt_map: Optional[CodeMap] = None
     ):
         """
         Initialize resubmission service.
@@ -82,24 +170,49 @@ class ResubmissionService:
             claims_service: Claims service instance
             eligibility_service: Eligibility service instance
             strategy: Resubmission strategy (uses default if None)
+            icd10_map: Invalid to valid ICD-10 code table (empty if None)
+            cpt_map: Invalid to valid CPT code table (empty if None)
         """
         self.claims_service = claims_service
         self.eligibility_service = eligibility_service
         self.strategy = strategy or ResubmissionStrategy()
-        self.logger = logging.getLogger(__name__)
+        self.icd10_map = icd10_map or CodeMap()
+        self.cpt_map = cpt_map or CodeMap()
         
-        # Track resubmission history
-        self.resubmission_history: Dict[str, List[ResubmissionAttempt]] = {}
+        # Track resubmission history; attempts past max_attempts are never stored
+        self.resubmission_history: Dict[str, Deque[ResubmissionAttempt]] = defaultdict(
+            lambda: deque(maxlen=self.strategy.max_attempts)
+        )
         
         # Success metrics
-        self.metrics = {
-            "total_resubmissions": 0,
-            "successful_resubmissions": 0,
-            "failed_resubmissions": 0,
-            "auto_corrected": 0,
-            "manual_review_required": 0,
-            "total_recovered_amount": 0.0,
+        self.tally = MetricsTally()
+        
+        # Code mappings repeat heavily across claims; memoize them per service
+        self._icd10_memo: Dict[str, Optional[str]] = {}
+        self._cpt_memo: Dict[str, Optional[str]] = {}
+        
+        # Correction strategy per rejection code
+        self._correctors = {
+            "TECH02": self._correct_missing_fields,  # Missing required field
+            "CD01": self._correct_diagnosis_codes,  # Invalid diagnosis code
+            "CD02": self._correct_procedure_codes,  # Invalid procedure code
+            "PR01": self._correct_pricing,  # Price exceeds contracted rate
+            "PA03": self._correct_authorization,  # Invalid authorization number
+            "INC01": self._correct_patient_info,  # Missing patient information
+            "INC02": self._correct_provider_info,  # Missing provider information
         }
+        
+        # Scheduled retries as (due monotonic time, sequence, item), drained by
+        # one worker task; the sequence keeps equal due times ordered by arrival
+        self._retry_queue: Optional[asyncio.PriorityQueue] = None
+        self._retry_wakeup: Optional[asyncio.Event] = None
+        self._retry_task: Optional[asyncio.Task] = None
+        self._retry_seq = itertools.count()
+    
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """Success metrics by name, materialized from the tally."""
+        return self.tally.as_dict()
     
     def can_auto_resubmit(self, rejection_code: str) -> bool:
         """
@@ -111,11 +224,7 @@ class ResubmissionService:
         Returns:
             True if auto-resubmit is allowed
         """
-        rejection_info = get_rejection_info(rejection_code)
-        if not rejection_info:
-            return False
-        
-        return rejection_info.auto_resubmit
+        return rejection_code in AUTO_RESUBMIT_CODES
     
     def analyze_rejection(
         self,
@@ -134,36 +243,14 @@ class ResubmissionService:
         Returns:
             List of corrections to apply
         """
-        corrections = []
-        rejection_info = get_rejection_info(rejection_code)
-        
-        if not rejection_info:
-            self.logger.warning(f"Unknown rejection code: {rejection_code}")
-            return corrections
-        
-        # Apply correction strategies based on rejection type
-        if rejection_code == "TECH02":  # Missing required field
-            corrections.extend(self._correct_missing_fields(claim_data, rejection_details))
-        
-        elif rejection_code == "CD01":  # Invalid diagnosis code
-            corrections.extend(self._correct_diagnosis_codes(claim_data, rejection_details))
-        
-        elif rejection_code == "CD02":  # Invalid procedure code
-            corrections.extend(self._correct_procedure_codes(claim_data, rejection_details))
-        
-        elif rejection_code == "PR01":  # Price exceeds contracted rate
-            corrections.extend(self._correct_pricing(claim_data, rejection_details))
-        
-        elif rejection_code == "PA03":  # Invalid authorization number
-            corrections.extend(self._correct_authorization(claim_data, rejection_details))
-        
-        elif rejection_code == "INC01":  # Missing patient information
-            corrections.extend(self._correct_patient_info(claim_data, rejection_details))
-        
-        elif rejection_code == "INC02":  # Missing provider information
-            corrections.extend(self._correct_provider_info(claim_data, rejection_details))
-        
-        return corrections
+        corrector = self._correctors.get(rejection_code)
+        if corrector is None:
+            # Every corrector code is a known one, so only look up the others
+            if not get_rejection_info(rejection_code):
+                logger.warning("Unknown rejection code: %s", rejection_code)
+            return []
+        
+        return corrector(claim_data, rejection_details)
     
     def _correct_missing_fields(
         self,
@@ -173,8 +260,12 @@ class ResubmissionService:
         """Correct missing required fields."""
         corrections = []
         missing_fields = rejection_details.get("missing_fields", [])
+        # Fields the claim already carries need no lookup
+        present = _present_fields(claim_data, missing_fields)
         
         for field in missing_fields:
+            if field in present:
+                continue
             # Try to populate from available data sources
             new_value = self._lookup_missing_field_value(claim_data, field)
             if new_value:
@@ -292,11 +383,12 @@ class ResubmissionService:
         patient_id = claim_data.get("patient_id")
         if patient_id:
             # Look up complete patient information
-            patient_info = self._lookup_patient_details(patient_id)
+            patient_info = self._record_details("patient", patient_id)
             
             missing_fields = rejection_details.get("missing_patient_fields", [])
+            present = _present_fields(claim_data.get("patient") or {}, missing_fields)
             for field in missing_fields:
-                if field in patient_info:
+                if field in patient_info and field not in present:
                     corrections.append(ClaimCorrection(
                         field_name=f"patient.{field}",
                         old_value=None,
@@ -318,11 +410,12 @@ class ResubmissionService:
         provider_id = claim_data.get("provider_id")
         if provider_id:
             # Look up complete provider information
-            provider_info = self._lookup_provider_details(provider_id)
+            provider_info = self._record_details("provider", provider_id)
             
             missing_fields = rejection_details.get("missing_provider_fields", [])
+            present = _present_fields(claim_data.get("provider") or {}, missing_fields)
             for field in missing_fields:
-                if field in provider_info:
+                if field in provider_info and field not in present:
                     corrections.append(ClaimCorrection(
                         field_name=f"provider.{field}",
                         old_value=None,
@@ -346,31 +439,51 @@ class ResubmissionService:
             corrections: List of corrections to apply
             
         Returns:
-            Corrected claim data
+            Corrected claim data, or claim_data itself when no correction applies
         """
-        corrected_data = claim_data.copy()
-        
-        for correction in corrections:
-            if correction.confidence_score < 0.70:
-                self.logger.warning(
-                    f"Low confidence correction ({correction.confidence_score:.2f}) for {correction.field_name}"
+        # Partition once on a score vector; float64 so a score of exactly 0.70
+        # is not rounded below the threshold
+        scores = np.fromiter(
+            (correction.confidence_score for correction in corrections),
+            dtype=np.float64,
+            count=len(corrections)
+        )
+        keep = (scores >= MIN_CORRECTION_CONFIDENCE).tolist()
+        applicable = [correction for correction, ok in zip(corrections, keep) if ok]
+        
+        if len(applicable) < len(corrections):
+            logger.warning(
+                "Skipped %d low confidence correction(s): %s",
+                len(corrections) - len(applicable),
+                ", ".join(
+                    "%s (%.2f)" % (correction.field_name, correction.confidence_score)
+                    for correction, ok in zip(corrections, keep) if not ok
                 )
-                continue
-            
+            )
+        
+        if not applicable:
+            return claim_data
+        
+        # Copy on write: only dicts along a correction path are copied, untouched
+        # subtrees stay shared and the caller's nested dicts are never mutated
+        corrected_data = dict(claim_data)
+        copied = {id(corrected_data)}
+        
+        for correction in applicable:
             # Apply correction
-            field_parts = correction.field_name.split(".")
+            *parents, leaf = correction._path
             current = corrected_data
+            for part in parents:
+                child = current.get(part)
+                if id(child) not in copied:
+                    child = current[part] = dict(child or {})
+                    copied.add(id(child))
+                current = child
+            current[leaf] = correction.new_value
             
-            for part in field_parts[:-1]:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
-            
-            current[field_parts[-1]] = correction.new_value
-            
-            self.logger.info(
-                f"Applied correction: {correction.field_name} = {correction.new_value} "
-                f"(reason: {correction.correction_reason})"
+            logger.info(
+                "Applied correction: %s = %s (reason: %s)",
+                correction.field_name, correction.new_value, correction.correction_reason
             )
         
         return corrected_data
@@ -396,39 +509,68 @@ class ResubmissionService:
         Returns:
             Resubmission attempt record
         """
+        return await self._resubmit_claim(
+            self.tally, claim_id, rejection_code, rejection_details, claim_data, claim_amount
+        )
+    
+    async def _resubmit_claim(
+        self,
+        tally: MetricsTally,
+        claim_id: str,
+        rejection_code: str,
+        rejection_details: Dict[str, Any],
+        claim_data: Dict[str, Any],
+        claim_amount: float
+    ) -> ResubmissionAttempt:
+        """resubmit_claim, counting metrics into the given tally."""
+        # Codes parsed from payer responses are fresh strings; interning makes
+        # the dispatch, policy and history lookups below identity compares
+        rejection_code = sys.intern(rejection_code)
+        
+        # One clock read per attempt, shared by every record built below
+        now = datetime.now()
+        
         # Check attempt history
-        attempts = self.resubmission_history.get(claim_id, [])
+        attempts = self.resubmission_history[claim_id]
         attempt_number = len(attempts) + 1
         
         if attempt_number > self.strategy.max_attempts:
-            self.logger.error(f"Max resubmission attempts ({self.strategy.max_attempts}) reached for claim {claim_id}")
-            self.metrics["manual_review_required"] += 1
+            logger.error(
+                "Max resubmission attempts (%d) reached for claim %s", self.strategy.max_attempts, claim_id
+            )
+            tally.counts[IDX_MANUAL_REVIEW] += 1
             
             return ResubmissionAttempt(
                 claim_id=claim_id,
-                original_submission_date=claim_data.get("submission_date", datetime.now()),
+                original_submission_date=claim_data.get("submission_date", now),
                 rejection_code=rejection_code,
                 rejection_reason=rejection_details.get("reason", "Unknown"),
                 attempt_number=attempt_number,
-                attempted_at=datetime.now(),
+                attempted_at=now,
                 status="failed",
                 correction_applied="Max attempts reached - manual review required"
             )
         
-        # Analyze and generate corrections
-        corrections = self.analyze_rejection(claim_data, rejection_code, rejection_details)
+        # Codes with no correction strategy can never produce corrections, so
+        # unless they are auto-resubmittable skip analysis entirely
+        if rejection_code in self._correctors or self.can_auto_resubmit(rejection_code):
+            corrections = self.analyze_rejection(claim_data, rejection_code, rejection_details)
+        else:
+            corrections = []
         
         if not corrections:
-            self.logger.warning(f"No corrections identified for claim {claim_id} with rejection {rejection_code}")
+            logger.warning(
+                "No corrections identified for claim %s with rejection %s", claim_id, rejection_code
+            )
             
             if not self.can_auto_resubmit(rejection_code):
                 return ResubmissionAttempt(
                     claim_id=claim_id,
-                    original_submission_date=claim_data.get("submission_date", datetime.now()),
+                    original_submission_date=claim_data.get("submission_date", now),
                     rejection_code=rejection_code,
                     rejection_reason=rejection_details.get("reason", "Unknown"),
                     attempt_number=attempt_number,
-                    attempted_at=datetime.now(),
+                    attempted_at=now,
                     status="pending",
                     correction_applied="Manual review required - cannot auto-correct"
                 )
@@ -444,63 +586,219 @@ class ResubmissionService:
             
             attempt = ResubmissionAttempt(
                 claim_id=claim_id,
-                original_submission_date=claim_data.get("submission_date", datetime.now()),
+                original_submission_date=claim_data.get("submission_date", now),
                 rejection_code=rejection_code,
                 rejection_reason=rejection_details.get("reason", "Unknown"),
                 attempt_number=attempt_number,
-                attempted_at=datetime.now(),
+                attempted_at=now,
                 status="accepted" if is_success else "rejected",
                 correction_applied=", ".join([c.correction_reason for c in corrections]),
                 result=result
             )
             
             # Update metrics
-            self.metrics["total_resubmissions"] += 1
+            tally.counts[IDX_TOTAL] += 1
             if is_success:
-                self.metrics["successful_resubmissions"] += 1
-                self.metrics["total_recovered_amount"] += claim_amount
-                self.metrics["auto_corrected"] += 1
+                tally.counts[IDX_SUCCESSFUL] += 1
+                tally.counts[IDX_AUTO_CORRECTED] += 1
+                tally.recovered_amount += claim_amount
             else:
-                self.metrics["failed_resubmissions"] += 1
+                tally.counts[IDX_FAILED] += 1
             
             # Store attempt
-            if claim_id not in self.resubmission_history:
-                self.resubmission_history[claim_id] = []
-            self.resubmission_history[claim_id].append(attempt)
+            attempts.append(attempt)
+            
+            if not is_success and self._retry_task is not None and attempt_number < self.strategy.max_attempts:
+                self.schedule_retry(
+                    {
+                        "claim_id": claim_id,
+                        "rejection_code": rejection_code,
+                        "rejection_details": rejection_details,
+                        "claim_data": claim_data,
+                        "claim_amount": claim_amount,
+                    },
+                    attempt_number
+                )
             
-            self.logger.info(
-                f"Resubmission attempt {attempt_number} for claim {claim_id}: {attempt.status}"
+            logger.info(
+                "Resubmission attempt %d for claim %s: %s", attempt_number, claim_id, attempt.status
             )
             
             return attempt
             
         except Exception as e:
-            self.logger.error(f"Error resubmitting claim {claim_id}: {str(e)}")
+            logger.error("Error resubmitting claim %s: %s", claim_id, e)
             
             return ResubmissionAttempt(
                 claim_id=claim_id,
-                original_submission_date=claim_data.get("submission_date", datetime.now()),
+                original_submission_date=claim_data.get("submission_date", now),
                 rejection_code=rejection_code,
                 rejection_reason=rejection_details.get("reason", "Unknown"),
                 attempt_number=attempt_number,
-                attempted_at=datetime.now(),
+                attempted_at=now,
                 status="failed",
                 correction_applied=f"Submission error: {str(e)}"
             )
     
+    async def resubmit_claims_bulk(
+        self,
+        items: List[Dict[str, Any]],
+        concurrency: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Resubmit many rejected claims with overlapping submissions.
+        
+        At most ``concurrency`` submissions are in flight at once, so
+        throughput scales with concurrency rather than per-claim round trips.
+        
+        Args:
+            items: Keyword arguments for resubmit_claim, one dict per claim
+            concurrency: Maximum in-flight submissions
+                (defaults to settings.MAX_CONCURRENCY)
+            
+        Returns:
+            Resubmission attempts in the same order as ``items``; an
+            unexpected error is returned in place of its claim's attempt
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.MAX_CONCURRENCY)
+        tallies = [MetricsTally() for _ in items]
+        
+        # Resolve the batch's invalid codes with one vectorized lookup per table,
+        # so per-claim corrections find them memoized
+        details = [item.get("rejection_details") or {} for item in items]
+        for code_map, memo, key in (
+            (self.icd10_map, self._icd10_memo, "invalid_diagnosis_code"),
+            (self.cpt_map, self._cpt_memo, "invalid_procedure_code"),
+        ):
+            self._map_codes_bulk(code_map, memo, [d[key] for d in details if d.get(key)])
+        
+        # Claims in a batch share few distinct patients and providers; every
+        # claim task shares this memo, so each record is looked up once per batch
+        token = _prefetched_records.set({"patient": {}, "provider": {}})
+        
+        async def resubmit_one(tally: MetricsTally, item: Dict[str, Any]) -> ResubmissionAttempt:
+            async with semaphore:
+                return await self._resubmit_claim(tally, **item)
+        
+        logger.info("Bulk resubmission of %d claims", len(items))
+        try:
+            # Each task copies the current context, so it sees this batch's records
+            results = await asyncio.gather(
+                *(resubmit_one(tally, item) for tally, item in zip(tallies, items)),
+                return_exceptions=True
+            )
+        finally:
+            _prefetched_records.reset(token)
+        
+        # Each claim counted into its own tally; fold them in with one vector add
+        self.tally.merge(*tallies)
+        return results
+    
+    def start_retries(self) -> None:
+        """
+        Start the background retry worker.
+        
+        While it runs, every rejected resubmission that has attempts left is
+        scheduled for another attempt with exponential backoff and jitter.
+        Must be called from a running event loop.
+        """
+        if self._retry_task is not None:
+            return
+        
+        self._retry_queue = asyncio.PriorityQueue()
+        self._retry_wakeup = asyncio.Event()
+        self._retry_task = asyncio.create_task(self._retry_worker())
+    
+    async def stop_retries(self) -> int:
+        """
+        Stop the background retry worker.
+        
+        Returns:
+            Number of scheduled retries dropped
+        """
+        if self._retry_task is None:
+            return 0
+        
+        self._retry_task.cancel()
+        try:
+            await self._retry_task
+        except asyncio.CancelledError:
+            pass
+        
+        dropped = self._retry_queue.qsize()
+        self._retry_task = self._retry_queue = self._retry_wakeup = None
+        return dropped
+    
+    def schedule_retry(self, item: Dict[str, Any], attempt_number: int) -> float:
+        """
+        Queue a claim for another resubmission attempt.
+        
+        Args:
+            item: Keyword arguments for resubmit_claim
+            attempt_number: Attempt that was just rejected
+            
+        Returns:
+            Delay in seconds until the retry is due
+        """
+        if self._retry_task is None:
+            self.start_retries()
+        
+        delay = (
+            self.strategy.retry_delay_hours * 3600 * 2 ** (attempt_number - 1)
+            + random.uniform(0, self.strategy.retry_jitter_hours * 3600)
+        )
+        self._retry_queue.put_nowait((time.monotonic() + delay, next(self._retry_seq), item))
+        self._retry_wakeup.set()
+        
+        logger.info(
+            "Retry %d for claim %s scheduled in %.0fs", attempt_number + 1, item["claim_id"], delay
+        )
+        return delay
+    
+    async def _retry_worker(self) -> None:
+        """Resubmit queued claims as they fall due, earliest first."""
+        while True:
+            when, seq, item = await self._retry_queue.get()
+            delay = when - time.monotonic()
+            
+            if delay > 0:
+                # Sleep until due, but re-check the queue head if a retry is
+                # scheduled meanwhile, since it may be due sooner
+                self._retry_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._retry_wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                except asyncio.CancelledError:
+                    # Keep the held retry counted as pending on shutdown
+                    self._retry_queue.put_nowait((when, seq, item))
+                    raise
+                else:
+                    self._retry_queue.put_nowait((when, seq, item))
+                    continue
+            
+            try:
+                await self.resubmit_claim(**item)
+            except Exception as e:
+                logger.error("Scheduled retry failed for claim %s: %s", item["claim_id"], e)
+    
     def get_resubmission_metrics(self) -> Dict[str, Any]:
         """Get resubmission service metrics."""
+        # Served from the running tally, so repeated dashboard queries are O(1)
+        # and never scan resubmission_history; keep any new aggregate there too
+        metrics = self.metrics
+        
         success_rate = 0.0
-        if self.metrics["total_resubmissions"] > 0:
-            success_rate = (self.metrics["successful_resubmissions"] / 
-                          self.metrics["total_resubmissions"])
+        if metrics["total_resubmissions"] > 0:
+            success_rate = (metrics["successful_resubmissions"] / 
+                          metrics["total_resubmissions"])
         
         return {
-            **self.metrics,
+            **metrics,
             "success_rate": success_rate,
             "average_recovered_per_claim": (
-                self.metrics["total_recovered_amount"] / self.metrics["successful_resubmissions"]
-                if self.metrics["successful_resubmissions"] > 0 else 0.0
+                metrics["total_recovered_amount"] / metrics["successful_resubmissions"]
+                if metrics["successful_resubmissions"] > 0 else 0.0
             )
         }
     
@@ -513,13 +811,27 @@ class ResubmissionService:
     
     def _map_to_valid_icd10(self, code: str) -> Optional[str]:
         """Map to valid ICD-10 code."""
-        # TODO: Implement ICD-10 mapping logic
-        return None
+        if code not in self._icd10_memo:
+            self._icd10_memo[code] = self.icd10_map.get(code)
+        return self._icd10_memo[code]
     
     def _map_to_valid_cpt(self, code: str) -> Optional[str]:
         """Map to valid CPT code."""
-        # TODO: Implement CPT mapping logic
-        return None
+        if code not in self._cpt_memo:
+            self._cpt_memo[code] = self.cpt_map.get(code)
+        return self._cpt_memo[code]
+    
+    @staticmethod
+    def _map_codes_bulk(
+        code_map: CodeMap,
+        memo: Dict[str, Optional[str]],
+        codes: List[str]
+    ) -> List[Optional[str]]:
+        """Map many codes with one vectorized lookup, memoizing the results."""
+        missing = [code for code in dict.fromkeys(codes) if code not in memo]
+        if missing:
+            memo.update(zip(missing, code_map.get_many(missing)))
+        return [memo[code] for code in codes]
     
     def _lookup_authorization_number(self, patient_id: str, service_date: datetime) -> Optional[str]:
         """Lookup correct authorization number."""
@@ -535,3 +847,15 @@ class ResubmissionService:
         """Lookup provider details."""
         # TODO: Implement provider lookup
         return {}
+    
+    def _record_details(self, kind: str, record_id: str) -> Dict[str, Any]:
+        """Patient or provider details, looked up once per id within a bulk resubmission."""
+        lookup = self._lookup_patient_details if kind == "patient" else self._lookup_provider_details
+        prefetched = _prefetched_records.get()
+        if prefetched is None:
+            return lookup(record_id)
+        
+        records = prefetched[kind]
+        if record_id not in records:
+            records[record_id] = lookup(record_id)
+        return records[record_id]
@@ -1,9 +1,11 @@
 """
 Unit tests for authentication manager
 """
+import json
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from auth.auth_manager import AuthenticationManager
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from auth.auth_manager import AuthenticationManager, encode_body
+from config.settings import settings
 
 
 class TestAuthenticationManager:
@@ -69,3 +71,39 @@ class TestAuthenticationManager:
         auth_manager = AuthenticationManager()
         response = auth_manager.make_request("GET", "http://test.com")
         assert response.status_code == 200
+    
+    @patch('requests.Session.request')
+    def test_make_request_sends_encoded_body(self, mock_request):
+        """Test that the body is sent as pre-encoded JSON bytes"""
+        mock_request.return_value = Mock(status_code=200)
+        
+        auth_manager = AuthenticationManager()
+        auth_manager.make_request("POST", "http://test.com", data={"resourceType": "Bundle"})
+        
+        body = mock_request.call_args.kwargs["data"]
+        assert isinstance(body, bytes)
+        assert json.loads(body) == {"resourceType": "Bundle"}
+        assert "json" not in mock_request.call_args.kwargs
+    
+    @pytest.mark.asyncio
+    async def test_post_async_encodes_body_once_across_retries(self, monkeypatch):
+        """Test that retries resend the same encoded body"""
+        monkeypatch.setattr(settings, "RETRY_DELAY", 0)
+        client = Mock()
+        client.post = AsyncMock(side_effect=[
+            Mock(status_code=503),
+            Mock(status_code=200, json=Mock(return_value={"status": "success"}))
+        ])
+        
+        auth_manager = AuthenticationManager()
+        result = await auth_manager.post_async(client, "http://test.com", {"resourceType": "Bundle"})
+        
+        assert result == {"status": "success"}
+        first, second = (call.kwargs["content"] for call in client.post.call_args_list)
+        assert first is second
+        assert json.loads(first) == {"resourceType": "Bundle"}
+    
+    def test_encode_body_passes_bytes_through(self):
+        """Test that already encoded bodies are not re-encoded"""
+        body = b'{"resourceType":"Bundle"}'
+        assert encode_body(body) is body
@@ -0,0 +1,19 @@
+import sys
+
+from config.endpoints import NPHIESEndpoints, endpoints
+
+
+def test_get_message_type_matches_message_types():
+    for key, url in NPHIESEndpoints.MESSAGE_TYPES.items():
+        operation, _, kind = key.rpartition("_")
+        assert endpoints.get_message_type(operation, is_request=kind == "request") == url
+
+
+def test_get_message_type_unknown_operation():
+    assert NPHIESEndpoints.get_message_type("communication", is_request=False) == ""
+    assert NPHIESEndpoints.get_message_type("unknown") == ""
+
+
+def test_endpoint_values_are_interned():
+    for url in NPHIESEndpoints.MESSAGE_TYPES.values():
+        assert sys.intern(url) is url
@@ -0,0 +1,120 @@
+import dataclasses
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.moh_rules import (
+    MOH_PER_DIEM_RATES,
+    MOH_RULES_BY_SEVERITY,
+    MOH_VALIDATION_RULES,
+    _compile_condition,
+    calculate_moh_per_diem_amount,
+    evaluate_rules,
+    get_moh_required_documents,
+    get_moh_rule,
+    validate_moh_per_diem,
+    validate_moh_submission_timing,
+    validate_prices_bulk,
+)
+
+
+def test_get_moh_rule_by_id():
+    assert get_moh_rule("MOH_005").description == "Price must not exceed MOH price list"
+    assert get_moh_rule("MOH_999") is None
+
+
+def test_rules_by_severity_covers_all_rules():
+    indexed = [rule for rules in MOH_RULES_BY_SEVERITY.values() for rule in rules]
+    assert len(indexed) == len(MOH_VALIDATION_RULES)
+    assert all(rule.severity == "error" for rule in MOH_RULES_BY_SEVERITY["error"])
+
+
+def test_moh_rule_objects_are_immutable_and_hashable():
+    rule = get_moh_rule("MOH_001")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rule.severity = "warning"
+    if sys.version_info >= (3, 10):
+        assert not hasattr(rule, "__dict__")
+    assert {rule: True}[rule]
+    assert hash(MOH_PER_DIEM_RATES["icu"])
+
+
+def test_validate_prices_bulk():
+    within_limit = validate_prices_bulk(
+        ["99213", "99213", "UNLISTED", "71020"],
+        [150.0, 150.01, 1e9, 99.0]
+    )
+    assert within_limit.tolist() == [True, False, True, True]
+
+
+def test_get_moh_required_documents_returns_tuple():
+    documents = get_moh_required_documents("inpatient")
+    assert isinstance(documents, tuple)
+    assert documents is get_moh_required_documents("inpatient")
+    assert get_moh_required_documents("unknown") == ()
+
+
+def test_evaluate_rules_returns_failed_rules_with_known_inputs():
+    failed = evaluate_rules({
+        "patient.identifier.system": "NATIONAL_ID",
+        "diagnosis_code": "J18.9",
+        "moh_accepted_icd10_codes": {"J18.9"},
+        "claim_amount": 250.0,
+        "moh_price_list_amount": 200.0,
+    })
+
+    assert [rule.rule_id for rule in failed] == ["MOH_001", "MOH_005"]
+
+
+def test_evaluate_rules_skips_rules_that_do_not_apply():
+    short_stay = {"days_count": 3, "authorization_present": False}
+    outpatient = {"encounter_type": "outpatient", "discharge_summary_attached": False}
+
+    assert evaluate_rules(short_stay) == []
+    assert evaluate_rules(outpatient) == []
+
+
+def test_evaluate_rules_flags_applicable_rules():
+    failed = evaluate_rules({
+        "days_count": 10,
+        "authorization_present": False,
+        "encounter_type": "inpatient",
+        "discharge_summary_attached": False,
+    })
+
+    assert [rule.rule_id for rule in failed] == ["MOH_004", "MOH_008"]
+    assert evaluate_rules({"days_count": 10, "authorization_present": True}) == []
+
+
+def test_compile_condition_resolves_dotted_paths():
+    condition = _compile_condition("patient.identifier.system != None AND days_count > 7")
+
+    assert condition({"patient.identifier.system": "urn:moh", "days_count": 10}) is True
+    assert condition({"patient.identifier.system": None, "days_count": 10}) is False
+    with pytest.raises(KeyError):
+        condition({"patient": {"identifier": {"system": "urn:moh"}}, "days_count": 10})
+
+
+def test_compile_condition_rejects_calls():
+    with pytest.raises(ValueError):
+        _compile_condition("__import__('os').system('true')")
+
+
+def test_per_diem_validation_and_amount():
+    icu = MOH_PER_DIEM_RATES["icu"]
+
+    assert validate_moh_per_diem("icu", icu.requires_authorization_after, False) == (True, None)
+    assert not validate_moh_per_diem("icu", icu.requires_authorization_after + 1, False)[0]
+    assert not validate_moh_per_diem("icu", icu.max_days + 1, True)[0]
+    assert validate_moh_per_diem("unknown", 1, True) == (False, "Invalid facility type: unknown")
+    assert calculate_moh_per_diem_amount("icu", 2) == icu.per_diem_rate * 2
+    assert calculate_moh_per_diem_amount("icu", icu.max_days + 1) is None
+
+
+def test_validate_moh_submission_timing():
+    discharge = datetime(2024, 1, 1)
+
+    assert validate_moh_submission_timing("inpatient", discharge, discharge + timedelta(days=30)) == (True, None)
+    assert not validate_moh_submission_timing("emergency", discharge, discharge + timedelta(days=16))[0]
+    assert validate_moh_submission_timing("dental", discharge, discharge) == (False, "Invalid encounter type: dental")
@@ -0,0 +1,36 @@
+from pipeline.data_processor import NPHIESDataProcessor
+
+
+def test_validate_and_clean_batch_flags_moh_price_violations():
+    processor = NPHIESDataProcessor()
+    batch = [
+        {"total_amount": 150.0, "services": [{"code": "99213", "unit_price": 150.0}]},
+        {"total_amount": 500.0, "services": [
+            {"code": "71020", "unit_price": 90.0},
+            {"code": "99214", "unit_price": 410.0},
+        ]},
+    ]
+
+    valid, invalid = processor.validate_and_clean_batch(batch, "claims", check_moh_prices=True)
+
+    assert len(valid) == 1
+    assert invalid[0]["validation_errors"] == [
+        "Claimed amount exceeds MOH contracted rate: 99214"
+    ]
+
+
+def test_validate_and_clean_batch_flags_unreadable_service_lines():
+    processor = NPHIESDataProcessor()
+    batch = [
+        {"total_amount": 150.0, "services": [{"code": "99213", "unit_price": "N/A"}]},
+        {"total_amount": 150.0, "services": ["99213"]},
+        {"total_amount": 150.0, "services": [{"code": "99213", "unit_price": "150"}]},
+    ]
+
+    valid, invalid = processor.validate_and_clean_batch(batch, "claims", check_moh_prices=True)
+
+    assert valid == [batch[2]]
+    assert [record["validation_errors"] for record in invalid] == [
+        ["Invalid unit_price for service 99213"],
+        ["Service lines must be objects"],
+    ]
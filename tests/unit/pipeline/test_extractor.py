@@ -0,0 +1,259 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from config.settings import settings
+from pipeline.extractor import NDJSONSink, NPHIESDataExtractor
+
+
+def _make_extractor():
+    extractor = NPHIESDataExtractor()
+    extractor.eligibility_service = Mock()
+    extractor.claims_service = Mock()
+    extractor.communication_service = Mock()
+    return extractor
+
+
+def test_extract_eligibility_batch_collects_results_and_errors():
+    extractor = _make_extractor()
+
+    def check_eligibility(member_id, payer_id, *args):
+        if member_id == "boom":
+            raise RuntimeError("connection reset")
+        return {"success": member_id != "bad", "member_id": member_id, "error": "denied"}
+
+    extractor.eligibility_service.check_eligibility.side_effect = check_eligibility
+    members = [
+        {"member_id": "1000000001", "payer_id": "7000911508"},
+        {"member_id": "bad", "payer_id": "7000911508"},
+        {"member_id": "boom", "payer_id": "7000911508"},
+        {"member_id": "1000000002", "payer_id": "7000911508"},
+    ]
+
+    results = extractor.extract_eligibility_batch(members)
+
+    assert results["total"] == 4
+    assert results["successful"] == 2
+    assert results["failed"] == 2
+    assert sorted(r["member_id"] for r in results["data"]) == ["1000000001", "1000000002", "bad"]
+    assert sorted(e["member"] for e in extractor.results["errors"]) == ["bad", "boom"]
+
+
+def test_extract_claims_batch_handles_exceptions():
+    extractor = _make_extractor()
+    extractor.claims_service.submit_claim.side_effect = [
+        {"success": True, "claim_id": "claim-1"},
+        RuntimeError("timeout"),
+    ]
+
+    results = extractor.extract_claims_batch([{"claim_type": "professional"}] * 2)
+
+    assert results["successful"] == 1
+    assert results["failed"] == 1
+    assert extractor.results["errors"][0]["type"] == "claim"
+    assert extractor.get_all_results()["claims"] == {"file": None, "count": 2, "errors": 1}
+    assert extractor.claims_service.submit_claim.call_args.kwargs == {"claim_type": "professional"}
+
+
+def test_extract_claims_batch_records_missing_required_fields():
+    extractor = _make_extractor()
+    extractor.claims_service.submit_claim.side_effect = (
+        lambda claim_type, patient_id, member_id, payer_id, services, total_amount, **optional: {"success": True}
+    )
+    complete = {
+        "claim_type": "professional", "patient_id": "p1", "member_id": "m1",
+        "payer_id": "7000911508", "services": [], "total_amount": 10.0
+    }
+    missing_amount = {key: value for key, value in complete.items() if key != "total_amount"}
+
+    results = extractor.extract_claims_batch([complete, missing_amount])
+
+    assert results["successful"] == 1
+    assert results["failed"] == 1
+    assert "total_amount" in extractor.results["errors"][0]["error"]
+
+
+def test_extract_eligibility_batch_uses_bulk_requests(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_BULK_REQUESTS", True)
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 2)
+    extractor = _make_extractor()
+    extractor.eligibility_service.check_eligibility_bulk.side_effect = lambda chunk: [
+        {"success": True, "member_id": m["member_id"]} for m in chunk
+    ]
+    members = [{"member_id": str(i), "payer_id": "7000911508"} for i in range(5)]
+
+    results = extractor.extract_eligibility_batch(members)
+
+    assert results["successful"] == 5
+    assert extractor.eligibility_service.check_eligibility_bulk.call_count == 3
+    extractor.eligibility_service.check_eligibility.assert_not_called()
+
+
+def test_extract_eligibility_batch_streams_to_ndjson(tmp_path):
+    extractor = _make_extractor()
+    extractor.eligibility_service.check_eligibility.side_effect = lambda member_id, payer_id, *args: {
+        "success": True, "member_id": member_id
+    }
+    members = [{"member_id": str(i), "payer_id": "7000911508"} for i in range(3)]
+    output_file = tmp_path / "eligibility_results.ndjson"
+
+    results = extractor.extract_eligibility_batch(members, output_file=str(output_file))
+
+    assert "data" not in results
+    lines = output_file.read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["member_id"] for line in lines) == ["0", "1", "2"]
+    meta = json.loads((tmp_path / "eligibility_results.meta.json").read_text(encoding="utf-8"))
+    assert meta["successful"] == 3
+    assert meta["output_file"] == str(output_file)
+    assert extractor.results["eligibility"]["file"] == str(output_file)
+
+
+@pytest.mark.asyncio
+async def test_extract_claims_batch_async_uses_shared_client(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_CONCURRENCY", 2)
+    extractor = _make_extractor()
+    client = Mock()
+
+    async def submit_claim_async(client_arg, **claim):
+        assert client_arg is client
+        if claim["patient_id"] == "p2":
+            raise RuntimeError("timeout")
+        return {"success": True, "claim_id": f"claim-{claim['patient_id']}"}
+
+    extractor.claims_service.submit_claim_async = AsyncMock(side_effect=submit_claim_async)
+    claims = [{"patient_id": f"p{i}"} for i in range(4)]
+
+    results = await extractor.extract_claims_batch_async(claims, client=client)
+
+    assert results["successful"] == 3
+    assert results["failed"] == 1
+    assert extractor.claims_service.submit_claim_async.await_count == 4
+    assert extractor.results["claims"] == {"file": None, "count": 4, "errors": 1}
+
+
+def test_extract_eligibility_batch_reuses_duplicate_lookups():
+    extractor = _make_extractor()
+    extractor.eligibility_service.check_eligibility.side_effect = lambda member_id, payer_id, *args: {
+        "success": member_id != "bad", "member_id": member_id
+    }
+    members = [
+        {"member_id": "1000000001", "payer_id": "7000911508"},
+        {"member_id": "1000000001", "payer_id": "7000911508"},
+        {"member_id": "bad", "payer_id": "7000911508"},
+        {"member_id": "1000000001", "payer_id": "7000911508"},
+    ]
+
+    extractor.extract_eligibility_batch(members[:2])
+    results = extractor.extract_eligibility_batch(members[2:])
+
+    assert results["successful"] == 1
+    assert extractor.eligibility_service.check_eligibility.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_extract_eligibility_batch_async_collapses_duplicates():
+    extractor = _make_extractor()
+    extractor.eligibility_service.check_eligibility_async = AsyncMock(
+        return_value={"success": True, "member_id": "1000000001"}
+    )
+    members = [{"member_id": "1000000001", "payer_id": "7000911508"}] * 3
+
+    results = await extractor.extract_eligibility_batch_async(members, client=Mock())
+
+    assert results["successful"] == 3
+    assert extractor.eligibility_service.check_eligibility_async.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_run_full_extraction_async_runs_phases_concurrently(tmp_path):
+    extractor = _make_extractor()
+    claims_started = asyncio.Event()
+
+    async def check_eligibility_async(client, **member):
+        # Eligibility only finishes once claims submission has started
+        await asyncio.wait_for(claims_started.wait(), timeout=5)
+        return {"success": True, "member_id": member["member_id"]}
+
+    async def submit_claim_async(client, **claim):
+        claims_started.set()
+        return {"success": True, "claim_id": "claim-1"}
+
+    extractor.eligibility_service.check_eligibility_async = check_eligibility_async
+    extractor.claims_service.submit_claim_async = submit_claim_async
+    extractor.communication_service.poll_communications_async = AsyncMock(return_value={
+        "success": True, "communications": [{"id": "comm-1"}]
+    })
+
+    results = await extractor.run_full_extraction_async(
+        eligibility_members=[{"member_id": "1000000001", "payer_id": "7000911508"}],
+        claims_data=[{"patient_id": "p1"}],
+        output_dir=str(tmp_path)
+    )
+
+    assert results["eligibility"]["successful"] == 1
+    assert results["claims"]["successful"] == 1
+    assert results["summary"]["total_communications"] == 1
+    assert (tmp_path / "complete_extraction_results.json").exists()
+    extractor.communication_service.poll_communications.assert_not_called()
+
+
+def test_run_full_extraction_polls_communications_after_batches(tmp_path):
+    extractor = _make_extractor()
+    calls = []
+    extractor.eligibility_service.check_eligibility.side_effect = lambda **member: (
+        calls.append("eligibility") or {"success": True, "member_id": member["member_id"]}
+    )
+    extractor.claims_service.submit_claim.side_effect = lambda **claim: (
+        calls.append("claims") or {"success": True, "claim_id": "claim-1"}
+    )
+    extractor.communication_service.poll_communications.side_effect = lambda: (
+        calls.append("communications") or {"success": True, "communications": []}
+    )
+
+    extractor.run_full_extraction(
+        eligibility_members=[{"member_id": "1000000001", "payer_id": "7000911508"}],
+        claims_data=[{"patient_id": "p1", "provider_id": "pr1", "services": [], "total_amount": 10}],
+        output_dir=str(tmp_path)
+    )
+
+    assert calls == ["eligibility", "claims", "communications"]
+
+
+def test_extract_eligibility_batch_appends_to_shared_sink(tmp_path):
+    extractor = _make_extractor()
+    extractor.eligibility_service.check_eligibility.side_effect = lambda member_id, payer_id, *args: {
+        "success": True, "member_id": member_id
+    }
+    path = tmp_path / "eligibility_results.ndjson"
+
+    with NDJSONSink(path) as sink:
+        for chunk in (["1", "2"], ["3"]):
+            members = [{"member_id": m, "payer_id": "7000911508"} for m in chunk]
+            results = extractor.extract_eligibility_batch(members, sink=sink)
+            assert results["output_file"] == str(path)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["member_id"] for line in lines) == ["1", "2", "3"]
+    assert not (tmp_path / "eligibility_results.meta.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_extractor_context_reuses_one_client():
+    extractor = _make_extractor()
+    seen = []
+
+    async def submit_claim_async(client, **claim):
+        seen.append(client)
+        return {"success": True}
+
+    extractor.claims_service.submit_claim_async = submit_claim_async
+
+    async with extractor:
+        await extractor.extract_claims_batch_async([{"patient_id": "p1"}])
+        await extractor.extract_claims_batch_async([{"patient_id": "p2"}])
+        assert not seen[0].is_closed
+
+    assert seen[0] is seen[1]
+    assert seen[0].is_closed
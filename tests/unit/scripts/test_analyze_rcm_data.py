@@ -0,0 +1,194 @@
+import json
+import logging
+
+import pandas as pd
+import pytest
+
+from scripts.analysis.analyze_rcm_data import RCMDataAnalyzer
+
+
+def _write_workbook(path):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({
+            "Rejection Code": ["BE-1-4", "BE-1-4", "MN-1-1"],
+            "Payer Name": ["Bupa", "Bupa", "MOH"],
+            "Claim Amount": [100.0, 250.0, 50.0],
+        }).to_excel(writer, sheet_name="Rejections", index=False)
+        pd.DataFrame({
+            "Denial Code": ["CV-1-3"],
+            "Insurance": ["Tawuniya"],
+        }).to_excel(writer, sheet_name="Denials", index=False)
+
+
+def test_analyze_all_files_reads_every_sheet(tmp_path):
+    _write_workbook(tmp_path / "bupa_rejections.xlsx")
+
+    insights = RCMDataAnalyzer(data_dir=str(tmp_path)).analyze_all_files()
+
+    codes = insights["common_rejection_codes"]["bupa_rejections.xlsx"]
+    assert codes["Rejection Code"] == {"BE-1-4": 2, "MN-1-1": 1}
+    assert codes["Denial Code"] == {"CV-1-3": 1}
+    assert insights["payer_insights"]["bupa_rejections.xlsx"]["Insurance"] == {"Tawuniya": 1}
+    impact = insights["rejection_patterns"]["bupa_rejections.xlsx"]["financial_impact"]
+    assert impact["total_rejected_amount"] == 400.0
+    assert insights["data_sources"] == ["bupa_rejections.xlsx"]
+
+
+def test_analyze_all_files_merges_files_in_order(tmp_path):
+    for name in ("a_moh.xlsx", "b_ncci.xlsx"):
+        _write_workbook(tmp_path / name)
+    (tmp_path / "~$a_moh.xlsx").write_bytes(b"lock")
+
+    insights = RCMDataAnalyzer(data_dir=str(tmp_path)).analyze_all_files()
+
+    assert sorted(insights["data_sources"]) == ["a_moh.xlsx", "b_ncci.xlsx"]
+    assert set(insights["common_rejection_codes"]) == {"a_moh.xlsx", "b_ncci.xlsx"}
+    categories = {rec["category"] for rec in insights["recommendations"]}
+    assert {"MOH Integration", "NCCI Rules"} <= categories
+
+
+def test_generate_report_writes_markdown(tmp_path):
+    _write_workbook(tmp_path / "bupa_rejections.xlsx")
+    analyzer = RCMDataAnalyzer(data_dir=str(tmp_path))
+    analyzer.analyze_all_files()
+
+    output_path = analyzer.generate_report(str(tmp_path / "report.md"))
+
+    report = output_path.read_text(encoding="utf-8")
+    assert report.startswith("# RCM Rejection Data Analysis Report\n")
+    assert "- bupa_rejections.xlsx\n" in report
+    assert "  - `BE-1-4`: 2 occurrences\n" in report
+
+
+def test_save_insights_round_trips_unicode(tmp_path):
+    analyzer = RCMDataAnalyzer(data_dir=str(tmp_path))
+    analyzer.insights["payer_insights"]["مطالبات.xlsx"] = {"شركة": {"بوبا": 3}}
+
+    output_path = analyzer.save_insights(str(tmp_path / "insights.json"))
+
+    text = output_path.read_text(encoding="utf-8")
+    assert "بوبا" in text
+    assert json.loads(text)["payer_insights"]["مطالبات.xlsx"]["شركة"] == {"بوبا": 3}
+
+
+def test_extract_financial_data_uses_last_numeric_column(tmp_path):
+    analyzer = RCMDataAnalyzer(data_dir=str(tmp_path))
+    df = pd.DataFrame({
+        "Claim Amount": ["100", "n/a", "300"],
+        "Paid Amount": [None, None, None],
+        "Net Amount": [10.0, 20.0, None],
+    })
+
+    analyzer._extract_financial_data(df, "file.xlsx")
+
+    impact = analyzer.insights["rejection_patterns"]["file.xlsx"]["financial_impact"]
+    assert impact == {
+        "total_rejected_amount": 30.0,
+        "average_rejection_amount": 15.0,
+        "count": 2,
+        "column": "Net Amount",
+    }
+
+
+def test_analyze_file_skips_sheets_without_relevant_headers(tmp_path, monkeypatch):
+    path = tmp_path / "mixed.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Rejection Code": ["BE-1-4"]}).to_excel(writer, sheet_name="Rejections", index=False)
+        pd.DataFrame({"Notes": ["n/a"], "Owner": ["ops"]}).to_excel(writer, sheet_name="Notes", index=False)
+    analyzer = RCMDataAnalyzer(data_dir=str(tmp_path))
+    analyzed = []
+    monkeypatch.setattr(analyzer, "_analyze_dataframe", lambda df, filename, sheet_name: analyzed.append(sheet_name))
+
+    analyzer._analyze_file(path)
+
+    assert analyzed == ["Rejections"]
+
+
+def test_open_workbook_falls_back_without_calamine(tmp_path, monkeypatch):
+    from scripts.analysis import analyze_rcm_data
+
+    monkeypatch.setattr(analyze_rcm_data, "CALAMINE_AVAILABLE", False)
+    _write_workbook(tmp_path / "book.xlsx")
+
+    with RCMDataAnalyzer._open_workbook(tmp_path / "book.xlsx") as workbook:
+        assert workbook.sheet_names == ["Rejections", "Denials"]
+        assert workbook.engine != "calamine"
+
+
+def test_analyze_file_reads_only_keyword_columns(tmp_path, monkeypatch):
+    path = tmp_path / "wide.xlsx"
+    pd.DataFrame({
+        "Notes": ["long free text"],
+        "Rejection Code": ["BE-1-4"],
+        "Comment": ["more text"],
+        "Net Value": [75.0],
+    }).to_excel(path, sheet_name="Claims", index=False)
+    analyzer = RCMDataAnalyzer(data_dir=str(tmp_path))
+    frames = []
+    monkeypatch.setattr(analyzer, "_analyze_dataframe", lambda df, filename, sheet_name: frames.append(df))
+
+    analyzer._analyze_file(path)
+
+    assert [list(df.columns) for df in frames] == [["Rejection Code", "Net Value"]]
+
+
+def test_analyze_all_files_replays_worker_logs(tmp_path, caplog):
+    for name in ("a.xlsx", "b.xlsx"):
+        _write_workbook(tmp_path / name)
+    (tmp_path / "c.xlsx").write_bytes(b"not a workbook")
+
+    with caplog.at_level(logging.INFO, logger="rcm_analysis"):
+        RCMDataAnalyzer(data_dir=str(tmp_path)).analyze_all_files()
+
+    analyzing = [r.getMessage() for r in caplog.records if r.getMessage().startswith("📄")]
+    assert sorted(analyzing) == ["📄 Analyzing: a.xlsx", "📄 Analyzing: b.xlsx", "📄 Analyzing: c.xlsx"]
+    assert any(r.levelno == logging.WARNING and "Could not open file" in r.getMessage() for r in caplog.records)
+
+
+def test_analyze_dataframe_with_arrow_dtypes(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from scripts.analysis import analyze_rcm_data
+
+    monkeypatch.setattr(analyze_rcm_data, "PYARROW_AVAILABLE", True)
+    analyzer = RCMDataAnalyzer(data_dir=str(tmp_path))
+    df = pd.DataFrame({
+        "Rejection Code": ["BE-1-4", "BE-1-4", None],
+        "Payer Name": ["Bupa", "MOH", "MOH"],
+        "Claim Amount": [100.0, 250.0, None],
+    })
+
+    analyzer._analyze_dataframe(df, "file.xlsx", "Sheet1")
+
+    assert analyzer.insights["common_rejection_codes"]["file.xlsx"]["Rejection Code"] == {"BE-1-4": 2}
+    assert analyzer.insights["payer_insights"]["file.xlsx"]["Payer Name"] == {"MOH": 2, "Bupa": 1}
+    impact = analyzer.insights["rejection_patterns"]["file.xlsx"]["financial_impact"]
+    assert impact["total_rejected_amount"] == 350.0
+    assert impact["count"] == 2
+
+
+def test_analyze_all_files_reuses_cache_for_unchanged_files(tmp_path, caplog):
+    for name in ("a.xlsx", "b.xlsx"):
+        _write_workbook(tmp_path / name)
+    first = RCMDataAnalyzer(data_dir=str(tmp_path)).analyze_all_files()
+
+    pd.DataFrame({"Rejection Code": ["CV-1-3"]}).to_excel(tmp_path / "b.xlsx", index=False)
+    with caplog.at_level(logging.INFO, logger="rcm_analysis"):
+        second = RCMDataAnalyzer(data_dir=str(tmp_path)).analyze_all_files()
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert "♻️  Using cached analysis: a.xlsx" in messages
+    assert "📄 Analyzing: b.xlsx" in messages
+    assert second["common_rejection_codes"]["a.xlsx"] == first["common_rejection_codes"]["a.xlsx"]
+    assert second["common_rejection_codes"]["b.xlsx"] == {"Rejection Code": {"CV-1-3": 1}}
+    cache = json.loads((tmp_path / ".rcm_cache.json").read_text(encoding="utf-8"))
+    assert len(cache["files"]) == 2
+
+
+def test_analyze_all_files_does_not_cache_failed_files(tmp_path):
+    _write_workbook(tmp_path / "a.xlsx")
+    (tmp_path / "broken.xlsx").write_bytes(b"not a workbook")
+
+    RCMDataAnalyzer(data_dir=str(tmp_path)).analyze_all_files()
+
+    cache = json.loads((tmp_path / ".rcm_cache.json").read_text(encoding="utf-8"))
+    assert [key.split(":")[0] for key in cache["files"]] == ["a.xlsx"]
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from services.communication import CommunicationService
+
+
+def _poll_response(bundle):
+    response = Mock()
+    response.content = json.dumps(bundle).encode("utf-8")
+    response.json.side_effect = lambda: json.loads(response.content)
+    return response
+
+
+def _communication_bundle(comm_id):
+    return {
+        "resourceType": "Bundle",
+        "id": f"bundle-{comm_id}",
+        "entry": [{
+            "resource": {
+                "resourceType": "Communication",
+                "id": comm_id,
+                "status": "completed",
+                "category": [{"coding": [{"code": "info"}]}],
+                "payload": [{"contentString": "Claim approved"}],
+            }
+        }],
+    }
+
+
+def test_poll_communications_reuses_parse_for_identical_body():
+    service = CommunicationService()
+    service.auth = Mock()
+    service._build_poll_bundle = Mock(return_value={})
+    first = _poll_response(_communication_bundle("comm-1"))
+    repeat = _poll_response(_communication_bundle("comm-1"))
+    other = _poll_response(_communication_bundle("comm-2"))
+    service.auth.post.side_effect = [first, repeat, other]
+
+    results = [service.poll_communications("org-1") for _ in range(3)]
+
+    assert [r["communications"][0]["id"] for r in results] == ["comm-1", "comm-1", "comm-2"]
+    assert results[1]["communications"][0]["payload"] == ["Claim approved"]
+    assert first.json.call_count == 1
+    repeat.json.assert_not_called()
+    assert other.json.call_count == 1
+
+
+def test_poll_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(CommunicationService, "POLL_CACHE_SIZE", 1)
+    service = CommunicationService()
+
+    service._parse_poll_response(_poll_response(_communication_bundle("comm-1")))
+    service._parse_poll_response(_poll_response(_communication_bundle("comm-2")))
+    again = _poll_response(_communication_bundle("comm-1"))
+    service._parse_poll_response(again)
+
+    assert again.json.call_count == 1
+    assert len(service._poll_cache) == 1
+
+
+def test_poll_bundles_share_category_but_not_request_fields():
+    service = CommunicationService()
+
+    first = service._build_poll_bundle("org-1")
+    second = service._build_poll_bundle("org-2")
+
+    first_request, second_request = (
+        next(e["resource"] for e in bundle["entry"] if e["resource"]["resourceType"] == "Communication")
+        for bundle in (first, second)
+    )
+    assert first_request["category"][0]["coding"][0]["code"] == "poll"
+    assert first_request["category"] is second_request["category"]
+    assert first_request["id"] != second_request["id"]
+    assert second_request["sender"] == {"reference": "Organization/org-2"}
+
+
+def test_extract_communications_tolerates_missing_fields():
+    service = CommunicationService()
+    resources = [
+        {"resourceType": "Organization", "id": "org-1"},
+        {
+            "resourceType": "Communication",
+            "id": "comm-1",
+            "category": [],
+            "recipient": [{"reference": "Organization/org-1"}, {}],
+            "payload": [{"contentReference": {"reference": "DocumentReference/doc-1"}}],
+        },
+    ]
+
+    communications = service._extract_communications(resources)
+
+    assert communications == [{
+        "id": "comm-1",
+        "status": None,
+        "category": None,
+        "subject": None,
+        "sent": None,
+        "received": None,
+        "sender": None,
+        "recipient": ["Organization/org-1", None],
+        "payload": ["DocumentReference/doc-1"],
+    }]
+
+
+@pytest.mark.asyncio
+async def test_poll_organizations_async_overlaps_polls():
+    service = CommunicationService()
+    service.auth = Mock()
+    in_flight = []
+    both_started = asyncio.Event()
+
+    async def post_async(client, url, bundle):
+        in_flight.append(bundle)
+        if len(in_flight) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=5)
+        sender = next(
+            e["resource"]["sender"]["reference"] for e in bundle["entry"]
+            if e["resource"]["resourceType"] == "Communication"
+        )
+        return _communication_bundle(sender.split("/")[1])
+
+    service.auth.post_async = post_async
+
+    results = await service.poll_organizations_async(Mock(), ["org-1", "org-2"])
+
+    assert [r["communications"][0]["id"] for r in results] == ["org-1", "org-2"]
+
+
+def test_communication_bundles_reuse_organization_resources():
+    service = CommunicationService()
+
+    bundles = [service._build_communication_bundle("payer-1", "claim-1", "hello", "info") for _ in range(2)]
+
+    organizations = [
+        [e["resource"] for e in bundle["entry"] if e["resource"]["resourceType"] == "Organization"]
+        for bundle in bundles
+    ]
+    assert [org["id"] for org in organizations[0]][1] == "payer-1"
+    assert organizations[0][1]["identifier"][0]["value"] == "payer-1"
+    assert "name" not in organizations[0][1]
+    assert all(a is b for a, b in zip(*organizations))
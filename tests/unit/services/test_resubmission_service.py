@@ -0,0 +1,359 @@
+import asyncio
+import sys
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from services import resubmission_service
+from services.resubmission_service import ClaimCorrection, ResubmissionService, ResubmissionStrategy
+from utils.code_map import CodeMap
+
+
+def _make_service():
+    return ResubmissionService(claims_service=Mock(), eligibility_service=Mock())
+
+
+def _item(claim_id, amount=100.0):
+    return {
+        "claim_id": claim_id,
+        "rejection_code": "PR01",
+        "rejection_details": {"contracted_rate": 80.0, "reason": "Price exceeds contracted rate"},
+        "claim_data": {"total_amount": amount},
+        "claim_amount": amount,
+    }
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claims_bulk_overlaps_submissions_up_to_limit():
+    service = _make_service()
+    in_flight = 0
+    peak = 0
+
+    async def submit_claim(claim):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"status": "accepted" if claim["total_amount"] == 80.0 else "rejected"}
+
+    service.claims_service.submit_claim = submit_claim
+
+    attempts = await service.resubmit_claims_bulk([_item(f"c{i}") for i in range(6)], concurrency=3)
+
+    assert [a.claim_id for a in attempts] == [f"c{i}" for i in range(6)]
+    assert all(a.status == "accepted" for a in attempts)
+    assert peak == 3
+    metrics = service.get_resubmission_metrics()
+    assert metrics["successful_resubmissions"] == 6
+    assert metrics["total_recovered_amount"] == 600.0
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claims_bulk_returns_errors_in_place():
+    service = _make_service()
+
+    async def submit_claim(claim):
+        return {"status": "accepted"}
+
+    service.claims_service.submit_claim = submit_claim
+    items = [_item("c1"), {"claim_id": "c2"}]
+
+    attempts = await service.resubmit_claims_bulk(items)
+
+    assert attempts[0].status == "accepted"
+    assert isinstance(attempts[1], TypeError)
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claim_counts_metrics_as_plain_numbers():
+    service = _make_service()
+
+    async def submit_claim(claim):
+        return {"status": "rejected"}
+
+    service.claims_service.submit_claim = submit_claim
+    service.strategy.max_attempts = 1
+
+    await service.resubmit_claim(**_item("c1"))
+    await service.resubmit_claim(**_item("c1"))
+
+    metrics = service.get_resubmission_metrics()
+    assert metrics["total_resubmissions"] == 1
+    assert metrics["failed_resubmissions"] == 1
+    assert metrics["manual_review_required"] == 1
+    assert type(metrics["total_resubmissions"]) is int
+    assert metrics["success_rate"] == 0.0
+
+
+def test_analyze_rejection_dispatches_by_code():
+    service = _make_service()
+
+    pricing = service.analyze_rejection({"total_amount": 120.0}, "PR01", {"contracted_rate": 100.0})
+
+    assert [(c.field_name, c.new_value) for c in pricing] == [("total_amount", 100.0)]
+    assert service.analyze_rejection({}, "EB01", {}) == []
+    assert service.analyze_rejection({}, "NOPE", {}) == []
+
+
+def test_can_auto_resubmit_uses_configured_codes():
+    service = _make_service()
+
+    assert service.can_auto_resubmit("PR01") is True
+    assert service.can_auto_resubmit("EB01") is False
+    assert service.can_auto_resubmit("NOPE") is False
+
+
+def test_code_mappers_are_memoized_per_service():
+    service = _make_service()
+    service.icd10_map = Mock(get=Mock(return_value="J45.909"))
+
+    service._map_to_valid_icd10("J45")
+    service._map_to_valid_icd10("J45")
+
+    service.icd10_map.get.assert_called_once_with("J45")
+    assert _make_service()._icd10_memo == {}
+
+
+def test_apply_corrections_sets_nested_fields_and_skips_low_confidence():
+    service = _make_service()
+    claim = {"total_amount": 120.0}
+    corrections = [
+        ClaimCorrection("patient.identifier.value", None, "1000000001", "Populated", 0.93),
+        ClaimCorrection("total_amount", 120.0, 100.0, "Adjusted", 0.98),
+        ClaimCorrection("provider.name", None, "Guess", "Low confidence", 0.50),
+    ]
+
+    corrected = service.apply_corrections(claim, corrections)
+
+    assert corrected == {"total_amount": 100.0, "patient": {"identifier": {"value": "1000000001"}}}
+    assert claim == {"total_amount": 120.0}
+    assert service.apply_corrections(claim, corrections[2:]) is claim
+
+
+def test_apply_corrections_copies_only_touched_subtrees():
+    service = _make_service()
+    patient = {"name": "A", "address": {"city": "Riyadh"}}
+    provider = {"id": "prov-1"}
+    claim = {"patient": patient, "provider": provider}
+    corrections = [
+        ClaimCorrection("patient.gender", None, "female", "Populated", 0.93),
+        ClaimCorrection("patient.birthDate", None, "1990-01-01", "Populated", 0.93),
+    ]
+
+    corrected = service.apply_corrections(claim, corrections)
+
+    assert patient == {"name": "A", "address": {"city": "Riyadh"}}
+    assert corrected["patient"] == {**patient, "gender": "female", "birthDate": "1990-01-01"}
+    assert corrected["patient"]["address"] is patient["address"]
+    assert corrected["provider"] is provider
+
+
+def test_correction_records_have_no_instance_dict():
+    correction = ClaimCorrection("patient.gender", None, "female", "Populated", 0.93)
+
+    if sys.version_info >= (3, 10):
+        assert not hasattr(correction, "__dict__")
+    assert correction._path == ("patient", "gender")
+
+
+@pytest.mark.asyncio
+async def test_resubmission_history_is_capped_at_max_attempts():
+    service = _make_service()
+
+    async def submit_claim(claim):
+        return {"status": "rejected"}
+
+    service.claims_service.submit_claim = submit_claim
+
+    attempts = [await service.resubmit_claim(**_item("c1")) for _ in range(4)]
+
+    assert [a.attempt_number for a in attempts] == [1, 2, 3, 4]
+    assert attempts[-1].status == "failed"
+    assert len(service.resubmission_history["c1"]) == service.strategy.max_attempts
+
+
+def test_diagnosis_correction_uses_icd10_table():
+    service = ResubmissionService(
+        claims_service=Mock(),
+        eligibility_service=Mock(),
+        icd10_map=CodeMap({"J45": "J45.909"}),
+    )
+
+    corrections = service.analyze_rejection({}, "CD01", {"invalid_diagnosis_code": "J45"})
+
+    assert [(c.field_name, c.old_value, c.new_value) for c in corrections] == [("diagnosis_code", "J45", "J45.909")]
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claims_bulk_maps_batch_codes_in_one_lookup():
+    icd10_map = CodeMap({"J45": "J45.909"})
+    service = ResubmissionService(claims_service=Mock(), eligibility_service=Mock(), icd10_map=icd10_map)
+    submitted = []
+
+    async def submit_claim(claim):
+        submitted.append(claim)
+        return {"status": "accepted"}
+
+    service.claims_service.submit_claim = submit_claim
+    service.icd10_map = Mock(get_many=Mock(side_effect=icd10_map.get_many), get=Mock())
+    items = [
+        {
+            "claim_id": f"c{i}",
+            "rejection_code": "CD01",
+            "rejection_details": {"invalid_diagnosis_code": code},
+            "claim_data": {},
+            "claim_amount": 10.0,
+        }
+        for i, code in enumerate(["J45", "J45", "X00"])
+    ]
+
+    attempts = await service.resubmit_claims_bulk(items)
+
+    service.icd10_map.get_many.assert_called_once_with(["J45", "X00"])
+    service.icd10_map.get.assert_not_called()
+    assert [claim.get("diagnosis_code") for claim in submitted] == ["J45.909", "J45.909", None]
+    assert [a.correction_applied for a in attempts] == ["Mapped to valid ICD-10 code"] * 2 + [""]
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claim_stamps_attempt_with_one_clock_read():
+    service = _make_service()
+
+    async def submit_claim(claim):
+        return {"status": "accepted"}
+
+    service.claims_service.submit_claim = submit_claim
+
+    attempt = await service.resubmit_claim(**_item("c1"))
+
+    assert attempt.original_submission_date == attempt.attempted_at
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claim_routes_uncorrectable_codes_to_manual_review_without_analysis():
+    service = _make_service()
+    service.analyze_rejection = Mock(return_value=[])
+    service.claims_service.submit_claim = AsyncMock()
+
+    attempt = await service.resubmit_claim(
+        claim_id="c1", rejection_code="EB01", rejection_details={"reason": "Member not eligible"},
+        claim_data={"total_amount": 100.0}, claim_amount=100.0
+    )
+
+    assert attempt.status == "pending"
+    assert attempt.correction_applied == "Manual review required - cannot auto-correct"
+    service.analyze_rejection.assert_not_called()
+    service.claims_service.submit_claim.assert_not_called()
+
+
+def test_apply_corrections_keeps_threshold_score_and_warns_once_for_low_confidence(monkeypatch):
+    service = _make_service()
+    log = Mock()
+    monkeypatch.setattr(resubmission_service, "logger", log)
+    corrections = [
+        ClaimCorrection("total_amount", 120.0, 100.0, "Adjusted", 0.70),
+        ClaimCorrection("provider.name", None, "Guess", "Low confidence", 0.50),
+        ClaimCorrection("patient.gender", None, "male", "Low confidence", 0.40),
+    ]
+
+    corrected = service.apply_corrections({"total_amount": 120.0}, corrections)
+
+    assert corrected == {"total_amount": 100.0}
+    log.warning.assert_called_once()
+    assert log.warning.call_args.args[1:] == (2, "provider.name (0.50), patient.gender (0.40)")
+
+
+def test_claim_correction_interns_field_name_and_path():
+    field_name = "".join(["patient.", "gender"])
+    correction = ClaimCorrection(field_name, None, "female", "Populated", 0.93)
+
+    assert correction.field_name is sys.intern("patient.gender")
+    assert correction._path[1] is sys.intern("gender")
+
+
+@pytest.mark.asyncio
+async def test_rejected_resubmission_is_retried_by_background_worker():
+    service = ResubmissionService(
+        claims_service=Mock(), eligibility_service=Mock(),
+        strategy=ResubmissionStrategy(retry_delay_hours=0, retry_jitter_hours=0)
+    )
+    service.claims_service.submit_claim = AsyncMock(side_effect=[{"status": "rejected"}, {"status": "accepted"}])
+    service.start_retries()
+
+    first = await service.resubmit_claim(**_item("c1"))
+    for _ in range(100):
+        if len(service.resubmission_history["c1"]) == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert first.status == "rejected"
+    assert [a.status for a in service.resubmission_history["c1"]] == ["rejected", "accepted"]
+    assert await service.stop_retries() == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_worker_runs_sooner_retry_scheduled_after_a_later_one():
+    service = _make_service()
+    done = []
+    service.resubmit_claim = AsyncMock(side_effect=lambda **item: done.append(item["claim_id"]))
+    service.start_retries()
+    service.strategy.retry_jitter_hours = 0
+
+    service.strategy.retry_delay_hours = 1
+    later = service.schedule_retry({"claim_id": "late"}, 1)
+    await asyncio.sleep(0)
+    service.strategy.retry_delay_hours = 0
+    service.schedule_retry({"claim_id": "soon"}, 1)
+    for _ in range(100):
+        if done:
+            break
+        await asyncio.sleep(0.01)
+
+    assert later == 3600
+    assert done == ["soon"]
+    assert await service.stop_retries() == 1
+
+
+@pytest.mark.asyncio
+async def test_resubmit_claims_bulk_fetches_each_patient_once():
+    service = _make_service()
+    service._lookup_patient_details = Mock(side_effect=lambda patient_id: {"gender": f"g-{patient_id}"})
+    submitted = []
+
+    async def submit_claim(claim):
+        submitted.append(claim)
+        return {"status": "accepted"}
+
+    service.claims_service.submit_claim = submit_claim
+    items = [
+        {
+            "claim_id": f"c{i}",
+            "rejection_code": "INC01",
+            "rejection_details": {"missing_patient_fields": ["gender"]},
+            "claim_data": {"patient_id": patient_id},
+            "claim_amount": 100.0,
+        }
+        for i, patient_id in enumerate(["p1", "p2", "p1", "p1"])
+    ]
+
+    await service.resubmit_claims_bulk(items)
+
+    assert sorted(call.args[0] for call in service._lookup_patient_details.call_args_list) == ["p1", "p2"]
+    assert sorted(claim["patient"]["gender"] for claim in submitted) == ["g-p1"] * 3 + ["g-p2"]
+
+
+def test_missing_field_corrections_skip_fields_the_claim_already_has():
+    service = _make_service()
+    service._lookup_missing_field_value = Mock(return_value="filled")
+    service._lookup_patient_details = Mock(return_value={"gender": "male", "birthDate": "1990-01-01"})
+    claim = {"total_amount": 100.0, "patient_id": "p1", "patient": {"gender": "female"}}
+
+    missing = service.analyze_rejection(
+        claim, "TECH02", {"missing_fields": ["total_amount", "patient.gender", "service_date"]}
+    )
+    patient = service.analyze_rejection(claim, "INC01", {"missing_patient_fields": ["gender", "birthDate"]})
+
+    assert [c.field_name for c in missing] == ["service_date"]
+    service._lookup_missing_field_value.assert_called_once_with(claim, "service_date")
+    assert [c.field_name for c in patient] == ["patient.birthDate"]
@@ -0,0 +1,19 @@
+from utils.code_map import CodeMap
+
+
+def test_get_returns_replacement_or_none():
+    code_map = CodeMap({"J45": "J45.909", "E11": "E11.9"})
+
+    assert code_map.get("J45") == "J45.909"
+    assert code_map.get("J4") is None
+    assert code_map.get("J45.90999") is None
+    assert "E11" in code_map
+    assert len(code_map) == 2
+
+
+def test_get_many_resolves_batch_in_order():
+    code_map = CodeMap({"J45": "J45.909", "E11": "E11.9", "Z99": "Z99.89"})
+
+    assert code_map.get_many(["Z99", "A00", "J45", "ZZZZZZZ"]) == ["Z99.89", None, "J45.909", None]
+    assert CodeMap().get_many(["J45"]) == [None]
+    assert code_map.get_many([]) == []
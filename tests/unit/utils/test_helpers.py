@@ -0,0 +1,223 @@
+import hashlib
+import json
+import re
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+from utils import helpers
+from utils.helpers import (
+    _uuid4_hex, build_coding, calculate_hash, calculate_hash_stream, calculate_hashes, compact_json,
+    compile_path, demultiplex_batch_response, format_date, generate_bundle_id, generate_message_id,
+    generate_request_id, get_current_timestamp, mask_sensitive_data, parse_nphies_date,
+    parse_nphies_response, pretty_json, safe_get, validate_iqama, validate_saudi_id
+)
+
+
+def _message(header_id, response_identifier=None, outcome="complete"):
+    header = {"resourceType": "MessageHeader", "id": header_id}
+    if response_identifier:
+        header["response"] = {"identifier": response_identifier}
+    return {
+        "resourceType": "Bundle",
+        "type": "message",
+        "entry": [{"resource": header}, {"resource": {"outcome": outcome}}],
+    }
+
+
+def test_demultiplex_batch_response_matches_by_message_header():
+    requests = [_message("req-a"), _message("req-b")]
+    response = {
+        "resourceType": "Bundle",
+        "type": "batch-response",
+        "entry": [
+            {"resource": _message("resp-2", "req-b", outcome="queued")},
+            {"resource": _message("resp-1", "req-a")},
+        ],
+    }
+
+    messages = demultiplex_batch_response(response, requests)
+
+    assert messages[0]["entry"][1]["resource"]["outcome"] == "complete"
+    assert messages[1]["entry"][1]["resource"]["outcome"] == "queued"
+
+
+def test_demultiplex_batch_response_falls_back_to_position():
+    requests = [_message("req-a"), _message("req-b"), _message("req-c")]
+    response = {"entry": [{"resource": _message("resp-1")}, {"resource": _message("resp-2")}]}
+
+    messages = demultiplex_batch_response(response, requests)
+
+    assert [m and m["entry"][0]["resource"]["id"] for m in messages] == ["resp-1", "resp-2", None]
+
+
+def test_calculate_hash_defaults_to_blake2b_with_sha256_opt_in():
+    assert calculate_hash("bundle") == hashlib.blake2b(b"bundle", digest_size=32).hexdigest()
+    assert calculate_hash("bundle", algorithm="sha256") == hashlib.sha256(b"bundle").hexdigest()
+
+    with pytest.raises(ValueError):
+        calculate_hash("bundle", algorithm="md5")
+
+
+def test_calculate_hash_accepts_encoded_bytes():
+    for algorithm in ("blake2b", "sha256"):
+        assert calculate_hash("مرحبا".encode(), algorithm) == calculate_hash("مرحبا", algorithm)
+
+
+def test_generated_ids_are_unique_and_fhir_safe():
+    bundle_ids = {generate_bundle_id() for _ in range(100)}
+    request_id = generate_request_id()
+
+    assert len(bundle_ids) == 100
+    assert all(re.fullmatch(r"bundle-[0-9a-f]{32}", bundle_id) for bundle_id in bundle_ids)
+    assert re.fullmatch(r"req-[0-9a-f]{32}", request_id)
+
+    message_id = generate_message_id()
+    assert str(uuid.UUID(message_id)) == message_id
+
+
+def test_uuid4_hex_sets_version_and_variant_bits():
+    for _ in range(100):
+        value = uuid.UUID(hex=_uuid4_hex())
+        assert value.version == 4
+        assert value.variant == uuid.RFC_4122
+
+
+def test_parse_nphies_response_collects_operation_outcome_issues():
+    response = {
+        "resourceType": "Bundle",
+        "id": "resp-1",
+        "entry": [
+            {"resource": {"resourceType": "ClaimResponse"}},
+            {"resource": {"resourceType": "OperationOutcome", "issue": [
+                {"severity": "error", "details": {"text": "Invalid member"}},
+                {"details": {}},
+            ]}},
+            {},
+        ],
+    }
+
+    result = parse_nphies_response(response)
+
+    assert result["success"] is False
+    assert result["errors"] == ["[error] Invalid member", "[error] Unknown error"]
+    assert [r.get("resourceType") for r in result["data"]] == ["ClaimResponse", "OperationOutcome", None]
+    assert result["bundle_id"] == "resp-1"
+
+
+def test_parse_nphies_response_reports_malformed_bundles():
+    assert parse_nphies_response(None)["errors"] == ["Response is not a FHIR Bundle"]
+
+    result = parse_nphies_response({"resourceType": "Bundle", "entry": ["not-an-entry"]})
+
+    assert result["success"] is False
+    assert result["data"] is None
+    assert result["errors"][0].startswith("Error parsing response:")
+
+
+def test_compile_path_matches_safe_get():
+    getter = compile_path("response", "identifier")
+    cases = [
+        {"response": {"identifier": "hdr-1"}},
+        {"response": {}},
+        {"response": "not-a-dict"},
+        {},
+        None,
+    ]
+
+    for data in cases:
+        assert getter(data) == safe_get(data, "response", "identifier")
+        assert getter(data, "n/a") == safe_get(data, "response", "identifier", default="n/a")
+    assert compile_path("response", "identifier") is getter
+
+
+def test_id_validators_accept_only_ascii_digits():
+    assert validate_saudi_id("1234567890")
+    assert not validate_saudi_id("١٢٣٤٥٦٧٨٩٠")
+    assert not validate_saudi_id("123456789")
+    assert not validate_saudi_id("")
+    assert not validate_saudi_id(None)
+
+    assert validate_iqama("2234567890")
+    assert not validate_iqama("3234567890")
+    assert not validate_iqama("1١٢٣٤٥٦٧٨٩")
+    assert not validate_iqama("22345678901")
+
+
+def test_mask_sensitive_data_keeps_only_trailing_characters():
+    assert mask_sensitive_data("1234567890") == "******7890"
+    assert mask_sensitive_data("x" * 100 + "1234") == "*" * 100 + "1234"
+    assert mask_sensitive_data("secret", visible_chars=0) == "******"
+    assert mask_sensitive_data("1234") == "***"
+
+
+def test_get_current_timestamp_is_rebuilt_once_per_second(monkeypatch):
+    clock = iter([1_700_000_000.1, 1_700_000_000.9, 1_700_000_001.2])
+    monkeypatch.setattr(helpers.time, "time", lambda: next(clock))
+
+    first, second, third = (get_current_timestamp() for _ in range(3))
+
+    assert first is second
+    assert first == datetime.fromtimestamp(1_700_000_000).isoformat()
+    assert third == datetime.fromtimestamp(1_700_000_001).isoformat()
+
+
+def test_pretty_json_matches_stdlib_layout():
+    data = {"resourceType": "Patient", "name": [{"text": "محمد"}], "age": 30, "active": True, "extra": None}
+
+    assert pretty_json(data) == json.dumps(data, indent=2, ensure_ascii=False)
+    assert pretty_json(data, indent=4) == json.dumps(data, indent=4, ensure_ascii=False)
+
+
+def test_parse_nphies_date_handles_dates_and_datetimes():
+    assert parse_nphies_date("2024-03-05") == date(2024, 3, 5)
+    assert parse_nphies_date("2024-03-05T10:00:00Z") == date(2024, 3, 5)
+    assert parse_nphies_date("2024-03-05T23:30:00+03:00") == date(2024, 3, 5)
+    assert parse_nphies_date("2024-13-01") is None
+    assert parse_nphies_date(None) is None
+
+
+def test_streamed_and_chunked_hashes_match_whole_input(tmp_path):
+    text = "مطالبة-claim " * 200_000
+    encoded = text.encode()
+    path = tmp_path / "bundle.json"
+    path.write_bytes(encoded)
+
+    for algorithm in ("blake2b", "sha256"):
+        expected = calculate_hash(encoded, algorithm)
+        assert calculate_hash(text, algorithm) == expected
+        with open(path, "rb") as f:
+            assert calculate_hash_stream(f, algorithm) == expected
+        assert calculate_hash_stream([text[:5], encoded[len(text[:5].encode()):]], algorithm) == expected
+
+
+def test_calculate_hashes_matches_calculate_hash_per_item():
+    items = ["1000000001", b"1000000002", "2000000003"]
+
+    for algorithm in ("blake2b", "sha256"):
+        assert calculate_hashes(items, algorithm) == [calculate_hash(item, algorithm) for item in items]
+    assert calculate_hashes([]) == []
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_json_formatters_match_stdlib(monkeypatch, orjson_available):
+    monkeypatch.setattr(helpers, "ORJSON_AVAILABLE", orjson_available and helpers.ORJSON_AVAILABLE)
+    data = {"resourceType": "Bundle", "entry": [{"fullUrl": "urn:uuid:1", "text": "مطالبة"}], "total": 1}
+
+    assert pretty_json(data) == json.dumps(data, indent=2, ensure_ascii=False)
+    assert compact_json(data) == json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def test_build_coding_omits_missing_display():
+    assert build_coding("http://nphies.sa/terminology/CodeSystem/claim-type", "institutional") == {
+        "system": "http://nphies.sa/terminology/CodeSystem/claim-type", "code": "institutional"
+    }
+    assert build_coding("urn:sys", "A1", "Display")["display"] == "Display"
+
+
+def test_format_date_accepts_dates_datetimes_and_strings():
+    assert format_date(date(2024, 3, 5)) == "2024-03-05"
+    assert format_date(datetime(2024, 3, 5, 23, 59)) == "2024-03-05"
+    assert format_date(date(999, 1, 2)) == "0999-01-02"
+    assert format_date("2024-03-05") == "2024-03-05"
@@ -0,0 +1,61 @@
+import logging
+from logging.handlers import QueueHandler, RotatingFileHandler
+from unittest.mock import Mock
+
+from utils import logger as logger_module
+from utils.logger import LoggerMixin, SizeTrackingRotatingFileHandler, setup_logger
+
+
+def test_logger_mixin_looks_up_logger_once_per_instance(monkeypatch):
+    get_logger = Mock(side_effect=lambda name: f"logger:{name}")
+    monkeypatch.setattr(logger_module, "get_logger", get_logger)
+
+    class ClaimsWorker(LoggerMixin):
+        pass
+
+    worker = ClaimsWorker()
+
+    assert worker.logger == "logger:ClaimsWorker"
+    assert worker.logger == "logger:ClaimsWorker"
+    get_logger.assert_called_once_with("ClaimsWorker")
+
+
+def test_size_tracking_handler_checks_file_size_only_near_the_limit(tmp_path, monkeypatch):
+    checks = Mock(wraps=RotatingFileHandler.shouldRollover)
+    monkeypatch.setattr(RotatingFileHandler, "shouldRollover", lambda self, record: checks(self, record))
+    log_file = tmp_path / "nphies.log"
+    handler = SizeTrackingRotatingFileHandler(log_file, maxBytes=4096, backupCount=2, encoding="utf-8")
+    log = logging.getLogger("test_size_tracking_handler")
+    log.propagate = False
+    log.addHandler(handler)
+
+    try:
+        for i in range(300):
+            log.warning("claim %04d rejected", i)
+    finally:
+        log.removeHandler(handler)
+        handler.close()
+
+    assert (tmp_path / "nphies.log.1").exists()
+    assert all(path.stat().st_size <= 4096 for path in tmp_path.iterdir())
+    assert 0 < checks.call_count < 100
+
+
+def test_setup_logger_writes_file_from_background_listener(tmp_path):
+    log_file = tmp_path / "logs" / "nphies.log"
+    log = setup_logger("test_queued_file_logger", log_file=str(log_file), console=False)
+
+    try:
+        assert [type(h) for h in log.handlers] == [QueueHandler]
+        log.info("claim %s accepted", "c1")
+    finally:
+        logger_module._stop_file_listeners()
+
+    assert "claim c1 accepted" in log_file.read_text(encoding="utf-8")
+
+
+def test_setup_logger_shares_formatters_across_loggers():
+    first = setup_logger("test_shared_formatter_a")
+    second = setup_logger("test_shared_formatter_b")
+
+    assert first.handlers[0].formatter is second.handlers[0].formatter
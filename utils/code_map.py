@@ -0,0 +1,72 @@
+"""
+Code mapping tables for NPHIES code correction
+Maps invalid or retired codes (ICD-10, CPT) to their valid replacements
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class CodeMap:
+    """
+    Read-only code-to-code table stored as sorted fixed-width byte arrays
+    
+    Lookups are a binary search over one contiguous array instead of a
+    Python dict probe, and ``get_many`` resolves a whole batch of codes in a
+    single vectorized ``np.searchsorted`` call.
+    """
+    
+    def __init__(self, mapping: Optional[Dict[str, str]] = None):
+        """
+        Build the table
+        
+        Args:
+            mapping: Source code to replacement code
+        """
+        items = sorted((src.encode(), dst.encode()) for src, dst in (mapping or {}).items())
+        self._src = np.array([src for src, _ in items], dtype=np.bytes_)
+        self._dst = np.array([dst for _, dst in items], dtype=np.bytes_)
+    
+    def __len__(self) -> int:
+        return len(self._src)
+    
+    def __contains__(self, code: str) -> bool:
+        return self.get(code) is not None
+    
+    def get(self, code: str) -> Optional[str]:
+        """
+        Look up the replacement for one code
+        
+        Args:
+            code: Code to map
+        
+        Returns:
+            Replacement code or None if the code is not in the table
+        """
+        key = code.encode()
+        i = int(np.searchsorted(self._src, key))
+        if i < len(self._src) and self._src[i] == key:
+            return self._dst[i].decode()
+        return None
+    
+    def get_many(self, codes: Sequence[str]) -> List[Optional[str]]:
+        """
+        Look up the replacements for many codes at once
+        
+        Args:
+            codes: Codes to map
+        
+        Returns:
+            Replacement code or None per code, in the same order as ``codes``
+        """
+        if not len(codes) or not len(self._src):
+            return [None] * len(codes)
+        
+        keys = np.array([code.encode() for code in codes], dtype=np.bytes_)
+        idx = np.minimum(np.searchsorted(self._src, keys), len(self._src) - 1)
+        found = self._src[idx] == keys
+        
+        return [
+            dst.decode() if hit else None
+            for dst, hit in zip(self._dst[idx].tolist(), found.tolist())
+        ]
@@ -1,10 +1,14 @@
 """
 Logging configuration for NPHIES Integration
 """
+import atexit
+import functools
 import logging
+import os
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
 try:
@@ -13,21 +17,109 @@ try:
 except ImportError:
     COLORLOG_AVAILABLE = False
 
+# Format for logs
+LOG_FORMAT = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Formatters hold no per-handler state, so every handler shares these
+_FILE_FORMATTER = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+if COLORLOG_AVAILABLE:
+    _CONSOLE_FORMATTER = colorlog.ColoredFormatter(
+        "%(log_color)s" + LOG_FORMAT,
+        datefmt=DATE_FORMAT,
+        log_colors={
+            'DEBUG': 'cyan',
+            'INFO': 'green',
+            'WARNING': 'yellow',
+            'ERROR': 'red',
+            'CRITICAL': 'red,bg_white',
+        }
+    )
+else:
+    _CONSOLE_FORMATTER = _FILE_FORMATTER
+
+# Background listeners writing queued records to log files, by logger name
+_file_listeners = {}
+
+
+@atexit.register
+def _stop_file_listeners():
+    """Drain and stop every file listener, so queued records reach disk"""
+    while _file_listeners:
+        _, listener = _file_listeners.popitem()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+class SizeTrackingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that skips the per-record size check until a
+    rollover is plausible
+    
+    A running upper bound on the file size is kept from formatted message
+    lengths; only once it reaches maxBytes does the stream-position check of
+    RotatingFileHandler run, after which the bound is resynced to the real
+    size. The number of real checks per file is logarithmic, not per record.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._size_bound = self._current_size()
+    
+    def _current_size(self) -> int:
+        """Bytes in the current log file"""
+        if self.stream is not None:
+            return self.stream.tell()
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.maxBytes <= 0:
+            return False
+        
+        # UTF-8 needs at most 4 bytes per character, plus the newline
+        self._size_bound += 4 * len(self.format(record)) + 1
+        if self._size_bound < self.maxBytes:
+            return False
+        
+        if super().shouldRollover(record):
+            return True
+        self._size_bound = self._current_size()
+        return False
+    
+    def doRollover(self):
+        super().doRollover()
+        self._size_bound = self._current_size()
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_directory(path: str) -> None:
+    """Create a log directory, once per path for the life of the process"""
+    Path(path).mkdir(parents=True, exist_ok=True)
+
 
 def setup_logger(
     name: str = "nphies",
     log_level: str = "INFO",
     log_file: str = None,
-    console: bool = True
+    console: bool = True,
+    queue_file: bool = True
 ) -> logging.Logger:
     """
     Setup logger with file and console handlers
     
+    With ``queue_file`` the logging thread only enqueues file records; a
+    single background listener formats them and writes them to disk.
+    
     Args:
         name: Logger name
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Path to log file
         console: Enable console logging
+        queue_file: Write the log file from a background thread
         
     Returns:
         Configured logger instance
@@ -37,48 +129,42 @@ def setup_logger(
     
     # Remove existing handlers
     logger.handlers = []
-    
-    # Format for logs
-    log_format = "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
+    listener = _file_listeners.pop(name, None)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
     
     # Console handler with colors if available
     if console:
         if COLORLOG_AVAILABLE:
             console_handler = colorlog.StreamHandler(sys.stdout)
-            console_formatter = colorlog.ColoredFormatter(
-                "%(log_color)s%(asctime)s | %(name)s | %(levelname)s | %(message)s",
-                datefmt=date_format,
-                log_colors={
-                    'DEBUG': 'cyan',
-                    'INFO': 'green',
-                    'WARNING': 'yellow',
-                    'ERROR': 'red',
-                    'CRITICAL': 'red,bg_white',
-                }
-            )
-            console_handler.setFormatter(console_formatter)
         else:
             console_handler = logging.StreamHandler(sys.stdout)
-            console_formatter = logging.Formatter(log_format, datefmt=date_format)
-            console_handler.setFormatter(console_formatter)
+        console_handler.setFormatter(_CONSOLE_FORMATTER)
         
         logger.addHandler(console_handler)
     
     # File handler with rotation
     if log_file:
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_directory(str(Path(log_file).parent))
         
-        file_handler = RotatingFileHandler(
+        file_handler = SizeTrackingRotatingFileHandler(
             log_file,
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5,
             encoding='utf-8'
         )
-        file_formatter = logging.Formatter(log_format, datefmt=date_format)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(_FILE_FORMATTER)
+        
+        if queue_file:
+            records = queue.SimpleQueue()
+            listener = QueueListener(records, file_handler, respect_handler_level=True)
+            listener.start()
+            _file_listeners[name] = listener
+            logger.addHandler(QueueHandler(records))
+        else:
+            logger.addHandler(file_handler)
     
     return logger
 
@@ -114,14 +200,13 @@ def get_logger(name: str = None) -> logging.Logger:
 def ensure_log_directory():
     """Ensure logs directory exists"""
     from config.settings import settings
-    log_path = Path(settings.LOG_FILE)
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_directory(str(Path(settings.LOG_FILE).parent))
 
 
 class LoggerMixin:
     """Mixin to add logging capability to classes"""
     
-    @property
+    @functools.cached_property
     def logger(self) -> logging.Logger:
-        """Get logger for this class"""
+        """Get logger for this class, looked up on first access only"""
         return get_logger(self.__class__.__name__)